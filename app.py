@@ -5,13 +5,13 @@ ArUCO Generator - Flask Application Configuration
 AI AGENT DOCUMENTATION:
 - Entry point: main.py imports this module
 - Database: PostgreSQL with SQLAlchemy ORM (optional, falls back to SQLite)
-- Error handling: Comprehensive logging to debug_logs.txt
+- Error handling: Queued logging to debug_logs.txt (rotated, off the request path)
 - Routes: All defined in aruco_generator/web.py
 - Static files: static/ directory (app.js with full error logging)
 - Templates: templates/ directory (index.html with advanced mode)
 
 DEBUGGING FOR AI AGENTS:
-- Error logs: debug_logs.txt (auto-created)
+- Error logs: debug_logs.txt (auto-created, rotated to debug_logs.txt.1, .2, ...)
 - Status endpoint: GET /api/debug/status
 - Frontend errors: POST /api/log-error
 - Monitor script: ./debug_monitor.sh
@@ -31,28 +31,85 @@ from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+
 class Base(DeclarativeBase):
     pass
 
+
 db = SQLAlchemy(model_class=Base)
 
 # Create Flask application
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+# One trusted proxy in front: remote_addr becomes the client it forwarded for
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
 # Database configuration
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///aruco_generator.db")
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+    "DATABASE_URL", "sqlite:///aruco_generator.db"
+)
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
 }
 
+# Batch rendering pool ("serial", "thread" or "process"; workers default to CPU count).
+# "process" spawns a pool in every web worker, so enable it only where web workers x
+# batch workers fits the host
+app.config["BATCH_POOL"] = os.environ.get("BATCH_POOL", "thread")
+app.config["BATCH_WORKERS"] = int(os.environ.get("BATCH_WORKERS", "0")) or None
+
+# Batch download limits and ZIP deflate level (0 stores members uncompressed)
+app.config["BATCH_MAX_FILES"] = int(os.environ.get("BATCH_MAX_FILES", "1000"))
+app.config["BATCH_MAX_MARKERS_PER_FILE"] = int(
+    os.environ.get("BATCH_MAX_MARKERS_PER_FILE", "1000")
+)
+app.config["BATCH_ZIP_LEVEL"] = int(os.environ.get("BATCH_ZIP_LEVEL", "6"))
+
+# Opt-in: render without timestamps so identical configs give byte-identical output
+# (strong ETags, 304s, artifact store); requests can still pass "deterministic"
+app.config["DETERMINISTIC_OUTPUT"] = os.environ.get("DETERMINISTIC_OUTPUT", "0") == "1"
+
+# Render quick-test and preset artifacts in the background at startup
+app.config["WARM_ARTIFACTS"] = os.environ.get("WARM_ARTIFACTS", "1") == "1"
+
+# Background batch jobs: concurrent jobs and seconds finished jobs and results are kept
+app.config["BATCH_JOB_WORKERS"] = int(os.environ.get("BATCH_JOB_WORKERS", "2"))
+app.config["BATCH_JOB_TTL"] = int(os.environ.get("BATCH_JOB_TTL", "3600"))
+
+# Logging: file written by a background thread (shared and append-only, per process
+# and rotated with {pid}, or stderr only when empty); frontend error reports per client
+# per minute
+app.config["LOG_FILE"] = os.environ.get("LOG_FILE", "debug_logs.txt")
+app.config["LOG_LEVEL"] = os.environ.get("LOG_LEVEL", "DEBUG")
+app.config["LOG_MAX_BYTES"] = int(os.environ.get("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+app.config["LOG_BACKUP_COUNT"] = int(os.environ.get("LOG_BACKUP_COUNT", "3"))
+app.config["LOG_ERROR_RATE"] = int(os.environ.get("LOG_ERROR_RATE", "30"))
+
+# Memory-mapped marker atlas shared by all workers (built at startup if missing; empty
+# disables)
+app.config["MARKER_ATLAS"] = os.environ.get(
+    "MARKER_ATLAS", os.path.join(app.instance_path, "marker_atlas.bin")
+)
+
+# Rendered downloads and batch ZIPs kept on disk across restarts (empty directory
+# disables)
+app.config["ARTIFACT_STORE_DIR"] = os.environ.get(
+    "ARTIFACT_STORE_DIR", os.path.join(app.instance_path, "artifact_store")
+)
+app.config["ARTIFACT_STORE_MAX_BYTES"] = int(
+    os.environ.get("ARTIFACT_STORE_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+app.config["ARTIFACT_STORE_TTL"] = int(
+    os.environ.get("ARTIFACT_STORE_TTL", str(30 * 24 * 3600))
+)
+
 # Initialize database
 db.init_app(app)
 
 # Import and register routes
-from aruco_generator.web import *
+from aruco_generator.web import *  # noqa: E402,F401,F403
+
 
 # Initialize database tables
 def init_db():
@@ -63,6 +120,7 @@ def init_db():
     except Exception as e:
         print(f"Database initialization warning: {e}")
 
+
 # Initialize database after app context is available
 if __name__ != "__main__":
-    init_db()
\ No newline at end of file
+    init_db()
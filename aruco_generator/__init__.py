@@ -3,11 +3,25 @@
   "file_type": "python_package_init",
   "purpose": "ArUCO generator package initialization",
   "package_structure": {
-    "aruco.py": "Core ArUCO marker generation with OpenCV",
+    "aruco.py": "Core ArUCO marker generation from embedded OpenCV dictionary bits",
+    "dictionary_bits.py": "Generated packed bit tables of the predefined dictionaries",
+    "atlas.py": "Memory-mapped marker atlas file shared across worker processes",
+    "opencv_compat.py": "Lazy OpenCV import; builds and verifies the embedded tables",
     "drawing.py": "SVG drawing context and rendering",
+    "geometry.py": "Merging black modules into rectangles or outline paths",
     "lightburn.py": "LightBurn .lbrn2 file export functionality",
     "web.py": "Flask routes and API endpoints",
-    "batch.py": "Batch processing for multiple markers"
+    "batch.py": "Batch processing for multiple markers",
+    "zipstream.py": "Streaming ZIP writer with parallel member compression",
+    "jobs.py": "Background batch jobs with database-backed progress",
+    "config.py": "Canonical render configs and hashes for deterministic output",
+    "artifacts.py": "Render-once cache for quick-test and preset artifacts",
+    "store.py": "Content-addressed on-disk artifact store with LRU/TTL eviction",
+    "layout.py": "Bed/stock sheet packing with overflow and utilization reporting",
+    "toolpath.py": "Per-layer shape ordering that reduces laser travel",
+    "estimate.py": "Vectorized laser job time estimate per layer",
+    "metrics.py": "Per-stage timings, Server-Timing headers and Prometheus metrics",
+    "logs.py": "Queued rotating log setup and per-client rate limiting"
   },
   "ai_navigation": {
     "entry_point": "web.py for routes, aruco.py for core functionality",
@@ -17,4 +31,4 @@
 """
 
 __version__ = "1.0.0"
-__author__ = "ArUCO Generator Team"
\ No newline at end of file
+__author__ = "ArUCO Generator Team"
@@ -0,0 +1,69 @@
+"""
+{
+  "file_type": "artifact_cache",
+  "purpose": "Render-once in-memory store for fixed-config artifacts (quick test)",
+  "dependencies": [],
+  "main_class": "ArtifactCache",
+  "key_methods": {
+    "register": "Declare how to render an artifact",
+    "get": "Return the artifact, rendering it on first use",
+    "warm": "Render every registered artifact ahead of the first request",
+    "stats": "Rendered/registered counts and render times"
+  },
+  "ai_navigation": {
+    "modify_for": "Adding new precomputed responses",
+    "used_by": ["web.py"],
+    "output_format": "Whatever the registered render function returns (bytes plus ETag)"
+  }
+}
+"""
+
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactCache:
+    def __init__(self):
+        self._renderers: Dict[str, Callable[[], Any]] = {}
+        self._artifacts: Dict[str, Any] = {}
+        self._render_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: str, render: Callable[[], Any]):
+        """Declare how to render an artifact (rendered on first get or warm)"""
+        self._renderers[key] = render
+
+    def get(self, key: str) -> Any:
+        """Return the artifact, rendering it once on first use"""
+        artifact = self._artifacts.get(key)
+        if artifact is not None:
+            return artifact
+
+        with self._lock:
+            if key not in self._artifacts:
+                started = time.perf_counter()
+                self._artifacts[key] = self._renderers[key]()
+                self._render_seconds[key] = time.perf_counter() - started
+            return self._artifacts[key]
+
+    def warm(self):
+        """Render every registered artifact ahead of the first request"""
+        for key in list(self._renderers):
+            try:
+                self.get(key)
+            except Exception:
+                logger.exception("Failed to warm artifact %s", key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Rendered/registered counts and per-artifact render seconds"""
+        return {
+            "registered": len(self._renderers),
+            "rendered": len(self._artifacts),
+            "render_seconds": {
+                key: round(seconds, 4) for key, seconds in self._render_seconds.items()
+            },
+        }
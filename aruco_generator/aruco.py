@@ -1,96 +1,403 @@
 """
 {
   "file_type": "core_aruco_generator",
-  "purpose": "Core ArUCO marker generation using OpenCV",
-  "dependencies": ["opencv-python", "numpy"],
+  "purpose": "ArUCO marker generation from embedded OpenCV dictionary bits (no cv2)",
+  "dependencies": ["numpy", "dictionary_bits.py"],
   "main_class": "ArUCOGenerator",
+  "shared_state": "DictionaryRegistry: per-process bit tables (or a shared atlas)",
   "key_methods": {
     "get_dictionary_info": "Returns available ArUCO dictionaries",
-    "generate_marker": "Creates single ArUCO marker as numpy array",
+    "generate_marker": "Single marker image, identical to cv2 generateImageMarker",
+    "generate_marker_bits": "Reads marker module matrix straight from dictionary bits",
     "generate_grid": "Creates grid of markers with positions",
-    "calculate_total_size": "Calculates grid dimensions"
+    "generate_grid_table": "Creates grid as a columnar MarkerTable of NumPy arrays",
+    "generate_positioned_table": "MarkerTable for given ids at explicit positions",
+    "calculate_total_size": "Calculates grid dimensions",
+    "load_marker_atlas": "Serve bit tables from a shared memory-mapped atlas file"
   },
   "ai_navigation": {
     "modify_for": "Adding new dictionary types or marker generation logic",
     "used_by": ["web.py", "drawing.py"],
-    "output_format": "numpy arrays for OpenCV processing"
+    "output_format": "numpy arrays (uint8 images compatible with OpenCV)"
   }
 }
 """
 
-import cv2
+import base64
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 import numpy as np
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Mapping, Iterator
+from .dictionary_bits import FAMILY_BITS
+from .atlas import MarkerAtlas, build_atlas
+
+logger = logging.getLogger(__name__)
+
+# Predefined OpenCV dictionaries supported by the generator (values are the
+# cv2.aruco.DICT_* ids)
+PREDEFINED_DICTIONARIES = MappingProxyType(
+    {
+        "4X4_50": 0,
+        "4X4_100": 1,
+        "4X4_250": 2,
+        "4X4_1000": 3,
+        "5X5_50": 4,
+        "5X5_100": 5,
+        "5X5_250": 6,
+        "5X5_1000": 7,
+        "6X6_50": 8,
+        "6X6_100": 9,
+        "6X6_250": 10,
+        "6X6_1000": 11,
+        "7X7_50": 12,
+        "7X7_100": 13,
+        "7X7_250": 14,
+        "7X7_1000": 15,
+    }
+)
+
+
+class DictionaryRegistry:
+    """Immutable dictionary lookup built once per process, shared by all generators"""
+
+    def __init__(
+        self,
+        dictionaries: Mapping[str, int],
+        atlas: MarkerAtlas | None = None,
+    ):
+        info = {}
+        for name in dictionaries:
+            bits, max_markers = name.split("_")
+            info[name] = MappingProxyType(
+                {
+                    "bits": bits,
+                    "marker_size": int(bits.split("X")[0]),
+                    "max_markers": int(max_markers),
+                    "description": f"{bits} bits, {max_markers} unique markers",
+                }
+            )
+
+        self.info = MappingProxyType(info)
+        self.atlas = atlas
+        self._family_bits = lru_cache(maxsize=None)(self._decode_family)
+        self._bit_tables = lru_cache(maxsize=None)(self._decode_bit_table)
+
+    def max_markers(self, dict_name: str) -> int:
+        """Return number of markers available in a dictionary"""
+        return self.info[dict_name]["max_markers"]
+
+    def marker_bits(self, dict_name: str, marker_id: int) -> np.ndarray:
+        """Return the read-only module matrix for (dictionary, id), a table view"""
+        table = self.bit_table(dict_name)
+        if marker_id < 0 or marker_id >= table.shape[0]:
+            raise ValueError(
+                f"Marker ID {marker_id} out of range for dictionary {dict_name}"
+            )
+        return table[marker_id]
+
+    def table_stats(self) -> Dict[str, int]:
+        """Return decoded bit table count and mapped atlas size"""
+        return {
+            "decoded_tables": self._bit_tables.cache_info().currsize,
+            "atlas_bytes": self.atlas.nbytes if self.atlas is not None else 0,
+        }
+
+    def bit_table(self, dict_name: str) -> np.ndarray:
+        """Return read-only (max_markers, N+2, N+2) module matrices for a dictionary"""
+        if self.atlas is not None and dict_name in self.atlas:
+            return self.atlas.table(dict_name)
+        return self._bit_tables(dict_name)
+
+    def _decode_family(self, marker_size: int) -> np.ndarray:
+        """Unpack the embedded inner bits (1 = white) of a marker-size family"""
+        packed = np.frombuffer(
+            base64.b64decode(FAMILY_BITS[marker_size]), dtype=np.uint8
+        )
+        bits = np.unpackbits(packed)
+        markers = len(bits) // (marker_size * marker_size)
+        return bits[: markers * marker_size * marker_size].reshape(
+            markers, marker_size, marker_size
+        )
+
+    def _decode_bit_table(self, dict_name: str) -> np.ndarray:
+        """Build a dictionary's module matrices from the first markers of its family"""
+        info = self.info[dict_name]
+        marker_size = info["marker_size"]
+        inner = self._family_bits(marker_size)[: info["max_markers"]]
+
+        # Dictionary bits use 1 for white modules; the 1-cell border is always black
+        table = np.ones((len(inner), marker_size + 2, marker_size + 2), dtype=np.uint8)
+        table[:, 1:-1, 1:-1] = 1 - inner
+        table.setflags(write=False)
+        return table
+
+
+@dataclass(frozen=True)
+class MarkerTable:
+    """Columnar marker layout: one array per field plus stacked module matrices"""
+
+    dict_name: str
+    ids: np.ndarray  # (n,) int32
+    x: np.ndarray  # (n,) float64, mm
+    y: np.ndarray  # (n,) float64, mm
+    size: np.ndarray  # (n,) float64, mm
+    bits: np.ndarray  # (n, cells, cells) uint8, 1 = black module
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: slice) -> "MarkerTable":
+        """Return a sub-table for a slice or index array"""
+        if isinstance(index, (int, np.integer)):
+            raise TypeError(
+                "MarkerTable indexing needs a slice or index array; iterate for records"
+            )
+        return MarkerTable(
+            self.dict_name,
+            self.ids[index],
+            self.x[index],
+            self.y[index],
+            self.size[index],
+            self.bits[index],
+        )
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Yield per-marker records compatible with generate_grid output"""
+        for i in range(len(self.ids)):
+            yield {
+                "id": int(self.ids[i]),
+                "x": float(self.x[i]),
+                "y": float(self.y[i]),
+                "size": float(self.size[i]),
+                "dict": self.dict_name,
+                "bits": self.bits[i],
+            }
+
+    @property
+    def nbytes(self) -> int:
+        """Total memory held by the table arrays"""
+        return (
+            self.ids.nbytes
+            + self.x.nbytes
+            + self.y.nbytes
+            + self.size.nbytes
+            + self.bits.nbytes
+        )
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> DictionaryRegistry:
+    """Return the process-wide dictionary registry, building it on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = DictionaryRegistry(PREDEFINED_DICTIONARIES)
+    return _registry
+
+
+def bit_tables_digest() -> str:
+    """Hash of the embedded dictionary bits, stored in atlases to detect stale files"""
+    digest = hashlib.sha256()
+    for marker_size in sorted(FAMILY_BITS):
+        digest.update(f"{marker_size}:{FAMILY_BITS[marker_size]};".encode("ascii"))
+    return digest.hexdigest()
+
+
+def build_marker_atlas(path: str) -> str:
+    """Precompile every marker of every predefined dictionary into an atlas file"""
+    registry = DictionaryRegistry(PREDEFINED_DICTIONARIES)
+    tables = {name: registry.bit_table(name) for name in PREDEFINED_DICTIONARIES}
+    return build_atlas(path, tables, bit_tables_digest())
+
+
+def load_marker_atlas(path: str, build: bool = True) -> DictionaryRegistry:
+    """Install a process-wide registry backed by a memory-mapped atlas
+
+    Marker lookups become slices of one read-only mapping that the page cache
+    shares between worker processes. A missing or stale atlas is rebuilt when
+    `build` is set; otherwise (or if mapping fails) the registry decodes the
+    embedded tables as usual. Call before creating generators.
+    """
+    global _registry
+    atlas = None
+    try:
+        if build and not _atlas_current(path):
+            build_marker_atlas(path)
+        atlas = MarkerAtlas(path)
+        if atlas.digest != bit_tables_digest():
+            logger.warning(
+                "Marker atlas %s is stale; decoding embedded tables instead", path
+            )
+            atlas = None
+    except (OSError, ValueError) as e:
+        logger.warning(
+            "Marker atlas %s unavailable (%s); decoding embedded tables instead",
+            path,
+            e,
+        )
+
+    with _registry_lock:
+        _registry = DictionaryRegistry(PREDEFINED_DICTIONARIES, atlas=atlas)
+    return _registry
+
+
+def _atlas_current(path: str) -> bool:
+    """Whether an atlas file exists and matches the embedded bits"""
+    try:
+        return MarkerAtlas(path).digest == bit_tables_digest()
+    except (OSError, ValueError):
+        return False
+
 
 class ArUCOGenerator:
     def __init__(self):
-        self.dictionaries = {
-            "4X4_50": cv2.aruco.DICT_4X4_50,
-            "4X4_100": cv2.aruco.DICT_4X4_100,
-            "4X4_250": cv2.aruco.DICT_4X4_250,
-            "4X4_1000": cv2.aruco.DICT_4X4_1000,
-            "5X5_50": cv2.aruco.DICT_5X5_50,
-            "5X5_100": cv2.aruco.DICT_5X5_100,
-            "5X5_250": cv2.aruco.DICT_5X5_250,
-            "5X5_1000": cv2.aruco.DICT_5X5_1000,
-            "6X6_50": cv2.aruco.DICT_6X6_50,
-            "6X6_100": cv2.aruco.DICT_6X6_100,
-            "6X6_250": cv2.aruco.DICT_6X6_250,
-            "6X6_1000": cv2.aruco.DICT_6X6_1000,
-            "7X7_50": cv2.aruco.DICT_7X7_50,
-            "7X7_100": cv2.aruco.DICT_7X7_100,
-            "7X7_250": cv2.aruco.DICT_7X7_250,
-            "7X7_1000": cv2.aruco.DICT_7X7_1000,
-        }
-    
+        self.registry = get_registry()
+        self.dictionaries = dict(PREDEFINED_DICTIONARIES)
+
     def get_dictionary_info(self) -> Dict[str, Dict[str, Any]]:
         """Return dictionary information for UI"""
-        info = {}
-        for name, dict_id in self.dictionaries.items():
-            dictionary = cv2.aruco.getPredefinedDictionary(dict_id)
-            bits, max_markers = name.split('_')
-            info[name] = {
-                'bits': bits,
-                'max_markers': int(max_markers),
-                'description': f"{bits} bits, {max_markers} unique markers"
+        return {
+            name: {
+                "bits": info["bits"],
+                "max_markers": info["max_markers"],
+                "description": info["description"],
             }
-        return info
-    
-    def generate_marker(self, marker_id: int, dict_name: str, size_pixels: int = 200) -> np.ndarray:
-        """Generate single ArUCO marker as numpy array"""
+            for name, info in self.registry.info.items()
+        }
+
+    def generate_marker(
+        self, marker_id: int, dict_name: str, size_pixels: int = 200
+    ) -> np.ndarray:
+        """Single marker image (uint8, 0 = black), same as cv2 generateImageMarker"""
+        bits = self.generate_marker_bits(marker_id, dict_name)
+        cells = bits.shape[0]
+        if size_pixels < cells:
+            raise ValueError(f"Marker needs at least {cells} pixels per side")
+
+        # Nearest-neighbour upscale of one pixel per module, using OpenCV's
+        # INTER_NEAREST source mapping
+        source = np.minimum(
+            np.floor(np.arange(size_pixels) * (1.0 / (size_pixels / cells))).astype(
+                np.intp
+            ),
+            cells - 1,
+        )
+        return np.where(bits[np.ix_(source, source)], 0, 255).astype(np.uint8)
+
+    def generate_marker_bits(self, marker_id: int, dict_name: str) -> np.ndarray:
+        """Return (N+2)x(N+2) module matrix with border, 1 = black cell (read-only)"""
         if dict_name not in self.dictionaries:
             raise ValueError(f"Unknown dictionary: {dict_name}")
-        
-        dictionary = cv2.aruco.getPredefinedDictionary(self.dictionaries[dict_name])
-        marker_image = cv2.aruco.generateImageMarker(dictionary, marker_id, size_pixels)
-        return marker_image
-    
-    def generate_grid(self, start_id: int, dict_name: str, rows: int, cols: int, 
-                     size_mm: float, spacing_mm: float) -> List[Dict[str, Any]]:
-        """Generate grid of markers with positions"""
-        if rows * cols + start_id > self.get_dictionary_info()[dict_name]['max_markers']:
+        return self.registry.marker_bits(dict_name, int(marker_id))
+
+    def generate_grid(
+        self,
+        start_id: int,
+        dict_name: str,
+        rows: int,
+        cols: int,
+        size_mm: float,
+        spacing_mm: float,
+        geometry: str = "cells",
+    ) -> List[Dict[str, Any]]:
+        """Generate grid of markers with positions
+
+        geometry="cells" attaches the module matrix ('bits'), so drawing emits one
+        shape per module. geometry="pixels" attaches the legacy 200px 'image'.
+        """
+        if geometry not in ("cells", "pixels"):
+            raise ValueError(f"Unknown geometry mode: {geometry}")
+        if dict_name not in self.dictionaries:
+            raise ValueError(f"Unknown dictionary: {dict_name}")
+        if rows * cols + start_id > self.registry.max_markers(dict_name):
             raise ValueError(f"Too many markers requested for dictionary {dict_name}")
-        
+
         markers = []
         for row in range(rows):
             for col in range(cols):
                 marker_id = start_id + (row * cols + col)
-                marker_image = self.generate_marker(marker_id, dict_name)
-                
+
                 x = col * (size_mm + spacing_mm)
                 y = row * (size_mm + spacing_mm)
-                
-                markers.append({
-                    'id': marker_id,
-                    'image': marker_image,
-                    'x': x,
-                    'y': y,
-                    'size': size_mm,
-                    'dict': dict_name
-                })
+
+                marker = {
+                    "id": marker_id,
+                    "x": x,
+                    "y": y,
+                    "size": size_mm,
+                    "dict": dict_name,
+                }
+                if geometry == "cells":
+                    marker["bits"] = self.generate_marker_bits(marker_id, dict_name)
+                else:
+                    marker["image"] = self.generate_marker(marker_id, dict_name)
+                markers.append(marker)
         return markers
-    
-    def calculate_total_size(self, rows: int, cols: int, size_mm: float, spacing_mm: float) -> Tuple[float, float]:
+
+    def generate_grid_table(
+        self,
+        start_id: int,
+        dict_name: str,
+        rows: int,
+        cols: int,
+        size_mm: float,
+        spacing_mm: float,
+    ) -> MarkerTable:
+        """Generate grid of markers as a columnar MarkerTable (vectorized positions)"""
+        if dict_name not in self.dictionaries:
+            raise ValueError(f"Unknown dictionary: {dict_name}")
+        if rows * cols + start_id > self.registry.max_markers(dict_name):
+            raise ValueError(f"Too many markers requested for dictionary {dict_name}")
+
+        index = np.arange(rows * cols, dtype=np.int32)
+        pitch = float(size_mm + spacing_mm)
+        ids = start_id + index
+        return MarkerTable(
+            dict_name=dict_name,
+            ids=ids,
+            x=(index % cols) * pitch,
+            y=(index // cols) * pitch,
+            size=np.full(rows * cols, float(size_mm)),
+            bits=self.registry.bit_table(dict_name)[ids],
+        )
+
+    def generate_positioned_table(
+        self,
+        ids: np.ndarray,
+        dict_name: str,
+        x: np.ndarray,
+        y: np.ndarray,
+        size_mm: float,
+    ) -> MarkerTable:
+        """Generate markers at explicit top-left positions (sheets, partial grids)"""
+        if dict_name not in self.dictionaries:
+            raise ValueError(f"Unknown dictionary: {dict_name}")
+        ids = np.asarray(ids, dtype=np.int32)
+        if len(ids) and (
+            ids.min() < 0 or ids.max() >= self.registry.max_markers(dict_name)
+        ):
+            raise ValueError(f"Marker ID out of range for dictionary {dict_name}")
+
+        return MarkerTable(
+            dict_name=dict_name,
+            ids=ids,
+            x=np.asarray(x, dtype=float),
+            y=np.asarray(y, dtype=float),
+            size=np.full(len(ids), float(size_mm)),
+            bits=self.registry.bit_table(dict_name)[ids],
+        )
+
+    def calculate_total_size(
+        self, rows: int, cols: int, size_mm: float, spacing_mm: float
+    ) -> Tuple[float, float]:
         """Calculate total dimensions of marker grid"""
         width = cols * size_mm + (cols - 1) * spacing_mm
         height = rows * size_mm + (rows - 1) * spacing_mm
@@ -0,0 +1,160 @@
+"""
+{
+  "file_type": "marker_atlas",
+  "purpose": "Packed file of every marker's module matrix, mapped read-only and shared",
+  "dependencies": ["numpy"],
+  "main_class": "MarkerAtlas",
+  "key_methods": {
+    "build_atlas": "Write module-matrix tables plus an index header (atomic replace)",
+    "MarkerAtlas.table": "Zero-copy (markers, cells, cells) view of one dictionary",
+    "MarkerAtlas.marker": "Zero-copy (cells, cells) view of one marker"
+  },
+  "usage": {
+    "build": "python -m aruco_generator.atlas instance/marker_atlas.bin"
+  },
+  "ai_navigation": {
+    "modify_for": "Changing the file layout (bump ATLAS_VERSION)",
+    "used_by": ["aruco.py (DictionaryRegistry, load_marker_atlas)"],
+    "output_format": "magic, version, header size, JSON index, 64-byte aligned tables"
+  }
+}
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Dict, Mapping
+
+import numpy as np
+
+ATLAS_MAGIC = b"ARUCOATL"
+ATLAS_VERSION = 1
+
+# Fixed prefix: magic, format version, JSON index length
+_PREFIX = struct.Struct("<8sII")
+
+# Tables start on cache-line boundaries
+ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    """Round up to the next ALIGNMENT boundary"""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def build_atlas(path: str, tables: Mapping[str, np.ndarray], digest: str) -> str:
+    """Write (markers, cells, cells) uint8 tables per dictionary into one atlas file
+
+    `digest` identifies the source bits so readers can detect a stale atlas. The
+    file is written next to `path` and renamed over it, so workers mapping the old
+    atlas keep a consistent view.
+    """
+    index = {}
+    offset = 0
+    for name, table in tables.items():
+        index[name] = {
+            "offset": offset,
+            "markers": int(table.shape[0]),
+            "cells": int(table.shape[1]),
+        }
+        offset = _aligned(offset + table.size)
+    header = json.dumps(
+        {"digest": digest, "dictionaries": index}, sort_keys=True
+    ).encode("utf-8")
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".marker_atlas.")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(_PREFIX.pack(ATLAS_MAGIC, ATLAS_VERSION, len(header)))
+            fp.write(header)
+            for name, table in tables.items():
+                fp.seek(data_start + index[name]["offset"])
+                fp.write(np.ascontiguousarray(table, dtype=np.uint8).tobytes())
+            fp.truncate(data_start + offset)
+        # mkstemp creates owner-only files; workers may run as other users
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+class MarkerAtlas:
+    """Read-only memory map of an atlas file; tables are views into the mapping"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = (
+            _PREFIX.unpack_from(self._map)
+            if len(self._map) >= _PREFIX.size
+            else (b"", 0, 0)
+        )
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            self._map.close()
+            raise ValueError(f"Not a version {ATLAS_VERSION} marker atlas: {path}")
+        header = json.loads(self._map[_PREFIX.size : _PREFIX.size + header_length])
+        self.digest = header["digest"]
+
+        data_start = _aligned(_PREFIX.size + header_length)
+        self._tables: Dict[str, np.ndarray] = {}
+        for name, entry in header["dictionaries"].items():
+            cells = entry["cells"]
+            table = np.frombuffer(
+                self._map,
+                dtype=np.uint8,
+                count=entry["markers"] * cells * cells,
+                offset=data_start + entry["offset"],
+            )
+            self._tables[name] = table.reshape(entry["markers"], cells, cells)
+
+    def __contains__(self, dict_name: str) -> bool:
+        return dict_name in self._tables
+
+    @property
+    def names(self) -> tuple:
+        """Dictionaries stored in the atlas"""
+        return tuple(self._tables)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the mapped file"""
+        return len(self._map)
+
+    def table(self, dict_name: str) -> np.ndarray:
+        """Read-only (markers, cells, cells) module matrices, 1 = black"""
+        return self._tables[dict_name]
+
+    def marker(self, dict_name: str, marker_id: int) -> np.ndarray:
+        """Read-only module matrix of one marker"""
+        return self._tables[dict_name][marker_id]
+
+
+def main() -> int:
+    from .aruco import build_marker_atlas
+
+    path = (
+        sys.argv[1]
+        if len(sys.argv) > 1
+        else os.path.join("instance", "marker_atlas.bin")
+    )
+    build_marker_atlas(path)
+    atlas = MarkerAtlas(path)
+    markers = sum(atlas.table(name).shape[0] for name in atlas.names)
+    print(
+        f"Wrote {markers} markers from {len(atlas.names)} dictionaries "
+        f"to {path} ({atlas.nbytes} bytes)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
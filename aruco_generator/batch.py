@@ -2,12 +2,27 @@
 {
   "file_type": "batch_processor",
   "purpose": "Batch processing for generating multiple ArUCO marker files",
-  "dependencies": ["aruco.py", "drawing.py", "lightburn.py"],
+  "dependencies": [
+    "aruco.py", "drawing.py", "lightburn.py", "zipstream.py", "config.py", "layout.py"
+  ],
   "main_class": "BatchGenerator",
   "key_methods": {
     "generate_batch_files": "Generate multiple LightBurn files with sequential IDs",
     "generate_id_sequence_files": "Generate files with specific ID ranges",
-    "_calculate_optimal_grid": "Calculate optimal grid layout for marker count",
+    "iter_batch_zip": "Stream a sequential-ID batch as ZIP bytes",
+    "iter_id_sequence_zip": "Stream an ID-range batch as ZIP bytes",
+    "batch_hash": "Config hash (and ETag) of a deterministic batch archive",
+    "render_files": "Render file jobs on the configured pool, results in job order",
+    "close": "Shut down the worker pool",
+    "render_file": "Module-level worker: one file job to .lbrn2 bytes (picklable)",
+    "plan_sheet_layout": "Pack markers onto bed/stock sheets with label clearance",
+    "iter_sheet_zip": "Stream one .lbrn2 per planned sheet plus a utilization summary",
+    "sheet_hash": "Config hash (and ETag) of a deterministic sheet archive",
+    "render_id_list": "Render an arbitrary ID list as one packed .lbrn2",
+    "id_list_hash": "Config hash (and ETag) of a deterministic ID-list file",
+    "parse_id_list": "Module-level: parse '17, 203-204, 611' into unique marker IDs",
+    "format_id_list": "Module-level: compact an ID list back into runs for notes",
+    "_calculate_optimal_grid": "Near-square grid for a marker count",
     "_generate_batch_summary": "Create documentation for batch operations"
   },
   "ai_navigation": {
@@ -18,176 +33,620 @@
 }
 """
 
-import zipfile
+import multiprocessing
+import os
+import re
+import threading
+import time
+import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from io import BytesIO
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 from datetime import datetime
-from .aruco import ArUCOGenerator
+from .aruco import ArUCOGenerator, load_marker_atlas
 from .drawing import DrawingContext
-from .lightburn import LightBurnExporter
+from .lightburn import LightBurnExporter, DEFAULT_BITMAP_DPI
+from .zipstream import ZipStream, ordered_map, DEFAULT_COMPRESSION_LEVEL
+from .config import config_hash, FIXED_ZIP_DATE_TIME
+from .layout import LayoutPlan, plan_sheets, grid_shape, grid_positions
+
+# Where batch files are rendered: inline, on a thread pool, or on a process pool
+BATCH_POOLS = ("serial", "thread", "process")
+
+# Label text size, and the room a label needs next to its marker
+LABEL_FONT_SIZE = 3.0
+LABEL_CLEARANCE_MM = LABEL_FONT_SIZE + 1.0
+
+# Per-process generator/exporter reused by render_file
+_worker_tools = None
+
+# One entry of an ID list: a single ID or an inclusive range
+ID_LIST_ITEM = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+)\s*)?$")
+
+
+def parse_id_list(spec: str | List[int | str], max_markers: int) -> np.ndarray:
+    """Parse "17, 203-204, 611" (or a list of IDs / such strings) into marker IDs
+
+    Order is kept and repeated IDs are dropped, so exactly the listed markers are
+    rendered once each.
+    """
+    items = re.split(r"[,;\n]", spec) if isinstance(spec, str) else list(spec or [])
+    parts = []
+    for item in items:
+        if isinstance(item, str) and not item.strip():
+            continue
+        if isinstance(item, int) and not isinstance(item, bool):
+            start = end = item
+        else:
+            match = ID_LIST_ITEM.match(str(item))
+            if not match:
+                raise ValueError(f"Invalid marker ID or range: {str(item).strip()!r}")
+            start = int(match[1])
+            end = int(match[2]) if match[2] is not None else start
+        if start > end:
+            raise ValueError(f"Invalid ID range {start}-{end}")
+        if start < 0 or end >= max_markers:
+            ids = str(start) if start == end else f"{start}-{end}"
+            raise ValueError(
+                f"Marker ID {ids} outside the dictionary (0-{max_markers - 1})"
+            )
+        parts.append(np.arange(start, end + 1))
+    if not parts:
+        raise ValueError("The ID list is empty")
+
+    ids = np.concatenate(parts)
+    _, first = np.unique(ids, return_index=True)
+    return ids[np.sort(first)]
+
+
+def format_id_list(ids: List[int]) -> str:
+    """Compact IDs into runs ("17, 203-204, 611"), keeping their order"""
+    runs = []
+    for marker_id in ids:
+        marker_id = int(marker_id)
+        if runs and marker_id == runs[-1][1] + 1:
+            runs[-1][1] = marker_id
+        else:
+            runs.append([marker_id, marker_id])
+    return ", ".join(
+        str(start) if start == end else f"{start}-{end}" for start, end in runs
+    )
+
+
+def render_file(job: Dict[str, Any]) -> Tuple[str, bytes, float]:
+    """Render one batch file job to (filename, .lbrn2 bytes, render seconds)"""
+    global _worker_tools
+    started = time.perf_counter()
+    if _worker_tools is None:
+        _worker_tools = (ArUCOGenerator(), LightBurnExporter())
+    generator, exporter = _worker_tools
+    config = job["config"]
+
+    # Sheet jobs carry packed positions; plain jobs fill a rows x cols grid row by row
+    size = float(config["size_mm"])
+    if "x" in job:
+        x, y = job["x"], job["y"]
+    else:
+        pitch = size + float(config["spacing_mm"])
+        x, y = grid_positions(job["count"], job["cols"], pitch, pitch)
+    ids = job["ids"] if "ids" in job else job["start_id"] + np.arange(job["count"])
+    markers = generator.generate_positioned_table(ids, config["dictionary"], x, y, size)
+
+    # Create drawing context
+    context = DrawingContext()
+    context.add_marker_grid(
+        markers,
+        include_borders=config.get("include_borders", True),
+        include_outer_border=config.get("include_outer_border", False),
+        border_width=float(config.get("border_width", 2.0)),
+        merge=config.get("merge", "none"),
+    )
+
+    label_placement = job.get("label_placement", "below")
+    if config.get("include_labels", True) and label_placement != "none":
+        context.add_text_labels(markers, LABEL_FONT_SIZE, label_placement)
+
+    fill_mode = config.get("fill_mode", "vector")
+    toolpath = None
+    if config.get("path_order", "none") == "optimized":
+        toolpath = exporter.plan_toolpath(context, fill_mode)
+
+    payload = exporter.export(
+        context,
+        job["metadata"],
+        fill_mode=fill_mode,
+        bitmap_dpi=int(config.get("bitmap_dpi", DEFAULT_BITMAP_DPI)),
+        grouping=config.get("grouping", "shape"),
+        toolpath=toolpath,
+    ).getvalue()
+    return job["filename"], payload, time.perf_counter() - started
+
 
 class BatchGenerator:
-    def __init__(self):
+    def __init__(
+        self,
+        pool: str = "serial",
+        max_workers: int | None = None,
+        atlas_path: str | None = None,
+    ):
+        if pool not in BATCH_POOLS:
+            raise ValueError(f"Unknown batch pool: {pool}")
         self.generator = ArUCOGenerator()
         self.exporter = LightBurnExporter()
-    
-    def generate_batch_files(self, base_config: Dict[str, Any], 
-                           batch_size: int, markers_per_file: int) -> BytesIO:
+        self.pool = pool
+        self.max_workers = max_workers
+        self.atlas_path = atlas_path
+        self._executor: Executor | None = None
+        self._executor_lock = threading.Lock()
+
+    def render_files(
+        self, jobs: List[Dict[str, Any]]
+    ) -> Iterator[Tuple[str, bytes, float]]:
+        """Render file jobs on the configured pool, yielding results in job order"""
+        if self.pool == "serial" or len(jobs) <= 1:
+            return map(render_file, jobs)
+
+        # Bounded look-ahead keeps only a few rendered files in memory at once
+        window = 2 * (self.max_workers or os.cpu_count() or 1)
+        return ordered_map(self._get_executor(), render_file, jobs, window)
+
+    def close(self):
+        """Shut down the worker pool"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _get_executor(self) -> Executor:
+        """Create the worker pool on first use and keep it for later batches"""
+        with self._executor_lock:
+            if self._executor is None:
+                if self.pool == "process":
+                    # Spawned workers avoid forking a multi-threaded web server, but
+                    # inherit nothing:
+                    # each maps the marker atlas itself (or decodes the embedded tables
+                    # without one)
+                    initializer, initargs = (
+                        (load_marker_atlas, (self.atlas_path, False))
+                        if self.atlas_path
+                        else (None, ())
+                    )
+                    self._executor = ProcessPoolExecutor(
+                        self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=initializer,
+                        initargs=initargs,
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix="batch"
+                    )
+            return self._executor
+
+    def _iter_members(
+        self, jobs: List[Dict[str, Any]], timings: List[Dict[str, Any]] | None
+    ) -> Iterator[Tuple[str, bytes]]:
+        """Yield rendered (filename, payload) members in job order, recording timings"""
+        for filename, payload, seconds in self.render_files(jobs):
+            if timings is not None:
+                timings.append(
+                    {"filename": filename, "seconds": seconds, "bytes": len(payload)}
+                )
+            yield filename, payload
+
+    def generate_batch_files(
+        self,
+        base_config: Dict[str, Any],
+        batch_size: int,
+        markers_per_file: int,
+        timings: List[Dict[str, Any]] | None = None,
+        deterministic: bool = False,
+    ) -> BytesIO:
         """Generate multiple LightBurn files with sequential ID ranges"""
-        
-        zip_buffer = BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            start_id = int(base_config.get('start_id', 0))
-            
-            for batch_num in range(batch_size):
-                # Calculate ID range for this file
-                file_start_id = start_id + (batch_num * markers_per_file)
-                file_end_id = file_start_id + markers_per_file - 1
-                
-                # Create file configuration
-                file_config = base_config.copy()
-                file_config['start_id'] = file_start_id
-                
-                # Calculate grid dimensions for markers_per_file
-                rows, cols = self._calculate_optimal_grid(markers_per_file)
-                file_config['rows'] = rows
-                file_config['cols'] = cols
-                
-                # Generate markers for this file
-                markers = self.generator.generate_grid(
-                    file_start_id,
-                    file_config['dictionary'],
-                    rows, cols,
-                    float(file_config['size_mm']),
-                    float(file_config['spacing_mm'])
+        return BytesIO(
+            b"".join(
+                self.iter_batch_zip(
+                    base_config,
+                    batch_size,
+                    markers_per_file,
+                    timings,
+                    deterministic=deterministic,
                 )
-                
-                # Create drawing context
-                context = DrawingContext()
-                context.add_marker_grid(markers, 
-                                      include_borders=file_config.get('include_borders', True),
-                                      include_outer_border=file_config.get('include_outer_border', False),
-                                      border_width=float(file_config.get('border_width', 2.0)))
-                
-                if file_config.get('include_labels', True):
-                    context.add_text_labels(markers)
-                
-                # Generate metadata
-                metadata = {
-                    'Batch Number': f"{batch_num + 1} of {batch_size}",
-                    'Dictionary': file_config['dictionary'],
-                    'ID Range': f"{file_start_id}-{file_end_id}",
-                    'Grid Size': f"{rows}x{cols}",
-                    'Marker Size': f"{file_config['size_mm']}mm",
-                    'Spacing': f"{file_config['spacing_mm']}mm",
-                    'Total Markers': len(markers),
-                    'File Purpose': 'Batch Production',
-                    'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                # Export to LightBurn
-                lbrn_file = self.exporter.export(context, metadata)
-                
-                # Add to ZIP with descriptive filename
-                filename = f"aruco_batch_{batch_num+1:03d}_ids_{file_start_id}-{file_end_id}_{rows}x{cols}.lbrn2"
-                zip_file.writestr(filename, lbrn_file.getvalue())
-            
+            )
+        )
+
+    def iter_batch_zip(
+        self,
+        base_config: Dict[str, Any],
+        batch_size: int,
+        markers_per_file: int,
+        timings: List[Dict[str, Any]] | None = None,
+        compresslevel: int = DEFAULT_COMPRESSION_LEVEL,
+        deterministic: bool = False,
+        written: List[str] | None = None,
+    ) -> Iterator[bytes]:
+        """Stream a sequential-ID batch ZIP as files finish rendering and compressing
+
+        `timings` fills as files render, which runs ahead of the output; `written`
+        collects member names once their bytes have been consumed.
+
+        Deterministic archives replace timestamps with the config hash (see batch_hash)
+        and use fixed ZIP dates, so identical configs give byte-identical output.
+        """
+        digest = None
+        if deterministic:
+            digest = self.batch_hash(
+                base_config, batch_size, markers_per_file, compresslevel
+            )
+        jobs = self._batch_jobs(base_config, batch_size, markers_per_file, digest)
+
+        def members():
+            yield from self._iter_members(jobs, timings)
+
             # Add batch summary file
-            summary = self._generate_batch_summary(base_config, batch_size, markers_per_file)
-            zip_file.writestr("BATCH_SUMMARY.txt", summary)
-        
-        zip_buffer.seek(0)
-        return zip_buffer
-    
-    def generate_id_sequence_files(self, base_config: Dict[str, Any], 
-                                 id_ranges: List[Dict[str, int]]) -> BytesIO:
+            summary = self._generate_batch_summary(
+                base_config, batch_size, markers_per_file, digest
+            )
+            yield "BATCH_SUMMARY.txt", summary.encode("utf-8")
+
+        return ZipStream(compresslevel, self.max_workers).iter_zip(
+            members(), FIXED_ZIP_DATE_TIME if deterministic else None, written
+        )
+
+    def batch_hash(
+        self,
+        base_config: Dict[str, Any],
+        batch_size: int,
+        markers_per_file: int,
+        compresslevel: int = DEFAULT_COMPRESSION_LEVEL,
+    ) -> str:
+        """Config hash identifying a deterministic sequential-ID batch archive"""
+        return config_hash(
+            "batch",
+            {
+                **base_config,
+                "batch_size": batch_size,
+                "markers_per_file": markers_per_file,
+                "compression_level": compresslevel,
+            },
+        )
+
+    def generate_id_sequence_files(
+        self,
+        base_config: Dict[str, Any],
+        id_ranges: List[Dict[str, int]],
+        timings: List[Dict[str, Any]] | None = None,
+        deterministic: bool = False,
+    ) -> BytesIO:
         """Generate files with specific ID ranges"""
-        
-        zip_buffer = BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for i, id_range in enumerate(id_ranges):
-                start_id = id_range['start']
-                end_id = id_range['end']
-                markers_count = end_id - start_id + 1
-                
-                # Calculate optimal grid
-                rows, cols = self._calculate_optimal_grid(markers_count)
-                
-                # Generate markers
-                markers = self.generator.generate_grid(
-                    start_id,
-                    base_config['dictionary'],
-                    rows, cols,
-                    float(base_config['size_mm']),
-                    float(base_config['spacing_mm'])
+        return BytesIO(
+            b"".join(
+                self.iter_id_sequence_zip(
+                    base_config, id_ranges, timings, deterministic=deterministic
                 )
-                
-                # Trim markers to exact count needed
-                markers = markers[:markers_count]
-                
-                # Create drawing context
-                context = DrawingContext()
-                context.add_marker_grid(markers,
-                                      include_borders=base_config.get('include_borders', True),
-                                      include_outer_border=base_config.get('include_outer_border', False),
-                                      border_width=float(base_config.get('border_width', 2.0)))
-                
-                if base_config.get('include_labels', True):
-                    context.add_text_labels(markers)
-                
-                # Generate metadata
-                metadata = {
-                    'File Number': f"{i + 1} of {len(id_ranges)}",
-                    'Dictionary': base_config['dictionary'],
-                    'ID Range': f"{start_id}-{end_id}",
-                    'Grid Size': f"{rows}x{cols}",
-                    'Marker Size': f"{base_config['size_mm']}mm",
-                    'Spacing': f"{base_config['spacing_mm']}mm",
-                    'Total Markers': len(markers),
-                    'File Purpose': 'Custom ID Range',
-                    'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            )
+        )
+
+    def iter_id_sequence_zip(
+        self,
+        base_config: Dict[str, Any],
+        id_ranges: List[Dict[str, int]],
+        timings: List[Dict[str, Any]] | None = None,
+        compresslevel: int = DEFAULT_COMPRESSION_LEVEL,
+        deterministic: bool = False,
+    ) -> Iterator[bytes]:
+        """Stream an ID-range batch ZIP as files finish rendering and compressing"""
+        digest = None
+        if deterministic:
+            digest = config_hash(
+                "id_ranges",
+                {
+                    **base_config,
+                    "id_ranges": id_ranges,
+                    "compression_level": compresslevel,
+                },
+            )
+        jobs = self._id_range_jobs(base_config, id_ranges, digest)
+        return ZipStream(compresslevel, self.max_workers).iter_zip(
+            self._iter_members(jobs, timings),
+            FIXED_ZIP_DATE_TIME if deterministic else None,
+        )
+
+    def render_id_list(
+        self, base_config: Dict[str, Any], deterministic: bool = False
+    ) -> Tuple[str, bytes]:
+        """Render exactly the markers in base_config['ids'] as one packed file"""
+        digest = self.id_list_hash(base_config) if deterministic else None
+        filename, payload, _ = render_file(self._id_list_job(base_config, digest))
+        return filename, payload
+
+    def id_list_hash(self, base_config: Dict[str, Any]) -> str:
+        """Config hash identifying a deterministic ID-list file"""
+        return config_hash("id_list", base_config)
+
+    def plan_sheet_layout(
+        self,
+        base_config: Dict[str, Any],
+        total_markers: int,
+        sheet_width_mm: float,
+        sheet_height_mm: float,
+        margin_mm: float = 5.0,
+        label_placement: str = "auto",
+    ) -> LayoutPlan:
+        """Pack total_markers onto bed/stock sheets, leaving room for any labels"""
+        spacing = float(base_config["spacing_mm"])
+        if base_config.get("include_labels", True):
+            label_mm = LABEL_CLEARANCE_MM
+        else:
+            label_mm, label_placement = 0.0, "none"
+        return plan_sheets(
+            total_markers,
+            float(base_config["size_mm"]),
+            spacing,
+            sheet_width_mm,
+            sheet_height_mm,
+            margin_mm,
+            label_mm,
+            label_placement,
+        )
+
+    def iter_sheet_zip(
+        self,
+        base_config: Dict[str, Any],
+        plan: LayoutPlan,
+        timings: List[Dict[str, Any]] | None = None,
+        compresslevel: int = DEFAULT_COMPRESSION_LEVEL,
+        deterministic: bool = False,
+    ) -> Iterator[bytes]:
+        """Stream one .lbrn2 per planned sheet, IDs continuing across sheets"""
+        digest = (
+            self.sheet_hash(base_config, plan, compresslevel) if deterministic else None
+        )
+        jobs = self._sheet_jobs(base_config, plan, digest)
+
+        def members():
+            yield from self._iter_members(jobs, timings)
+            summary = self._generate_sheet_summary(base_config, plan, jobs, digest)
+            yield "SHEET_SUMMARY.txt", summary.encode("utf-8")
+
+        return ZipStream(compresslevel, self.max_workers).iter_zip(
+            members(), FIXED_ZIP_DATE_TIME if deterministic else None
+        )
+
+    def sheet_hash(
+        self,
+        base_config: Dict[str, Any],
+        plan: LayoutPlan,
+        compresslevel: int = DEFAULT_COMPRESSION_LEVEL,
+    ) -> str:
+        """Config hash identifying a deterministic sheet archive"""
+        return config_hash(
+            "sheets",
+            {
+                **base_config,
+                "layout": plan.to_dict(),
+                "compression_level": compresslevel,
+            },
+        )
+
+    def _sheet_jobs(
+        self, base_config: Dict[str, Any], plan: LayoutPlan, digest: str | None = None
+    ) -> List[Dict[str, Any]]:
+        """Render jobs for a plan's sheets (sequential IDs, or the config's ID list)"""
+        file_start_id = int(base_config.get("start_id", 0))
+        id_list = base_config.get("ids")
+
+        jobs = []
+        for sheet in plan.sheets:
+            file_end_id = file_start_id + sheet.count - 1
+            sheet_ids = None
+            if id_list is not None:
+                offset = file_start_id - int(base_config.get("start_id", 0))
+                sheet_ids = np.asarray(id_list[offset : offset + sheet.count])
+
+            metadata = {
+                "Sheet": f"{sheet.index + 1} of {len(plan.sheets)}",
+                "Sheet Size": (
+                    f"{plan.sheet_width}x{plan.sheet_height}mm ({plan.margin}mm margin)"
+                ),
+                "Dictionary": base_config["dictionary"],
+                **(
+                    {"IDs": format_id_list(sheet_ids)}
+                    if sheet_ids is not None
+                    else {"ID Range": f"{file_start_id}-{file_end_id}"}
+                ),
+                "Grid Size": f"{sheet.rows}x{sheet.cols}",
+                "Marker Size": f"{base_config['size_mm']}mm",
+                "Spacing": f"{base_config['spacing_mm']}mm",
+                "Label Placement": plan.label_placement,
+                "Total Markers": sheet.count,
+                "Utilization": f"{100 * sheet.utilization:.1f}%",
+                "File Purpose": "Sheet Production",
+                **self._stamp(digest),
+            }
+
+            if sheet_ids is not None:
+                filename = (
+                    f"aruco_sheet_{sheet.index + 1:03d}_{sheet.count}ids_"
+                    f"{sheet.rows}x{sheet.cols}.lbrn2"
+                )
+            else:
+                filename = (
+                    f"aruco_sheet_{sheet.index + 1:03d}_"
+                    f"ids_{file_start_id}-{file_end_id}_{sheet.rows}x{sheet.cols}.lbrn2"
+                )
+            job = {
+                "filename": filename,
+                "config": base_config,
+                "start_id": file_start_id,
+                "rows": sheet.rows,
+                "cols": sheet.cols,
+                "count": sheet.count,
+                "x": sheet.x,
+                "y": sheet.y,
+                "label_placement": plan.label_placement,
+                "metadata": metadata,
+            }
+            if sheet_ids is not None:
+                job["ids"] = sheet_ids
+            jobs.append(job)
+            file_start_id = file_end_id + 1
+
+        return jobs
+
+    def _batch_jobs(
+        self,
+        base_config: Dict[str, Any],
+        batch_size: int,
+        markers_per_file: int,
+        digest: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Build render jobs for files with sequential ID ranges"""
+        start_id = int(base_config.get("start_id", 0))
+
+        # Calculate grid dimensions for markers_per_file
+        rows, cols = self._calculate_optimal_grid(markers_per_file)
+
+        jobs = []
+        for batch_num in range(batch_size):
+            # Calculate ID range for this file
+            file_start_id = start_id + (batch_num * markers_per_file)
+            file_end_id = file_start_id + markers_per_file - 1
+
+            # Generate metadata
+            metadata = {
+                "Batch Number": f"{batch_num + 1} of {batch_size}",
+                "Dictionary": base_config["dictionary"],
+                "ID Range": f"{file_start_id}-{file_end_id}",
+                "Grid Size": f"{rows}x{cols}",
+                "Marker Size": f"{base_config['size_mm']}mm",
+                "Spacing": f"{base_config['spacing_mm']}mm",
+                "Total Markers": markers_per_file,
+                "File Purpose": "Batch Production",
+                **self._stamp(digest),
+            }
+
+            # Descriptive filename per file
+            jobs.append(
+                {
+                    "filename": (
+                        f"aruco_batch_{batch_num+1:03d}_"
+                        f"ids_{file_start_id}-{file_end_id}_{rows}x{cols}.lbrn2"
+                    ),
+                    "config": base_config,
+                    "start_id": file_start_id,
+                    "rows": rows,
+                    "cols": cols,
+                    "count": markers_per_file,
+                    "metadata": metadata,
+                }
+            )
+
+        return jobs
+
+    def _id_range_jobs(
+        self,
+        base_config: Dict[str, Any],
+        id_ranges: List[Dict[str, int]],
+        digest: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Build render jobs for files with specific ID ranges"""
+        jobs = []
+        for i, id_range in enumerate(id_ranges):
+            start_id = id_range["start"]
+            end_id = id_range["end"]
+            markers_count = end_id - start_id + 1
+
+            # Calculate optimal grid
+            rows, cols = self._calculate_optimal_grid(markers_count)
+
+            # Generate metadata
+            metadata = {
+                "File Number": f"{i + 1} of {len(id_ranges)}",
+                "Dictionary": base_config["dictionary"],
+                "ID Range": f"{start_id}-{end_id}",
+                "Grid Size": f"{rows}x{cols}",
+                "Marker Size": f"{base_config['size_mm']}mm",
+                "Spacing": f"{base_config['spacing_mm']}mm",
+                "Total Markers": markers_count,
+                "File Purpose": "Custom ID Range",
+                **self._stamp(digest),
+            }
+
+            jobs.append(
+                {
+                    "filename": f"aruco_range_{start_id}-{end_id}_{rows}x{cols}.lbrn2",
+                    "config": base_config,
+                    "start_id": start_id,
+                    "rows": rows,
+                    "cols": cols,
+                    "count": markers_count,
+                    "metadata": metadata,
                 }
-                
-                # Export to LightBurn
-                lbrn_file = self.exporter.export(context, metadata)
-                
-                # Add to ZIP
-                filename = f"aruco_range_{start_id}-{end_id}_{rows}x{cols}.lbrn2"
-                zip_file.writestr(filename, lbrn_file.getvalue())
-        
-        zip_buffer.seek(0)
-        return zip_buffer
-    
+            )
+
+        return jobs
+
+    def _id_list_job(
+        self, base_config: Dict[str, Any], digest: str | None = None
+    ) -> Dict[str, Any]:
+        """Render job for an ID list packed row by row into a near-square grid"""
+        ids = np.asarray(base_config["ids"])
+        rows, cols = self._calculate_optimal_grid(len(ids))
+        metadata = {
+            "Dictionary": base_config["dictionary"],
+            "IDs": format_id_list(ids),
+            "Grid Size": f"{rows}x{cols}",
+            "Marker Size": f"{base_config['size_mm']}mm",
+            "Spacing": f"{base_config['spacing_mm']}mm",
+            "Total Markers": len(ids),
+            "File Purpose": "ID List",
+            **self._stamp(digest),
+        }
+        return {
+            "filename": (
+                f"aruco_ids_{base_config['dictionary']}_{len(ids)}markers_"
+                f"{rows}x{cols}.lbrn2"
+            ),
+            "config": base_config,
+            "ids": ids,
+            "rows": rows,
+            "cols": cols,
+            "count": len(ids),
+            "metadata": metadata,
+        }
+
+    def _stamp(self, digest: str | None) -> Dict[str, str]:
+        """Metadata identifying the render: config hash if deterministic, else time"""
+        if digest:
+            return {"Config Hash": digest}
+        return {"Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
     def _calculate_optimal_grid(self, marker_count: int) -> tuple[int, int]:
-        """Calculate optimal rows/cols for given marker count"""
-        if marker_count == 1:
-            return 1, 1
-        
-        # Try to make as square as possible
-        rows = int(marker_count ** 0.5)
-        while marker_count % rows != 0:
-            rows -= 1
-        cols = marker_count // rows
-        
-        # Prefer landscape orientation
-        if rows > cols:
-            rows, cols = cols, rows
-            
-        return rows, cols
-    
-    def _generate_batch_summary(self, config: Dict[str, Any], 
-                              batch_size: int, markers_per_file: int) -> str:
+        """Optimal rows/cols for a marker count (near-square, last row partial)"""
+        return grid_shape(marker_count)
+
+    def _generate_batch_summary(
+        self,
+        config: Dict[str, Any],
+        batch_size: int,
+        markers_per_file: int,
+        digest: str | None = None,
+    ) -> str:
         """Generate batch summary documentation"""
         total_markers = batch_size * markers_per_file
-        start_id = int(config.get('start_id', 0))
+        start_id = int(config.get("start_id", 0))
         end_id = start_id + total_markers - 1
-        
+
+        if digest:
+            stamp = f"Config Hash: {digest}"
+        else:
+            stamp = f"Generation Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+
         summary = f"""ArUCO BATCH GENERATION SUMMARY
 ==============================
 
-Generation Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+{stamp}
 Generated by: ArUCO LightBurn Generator v1.0
 
 BATCH CONFIGURATION:
@@ -203,15 +662,18 @@ BATCH CONFIGURATION:
 
 FILE LIST:
 """
-        
+
         for i in range(batch_size):
             file_start = start_id + (i * markers_per_file)
             file_end = file_start + markers_per_file - 1
             rows, cols = self._calculate_optimal_grid(markers_per_file)
-            
-            summary += f"  {i+1:3d}. aruco_batch_{i+1:03d}_ids_{file_start}-{file_end}_{rows}x{cols}.lbrn2\n"
-        
-        summary += f"""
+
+            summary += (
+                f"  {i+1:3d}. aruco_batch_{i+1:03d}_"
+                f"ids_{file_start}-{file_end}_{rows}x{cols}.lbrn2\n"
+            )
+
+        summary += """
 MATERIAL SETTINGS:
 - Optimized for 1/16" White/Black 2-Ply Cast Acrylic
 - Cut: 150mm/min @ 75% power
@@ -227,4 +689,48 @@ PRODUCTION NOTES:
 
 For support: ArUCO LightBurn Generator Documentation
 """
-        return summary
\ No newline at end of file
+        return summary
+
+    def _generate_sheet_summary(
+        self,
+        config: Dict[str, Any],
+        plan: LayoutPlan,
+        jobs: List[Dict[str, Any]],
+        digest: str | None = None,
+    ) -> str:
+        """Generate sheet layout summary with per-sheet utilization"""
+        report = plan.to_dict()
+        if digest:
+            stamp = f"Config Hash: {digest}"
+        else:
+            stamp = f"Generation Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+
+        summary = f"""ArUCO SHEET LAYOUT SUMMARY
+==========================
+
+{stamp}
+Generated by: ArUCO LightBurn Generator v1.0
+
+SHEET CONFIGURATION:
+- Dictionary: {config['dictionary']}
+- Sheet Size: {plan.sheet_width}x{plan.sheet_height}mm
+- Margin: {plan.margin}mm
+- Marker Size: {config['size_mm']}mm
+- Spacing: {config['spacing_mm']}mm
+- Label Placement: {plan.label_placement}
+- Markers per Full Sheet: {plan.capacity}
+- Total Markers: {report['total_markers']}
+- Sheets: {report['sheet_count']}
+- Overall Utilization: {report['overall_utilization_pct']}%
+
+SHEETS:
+"""
+
+        for job, sheet in zip(jobs, report["sheets"]):
+            summary += (
+                f"  {sheet['sheet']:3d}. {job['filename']} - "
+                f"{sheet['markers']} markers, "
+                f"{sheet['used_width_mm']}x{sheet['used_height_mm']}mm used, "
+                f"{sheet['utilization_pct']}% utilization\n"
+            )
+        return summary
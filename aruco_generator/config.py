@@ -0,0 +1,62 @@
+"""
+{
+  "file_type": "render_config",
+  "purpose": "Canonical render configs and content hashes for ETags",
+  "dependencies": ["numpy"],
+  "key_functions": {
+    "canonical_config": "Serialize a parsed config to canonical JSON",
+    "config_hash": "SHA-256 of render kind, render version and canonical config"
+  },
+  "ai_navigation": {
+    "modify_for": "Bump RENDER_VERSION whenever output changes for an unchanged config",
+    "used_by": ["web.py", "batch.py"],
+    "output_format": "Hex digests used as strong ETags and in deterministic output"
+  }
+}
+"""
+
+import hashlib
+import json
+from typing import Dict, Any
+
+import numpy as np
+
+# Part of every hash, so cached ETags are invalidated when rendering changes
+RENDER_VERSION = 4
+
+# ZIP member timestamp used in deterministic mode (earliest DOS date)
+FIXED_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def canonical_config(config: Dict[str, Any]) -> str:
+    """Serialize a parsed config to canonical JSON (sorted keys, exact float reprs)"""
+    return json.dumps(
+        {key: _normalize(value) for key, value in config.items()},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+
+def config_hash(kind: str, config: Dict[str, Any]) -> str:
+    """Hex SHA-256 identifying the output of rendering `config` as `kind`"""
+    payload = f"{kind}:{RENDER_VERSION}:{canonical_config(config)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    """Convert numpy values to Python so equal configs serialize identically"""
+    if isinstance(value, (np.ndarray, np.generic)):
+        value = value.tolist()
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        # json writes float repr, which round-trips exactly: rounding here would give
+        # configs rendering different bytes (10.0000001 vs 10.0) the same hash
+        return value
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    # str() could truncate (numpy reprs) or collide, and equal hashes must mean equal
+    # output
+    raise TypeError(f"Cannot hash config value of type {type(value).__name__}")
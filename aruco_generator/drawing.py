@@ -2,143 +2,642 @@
 {
   "file_type": "svg_drawing_context",
   "purpose": "SVG drawing and rendering system for ArUCO markers",
-  "dependencies": ["numpy"],
+  "dependencies": ["numpy", "geometry.py", "aruco.py (MarkerTable)"],
   "main_class": "DrawingContext",
+  "storage": "Rectangles in RectStore (NumPy column buffers); paths and text in shapes",
   "key_methods": {
     "add_rectangle": "Add rectangle shapes to drawing context",
-    "add_marker_grid": "Add ArUCO markers as filled rectangles",
-    "add_text_labels": "Add text labels below markers",
-    "get_svg": "Generate SVG preview output"
+    "add_rectangles": "Bulk-append rectangle arrays to the rect store",
+    "add_path": "Add closed multi-loop outline shapes (outlines with holes)",
+    "add_marker_grid": "Add markers as filled rectangles (per module or per pixel)",
+    "add_text_labels": "Add text labels below markers or rotated beside them",
+    "get_svg": "Generate SVG preview output",
+    "iter_svg": "Stream SVG preview in chunks (compact=True: one path per marker)",
+    "elements": "Compatibility list of per-element dicts"
   },
   "ai_navigation": {
     "modify_for": "Adding new drawing elements or SVG features",
-    "used_by": ["web.py", "lightburn.py"],
+    "used_by": ["web.py", "lightburn.py", "batch.py"],
     "output_format": "SVG strings for web preview"
   }
 }
 """
 
 import numpy as np
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Iterator
+from .aruco import MarkerTable
+from .geometry import MERGE_STRATEGIES, merge_runs, merge_greedy, trace_outlines
+
+# Elements serialized per chunk by DrawingContext.iter_svg
+SVG_CHUNK_ELEMENTS = 1024
+
+
+class RectStore:
+    """Growable struct-of-arrays buffer of rectangles"""
+
+    FIELDS = {
+        "x": np.float64,
+        "y": np.float64,
+        "width": np.float64,
+        "height": np.float64,
+        "layer": np.int8,
+        "marker_id": np.int32,  # -1 when the rectangle belongs to no marker
+        "fill": np.bool_,
+    }
+
+    def __init__(self, capacity: int = 256):
+        self._size = 0
+        self._buffers = {
+            name: np.empty(capacity, dtype=dtype) for name, dtype in self.FIELDS.items()
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        """Expose each field as a view of its filled part (store.x, store.layer, ...)"""
+        buffers = self.__dict__.get("_buffers")
+        if buffers is None or name not in buffers:
+            raise AttributeError(name)
+        return buffers[name][: self._size]
+
+    def append(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        fill: bool,
+        layer: int,
+        marker_id: int | None,
+    ):
+        """Append a single rectangle"""
+        self._reserve(1)
+        i = self._size
+        buffers = self._buffers
+        buffers["x"][i] = x
+        buffers["y"][i] = y
+        buffers["width"][i] = width
+        buffers["height"][i] = height
+        buffers["layer"][i] = layer
+        buffers["marker_id"][i] = -1 if marker_id is None else marker_id
+        buffers["fill"][i] = fill
+        self._size += 1
+
+    def extend(self, x, y, width, height, fill, layer, marker_id):
+        """Append rectangles from arrays; scalars broadcast to the array length"""
+        x = np.asarray(x, dtype=np.float64)
+        count = x.shape[0]
+        if count == 0:
+            return
+        self._reserve(count)
+        start, end = self._size, self._size + count
+        for name, values in (
+            ("x", x),
+            ("y", y),
+            ("width", width),
+            ("height", height),
+            ("layer", layer),
+            ("marker_id", marker_id),
+            ("fill", fill),
+        ):
+            self._buffers[name][start:end] = values
+        self._size = end
+
+    def bounds(self) -> Tuple[float, float, float, float] | None:
+        """Return (min_x, min_y, max_x, max_y) of all rectangles, or None if empty"""
+        if not self._size:
+            return None
+        x, y = self.x, self.y
+        return (
+            float(x.min()),
+            float(y.min()),
+            float((x + self.width).max()),
+            float((y + self.height).max()),
+        )
+
+    def _reserve(self, count: int):
+        """Grow buffers geometrically to fit count more rectangles"""
+        needed = self._size + count
+        capacity = len(self._buffers["x"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, buffer in self._buffers.items():
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[: self._size] = buffer[: self._size]
+            self._buffers[name] = grown
+
 
 class DrawingContext:
     def __init__(self):
-        self.elements = []
-        self.bounds = {'min_x': 0.0, 'min_y': 0.0, 'max_x': 0.0, 'max_y': 0.0}
-    
-    def add_rectangle(self, x: float, y: float, width: float, height: float, 
-                     fill: bool = True, layer: int = 0, marker_id: int | None = None):
+        self.rects = RectStore()
+        self.shapes = []  # path and text elements
+        self.marker_cells = (
+            []
+        )  # (marker_id, x, y, size, module grid) for cell-geometry markers
+        self._shape_bounds = {"min_x": 0.0, "min_y": 0.0, "max_x": 0.0, "max_y": 0.0}
+
+    @property
+    def elements(self) -> List[Dict[str, Any]]:
+        """Compatibility view: rectangles then other shapes as per-element dicts"""
+        return list(self.iter_elements())
+
+    def iter_elements(self) -> Iterator[Dict[str, Any]]:
+        """Yield every element as a dict (slow path for legacy consumers)"""
+        rects = self.rects
+        for x, y, width, height, fill, layer, marker_id in zip(
+            rects.x.tolist(),
+            rects.y.tolist(),
+            rects.width.tolist(),
+            rects.height.tolist(),
+            rects.fill.tolist(),
+            rects.layer.tolist(),
+            rects.marker_id.tolist(),
+        ):
+            element = {
+                "type": "rect",
+                "x": x,
+                "y": y,
+                "width": width,
+                "height": height,
+                "fill": fill,
+                "layer": layer,
+            }
+            if marker_id >= 0:
+                element["marker_id"] = marker_id
+            yield element
+        yield from self.shapes
+
+    @property
+    def bounds(self) -> Dict[str, float]:
+        """Drawing bounds, always including the origin"""
+        bounds = dict(self._shape_bounds)
+        rect_bounds = self.rects.bounds()
+        if rect_bounds is not None:
+            min_x, min_y, max_x, max_y = rect_bounds
+            bounds["min_x"] = min(bounds["min_x"], min_x)
+            bounds["min_y"] = min(bounds["min_y"], min_y)
+            bounds["max_x"] = max(bounds["max_x"], max_x)
+            bounds["max_y"] = max(bounds["max_y"], max_y)
+        return bounds
+
+    def add_rectangle(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        fill: bool = True,
+        layer: int = 0,
+        marker_id: int | None = None,
+    ):
         """Add rectangle to drawing context"""
-        element = {
-            'type': 'rect',
-            'x': x, 'y': y, 
-            'width': width, 
-            'height': height,
-            'fill': fill, 
-            'layer': layer
-        }
+        self.rects.append(x, y, width, height, fill, layer, marker_id)
+
+    def add_rectangles(
+        self, x, y, width, height, fill: bool = True, layer: int = 0, marker_id=-1
+    ):
+        """Add many rectangles at once from arrays (scalars broadcast)"""
+        self.rects.extend(x, y, width, height, fill, layer, marker_id)
+
+    def add_path(
+        self,
+        loops: List[List[Tuple[float, float]]],
+        fill: bool = True,
+        layer: int = 0,
+        marker_id: int | None = None,
+    ):
+        """Add closed path of one or more loops (holes wind opposite to outlines)"""
+        element = {"type": "path", "loops": loops, "fill": fill, "layer": layer}
         if marker_id is not None:
-            element['marker_id'] = marker_id
-            
-        self.elements.append(element)
-        self._update_bounds(x, y, width, height)
-    
-    def add_marker_grid(self, markers: List[Dict[str, Any]], include_borders: bool = True, include_outer_border: bool = False, border_width: float = 2.0):
-        """Add ArUCO markers as filled rectangles"""
-        for marker in markers:
-            image = marker['image']
-            size = marker['size']
-            x, y = marker['x'], marker['y']
-            marker_id = marker['id']
-            
-            # Add border if requested
-            if include_borders:
-                self.add_rectangle(x, y, size, size, fill=False, layer=1, marker_id=marker_id)
-            
-            # Convert ArUCO image to rectangles
-            pixel_size = size / image.shape[0]
-            
-            for row in range(image.shape[0]):
-                for col in range(image.shape[1]):
-                    if image[row, col] == 0:  # Black pixel in ArUCO
-                        px_x = x + col * pixel_size
-                        px_y = y + row * pixel_size
-                        self.add_rectangle(px_x, px_y, pixel_size, pixel_size, 
-                                         fill=True, layer=0, marker_id=marker_id)
-        
+            element["marker_id"] = marker_id
+
+        self.shapes.append(element)
+        xs = [point[0] for loop in loops for point in loop]
+        ys = [point[1] for loop in loops for point in loop]
+        self._update_bounds(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+
+    def add_marker_grid(
+        self,
+        markers: List[Dict[str, Any]] | MarkerTable,
+        include_borders: bool = True,
+        include_outer_border: bool = False,
+        border_width: float = 2.0,
+        merge: str = "none",
+    ) -> Dict[str, Any]:
+        """Add ArUCO markers as filled shapes and return a shape-count report
+
+        merge selects how black modules are combined: "none" (one square per
+        module), "runs"/"greedy" (merged rectangles) or "contours" (outline paths).
+        """
+        if merge not in MERGE_STRATEGIES:
+            raise ValueError(f"Unknown merge strategy: {merge}")
+
+        if isinstance(markers, MarkerTable) and merge == "none":
+            cell_count = self._add_marker_table(markers, include_borders)
+            shape_count = cell_count
+        else:
+            cell_count, shape_count = self._add_marker_records(
+                markers, include_borders, merge
+            )
+
         # Add outer border around entire grid if requested
-        if include_outer_border and markers:
+        if include_outer_border and len(markers):
             # Calculate grid bounds
-            min_x = min(float(marker['x']) for marker in markers)
-            min_y = min(float(marker['y']) for marker in markers)
-            max_x = max(float(marker['x'] + marker['size']) for marker in markers)
-            max_y = max(float(marker['y'] + marker['size']) for marker in markers)
-            
+            min_x = min(float(marker["x"]) for marker in markers)
+            min_y = min(float(marker["y"]) for marker in markers)
+            max_x = max(float(marker["x"] + marker["size"]) for marker in markers)
+            max_y = max(float(marker["y"] + marker["size"]) for marker in markers)
+
             # Add outer border rectangle
             border_x = min_x - border_width
             border_y = min_y - border_width
             border_w = (max_x - min_x) + (2 * border_width)
             border_h = (max_y - min_y) + (2 * border_width)
-            
-            self.add_rectangle(border_x, border_y, border_w, border_h, fill=False, layer=1)
-    
-    def add_text_labels(self, markers: List[Dict[str, Any]], font_size: float = 3.0):
-        """Add text labels below each marker"""
+
+            self.add_rectangle(
+                border_x, border_y, border_w, border_h, fill=False, layer=1
+            )
+
+        return {
+            "strategy": merge,
+            "cells": cell_count,
+            "shapes": shape_count,
+            "reduction_pct": round(100.0 * (1 - shape_count / cell_count), 1)
+            if cell_count
+            else 0.0,
+        }
+
+    def _add_marker_table(self, table: MarkerTable, include_borders: bool) -> int:
+        """Vectorized path: one rectangle per black module for every marker at once"""
+        marker_index, rows, cols = np.nonzero(table.bits)
+        cell_size = table.size / table.bits.shape[1]
+        cell = cell_size[marker_index]
+
+        x = table.x[marker_index] + cols * cell
+        y = table.y[marker_index] + rows * cell
+        width = cell
+        fill = np.ones(len(marker_index), dtype=bool)
+        owner = marker_index
+
+        if include_borders:
+            # Interleave so each marker's border precedes its modules
+            x = np.concatenate((table.x, x))
+            y = np.concatenate((table.y, y))
+            width = np.concatenate((table.size, width))
+            fill = np.concatenate((np.zeros(len(table), dtype=bool), fill))
+            owner = np.concatenate((np.arange(len(table)), owner))
+            order = np.lexsort((fill, owner))
+            x, y, width, fill, owner = (
+                x[order],
+                y[order],
+                width[order],
+                fill[order],
+                owner[order],
+            )
+
+        self.rects.extend(
+            x, y, width, width, fill, np.where(fill, 0, 1), table.ids[owner]
+        )
+        self.marker_cells.extend(
+            zip(
+                table.ids.tolist(),
+                table.x.tolist(),
+                table.y.tolist(),
+                table.size.tolist(),
+                table.bits,
+            )
+        )
+        return len(marker_index)
+
+    def _add_marker_records(
+        self, markers, include_borders: bool, merge: str
+    ) -> Tuple[int, int]:
+        """Per-marker path supporting pixel images and every merge strategy"""
+        cell_count = 0
+        shape_count = 0
+
+        for marker in markers:
+            size = marker["size"]
+            x, y = marker["x"], marker["y"]
+            marker_id = marker["id"]
+
+            # Add border if requested
+            if include_borders:
+                self.add_rectangle(
+                    x, y, size, size, fill=False, layer=1, marker_id=marker_id
+                )
+
+            # Cell geometry uses the module matrix, legacy geometry the raster image
+            if "bits" in marker:
+                grid = marker["bits"].astype(bool)
+                self.marker_cells.append((marker_id, x, y, size, marker["bits"]))
+            else:
+                grid = marker["image"] == 0  # Black pixel in ArUCO
+            cell_size = size / grid.shape[0]
+            cell_count += int(grid.sum())
+
+            if merge == "contours":
+                loop_groups = self._group_loops(trace_outlines(grid))
+                for loop_group in loop_groups:
+                    self.add_path(
+                        [
+                            [
+                                (x + vx * cell_size, y + vy * cell_size)
+                                for vx, vy in loop
+                            ]
+                            for loop in loop_group
+                        ],
+                        fill=True,
+                        layer=0,
+                        marker_id=marker_id,
+                    )
+                shape_count += len(loop_groups)
+                continue
+
+            if merge == "runs":
+                rects = np.array(merge_runs(grid), dtype=np.float64).reshape(-1, 4)
+            elif merge == "greedy":
+                rects = np.array(merge_greedy(grid), dtype=np.float64).reshape(-1, 4)
+            else:
+                rows, cols = np.nonzero(grid)
+                rects = np.column_stack(
+                    (rows, cols, np.ones(len(rows)), np.ones(len(rows)))
+                )
+
+            self.add_rectangles(
+                x + rects[:, 1] * cell_size,
+                y + rects[:, 0] * cell_size,
+                rects[:, 3] * cell_size,
+                rects[:, 2] * cell_size,
+                fill=True,
+                layer=0,
+                marker_id=marker_id,
+            )
+            shape_count += len(rects)
+
+        return cell_count, shape_count
+
+    @staticmethod
+    def _group_loops(
+        loops: List[List[Tuple[int, int]]]
+    ) -> List[List[List[Tuple[int, int]]]]:
+        """Group traced loops into outlines, each followed by the holes it contains"""
+        outlines, holes = [], []
+        for loop in loops:
+            # Shoelace area: positive for clockwise outlines with y pointing down
+            area = (
+                sum(
+                    x1 * y2 - x2 * y1
+                    for (x1, y1), (x2, y2) in zip(loop, loop[1:] + loop[:1])
+                )
+                / 2
+            )
+            if area > 0:
+                outlines.append((area, loop))
+            else:
+                holes.append(loop)
+
+        outlines.sort(key=lambda item: item[0])
+        groups = {id(loop): [loop] for _, loop in outlines}
+        for hole in holes:
+            # The first traced vertex is the hole's top-left corner, so the cell
+            # diagonally below-right of it lies inside the hole
+            probe = (hole[0][0] + 0.5, hole[0][1] + 0.5)
+            for _, loop in outlines:  # smallest enclosing outline wins
+                if DrawingContext._point_in_loop(probe, loop):
+                    groups[id(loop)].append(hole)
+                    break
+        return [
+            groups[id(loop)]
+            for _, loop in sorted(outlines, key=lambda item: item[1][0])
+        ]
+
+    @staticmethod
+    def _point_in_loop(point: Tuple[float, float], loop: List[Tuple[int, int]]) -> bool:
+        """Even-odd point-in-polygon test"""
+        px, py = point
+        inside = False
+        for (x1, y1), (x2, y2) in zip(loop, loop[1:] + loop[:1]):
+            if (y1 > py) != (y2 > py) and px < x1 + (py - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+    def add_text_labels(
+        self,
+        markers: List[Dict[str, Any]],
+        font_size: float = 3.0,
+        placement: str = "below",
+    ):
+        """Add text labels below each marker, or rotated beside it ("beside")"""
         import html
+
+        if placement not in ("below", "beside"):
+            raise ValueError(f"Unknown label placement: {placement}")
         for marker in markers:
-            x = marker['x']
-            y = marker['y'] + marker['size'] + font_size
+            if placement == "beside":
+                # Reads bottom-to-top along the marker's right edge
+                x = marker["x"] + marker["size"] + font_size
+                y = marker["y"] + marker["size"]
+            else:
+                x = marker["x"]
+                y = marker["y"] + marker["size"] + font_size
             # Escape HTML/XML special characters to prevent XSS
             text = f"ID: {html.escape(str(marker['id']))}"
-            
-            self.elements.append({
-                'type': 'text',
-                'x': x,
-                'y': y,
-                'text': text,
-                'font_size': font_size,
-                'layer': 2,
-                'marker_id': marker['id']
-            })
-    
+
+            label = {
+                "type": "text",
+                "x": x,
+                "y": y,
+                "text": text,
+                "font_size": font_size,
+                "layer": 2,
+                "marker_id": marker["id"],
+            }
+            if placement == "beside":
+                label["rotation"] = -90
+            self.shapes.append(label)
+
     def _update_bounds(self, x: float, y: float, width: float, height: float):
-        """Update drawing bounds"""
-        if self.bounds['min_x'] is None or x < self.bounds['min_x']:
-            self.bounds['min_x'] = x
-        if self.bounds['min_y'] is None or y < self.bounds['min_y']:
-            self.bounds['min_y'] = y
-        if self.bounds['max_x'] is None or (x + width) > self.bounds['max_x']:
-            self.bounds['max_x'] = x + width
-        if self.bounds['max_y'] is None or (y + height) > self.bounds['max_y']:
-            self.bounds['max_y'] = y + height
-    
-    def get_svg(self) -> str:
+        """Update bounds of non-rectangle shapes (rectangle bounds come on demand)"""
+        bounds = self._shape_bounds
+        bounds["min_x"] = min(bounds["min_x"], x)
+        bounds["min_y"] = min(bounds["min_y"], y)
+        bounds["max_x"] = max(bounds["max_x"], x + width)
+        bounds["max_y"] = max(bounds["max_y"], y + height)
+
+    def get_svg(self, compact: bool = False) -> str:
         """Generate SVG preview"""
-        width = self.bounds['max_x'] - self.bounds['min_x']
-        height = self.bounds['max_y'] - self.bounds['min_y']
-        
-        svg = f'''<svg width="{width:.1f}mm" height="{height:.1f}mm" 
-                       viewBox="{self.bounds['min_x']:.1f} {self.bounds['min_y']:.1f} {width:.1f} {height:.1f}" 
-                       xmlns="http://www.w3.org/2000/svg">
-                  <style>
-                    .cut {{ fill: black; stroke: none; }}
-                    .mark {{ fill: none; stroke: blue; stroke-width: 0.1; }}
-                    .text {{ fill: red; font-family: Arial; font-size: 3px; }}
-                  </style>'''
-        
-        for element in self.elements:
-            if element['type'] == 'rect':
-                if element['fill']:
-                    css_class = 'cut'
-                else:
-                    css_class = 'mark'
-                
-                svg += f'''<rect x="{element['x']:.3f}" y="{element['y']:.3f}" 
-                               width="{element['width']:.3f}" height="{element['height']:.3f}" 
-                               class="{css_class}" />'''
-            elif element['type'] == 'text':
-                svg += f'''<text x="{element['x']:.3f}" y="{element['y']:.3f}" 
-                               class="text">{element['text']}</text>'''
-        
-        svg += '</svg>'
-        return svg
+        return "".join(self.iter_svg(compact=compact))
+
+    def iter_svg(
+        self, chunk_elements: int = SVG_CHUNK_ELEMENTS, compact: bool = False
+    ) -> Iterator[str]:
+        """Yield the SVG document in chunks of roughly chunk_elements elements
+
+        compact=True writes one <path> per marker in integer cell units placed by a
+        transform, with borders and labels grouped per layer.
+        """
+        bounds = self.bounds
+        min_x, min_y = bounds["min_x"], bounds["min_y"]
+        width = bounds["max_x"] - min_x
+        height = bounds["max_y"] - min_y
+
+        yield (
+            f'<svg width="{width:.1f}mm" height="{height:.1f}mm" '
+            f'viewBox="{min_x:.1f} {min_y:.1f} {width:.1f} {height:.1f}" '
+            'xmlns="http://www.w3.org/2000/svg">'
+            "<style>"
+            ".cut{fill:black;stroke:none}"
+            ".mark{fill:none;stroke:blue;stroke-width:0.1}"
+            ".text{fill:red;font-family:Arial;font-size:3px}"
+            "</style>\n"
+        )
+
+        if compact:
+            yield from self._iter_compact_svg(chunk_elements)
+        else:
+            rects = self.rects
+            columns = (rects.x, rects.y, rects.width, rects.height, rects.fill)
+            for start in range(0, len(rects), chunk_elements):
+                stop = start + chunk_elements
+                yield "".join(
+                    f'<rect x="{x:.3f}" y="{y:.3f}" '
+                    f'width="{rect_width:.3f}" height="{rect_height:.3f}" '
+                    f'class="{"cut" if fill else "mark"}"/>\n'
+                    for x, y, rect_width, rect_height, fill in zip(
+                        *(column[start:stop].tolist() for column in columns)
+                    )
+                )
+
+            for start in range(0, len(self.shapes), chunk_elements):
+                yield "".join(
+                    self._svg_shape(element)
+                    for element in self.shapes[start : start + chunk_elements]
+                )
+
+        yield "</svg>"
+
+    def _iter_compact_svg(self, chunk_elements: int) -> Iterator[str]:
+        """Compact body: per-marker cell paths, then leftovers, borders and labels"""
+        compact_ids = np.array(
+            [cells[0] for cells in self.marker_cells], dtype=np.int32
+        )
+        compact_id_set = set(compact_ids.tolist())
+
+        yield '<g class="cut">\n'
+        for start in range(0, len(self.marker_cells), chunk_elements):
+            yield "".join(
+                f'<path transform="translate({_fmt(x)} {_fmt(y)}) '
+                f'scale({_fmt(size / bits.shape[0], 6)})" '
+                f'd="{_cell_path_data(bits.tobytes(), bits.shape[0])}"/>\n'
+                for _, x, y, size, bits in self.marker_cells[
+                    start : start + chunk_elements
+                ]
+            )
+
+        # Fill geometry of markers without a module grid (pixel geometry) stays explicit
+        rects = self.rects
+        covered = rects.fill & np.isin(rects.marker_id, compact_ids)
+        yield from self._iter_compact_rects(~covered & rects.fill, chunk_elements)
+        yield "".join(
+            self._svg_shape(element, with_class=False)
+            for element in self.shapes
+            if element["type"] == "path"
+            and element["fill"]
+            and element.get("marker_id") not in compact_id_set
+        )
+        yield "</g>\n"
+
+        yield '<g class="mark">\n'
+        yield from self._iter_compact_rects(~rects.fill, chunk_elements)
+        yield "".join(
+            self._svg_shape(element, with_class=False)
+            for element in self.shapes
+            if element["type"] == "path" and not element["fill"]
+        )
+        yield "</g>\n"
+
+        texts = [element for element in self.shapes if element["type"] == "text"]
+        yield '<g class="text">\n'
+        for start in range(0, len(texts), chunk_elements):
+            yield "".join(
+                self._svg_shape(element, with_class=False)
+                for element in texts[start : start + chunk_elements]
+            )
+        yield "</g>\n"
+
+    def _iter_compact_rects(
+        self, mask: np.ndarray, chunk_elements: int
+    ) -> Iterator[str]:
+        """Serialize selected rectangles without class attributes or padding zeros"""
+        rects = self.rects
+        columns = [
+            column[mask].tolist()
+            for column in (rects.x, rects.y, rects.width, rects.height)
+        ]
+        for start in range(0, len(columns[0]), chunk_elements):
+            stop = start + chunk_elements
+            yield "".join(
+                f'<rect x="{_fmt(x)}" y="{_fmt(y)}" '
+                f'width="{_fmt(rect_width)}" height="{_fmt(rect_height)}"/>\n'
+                for x, y, rect_width, rect_height in zip(
+                    *(column[start:stop] for column in columns)
+                )
+            )
+
+    @staticmethod
+    def _svg_shape(element: Dict[str, Any], with_class: bool = True) -> str:
+        """Serialize one path or text element (class omitted inside layer groups)"""
+        if element["type"] == "path":
+            css_class = (
+                f' class="{"cut" if element["fill"] else "mark"}"' if with_class else ""
+            )
+            path_data = "".join(
+                "M" + "L".join(f"{px:.3f} {py:.3f}" for px, py in loop) + "Z"
+                for loop in element["loops"]
+            )
+            return f'<path d="{path_data}" fill-rule="evenodd"{css_class}/>\n'
+        if element["type"] == "text":
+            css_class = ' class="text"' if with_class else ""
+            rotation = element.get("rotation")
+            transform = (
+                f' transform="rotate({rotation} {element["x"]:.3f} {element["y"]:.3f})"'
+                if rotation
+                else ""
+            )
+            return (
+                f'<text x="{element["x"]:.3f}" y="{element["y"]:.3f}"'
+                f"{transform}{css_class}>"
+                f'{element["text"]}</text>\n'
+            )
+        return ""
+
+
+def _fmt(value: float, decimals: int = 3) -> str:
+    """Format a number with at most the given decimals and no trailing zeros"""
+    text = f"{value:.{decimals}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("", "-0") else text
+
+
+@lru_cache(maxsize=8192)
+def _cell_path_data(grid_bytes: bytes, cells: int) -> str:
+    """Relative h/v path data (integer cell units) outlining a marker's black modules"""
+    grid = np.frombuffer(grid_bytes, dtype=np.uint8).reshape(cells, cells)
+    commands = []
+    previous_start = (0, 0)
+    for loop in trace_outlines(grid):
+        start_x, start_y = loop[0]
+        commands.append(
+            f"m{start_x - previous_start[0]} {start_y - previous_start[1]}"
+            if commands
+            else f"M{start_x} {start_y}"
+        )
+        for (x1, y1), (x2, y2) in zip(loop, loop[1:]):
+            commands.append(f"h{x2 - x1}" if x2 != x1 else f"v{y2 - y1}")
+        commands.append("z")
+        previous_start = (start_x, start_y)
+    return "".join(commands)
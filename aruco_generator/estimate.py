@@ -0,0 +1,169 @@
+"""
+{
+  "file_type": "job_estimator",
+  "purpose": "Estimate laser job time per layer from geometry and material settings",
+  "dependencies": ["numpy", "drawing.py"],
+  "key_functions": {
+    "estimate_job": "Per-layer cut/mark length, engrave scan and travel, in seconds",
+    "loop_lengths": "Perimeter and enclosed area of multi-loop paths"
+  },
+  "ai_navigation": {
+    "modify_for": "Refining the machine model (overscan, acceleration, passes)",
+    "used_by": ["lightburn.py (LightBurnExporter.estimate_job)"],
+    "output_format": "JobEstimate with per-layer seconds and lengths in mm"
+  }
+}
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Any, List, Tuple
+from .drawing import DrawingContext
+
+# Stroke length of an engraved label character, in multiples of the font size
+MARK_STROKE_PER_CHAR = 2.0
+
+
+@dataclass(frozen=True)
+class JobEstimate:
+    layers: Dict[str, Dict[str, Any]]
+    travel_mm: float
+    travel_seconds: float
+
+    @property
+    def total_seconds(self) -> float:
+        """Machine time over all layers plus travel"""
+        return (
+            sum(layer["seconds"] for layer in self.layers.values())
+            + self.travel_seconds
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estimate report (seconds and mm, rounded)"""
+        return {
+            "total_seconds": round(self.total_seconds, 1),
+            "travel_mm": round(self.travel_mm, 1),
+            "travel_seconds": round(self.travel_seconds, 1),
+            "layers": {
+                name: {
+                    key: round(value, 1) if isinstance(value, float) else value
+                    for key, value in layer.items()
+                }
+                for name, layer in self.layers.items()
+            },
+        }
+
+
+def estimate_job(
+    context: DrawingContext,
+    layer_settings: Dict[int, Dict[str, str]],
+    material_config: Dict[str, Any],
+    travel_mm: Dict[int, float],
+    excluded_fill_ids: set = frozenset(),
+    bitmaps: List[Tuple[float, float]] = (),
+    bitmap_dpi: int = 254,
+) -> JobEstimate:
+    """Estimate machine time for each layer of a drawing
+
+    Cut and mark layers trace every outline (cut outlines once per pass); the
+    engrave layer scans its filled area at the material's line interval, and
+    bitmaps (width, height in mm) scan their full extent at the bitmap DPI.
+    Engrave fills of `excluded_fill_ids` markers are replaced by those bitmaps.
+    `travel_mm` is the travel distance per layer (see toolpath.order_layers).
+    """
+    rects = context.rects
+    perimeter = 2 * (rects.width + rects.height)
+    area = rects.width * rects.height
+    rect_layer = rects.layer.astype(int)
+    if excluded_fill_ids:
+        excluded = np.isin(rects.marker_id, list(excluded_fill_ids))
+    else:
+        excluded = np.zeros(len(rects), dtype=bool)
+
+    paths = [element for element in context.shapes if element["type"] == "path"]
+    path_perimeter, path_area = loop_lengths([element["loops"] for element in paths])
+    path_layer = np.array([element["layer"] for element in paths], dtype=int)
+    path_excluded = np.array(
+        [element.get("marker_id") in excluded_fill_ids for element in paths], dtype=bool
+    )
+
+    texts = [element for element in context.shapes if element["type"] == "text"]
+    text_layer = np.array([element["layer"] for element in texts], dtype=int)
+    text_length = np.array(
+        [
+            len(element["text"]) * element["font_size"] * MARK_STROKE_PER_CHAR
+            for element in texts
+        ],
+        dtype=float,
+    )
+
+    layers = {}
+    for layer_id, config in layer_settings.items():
+        operation = config["operation"]
+        speed = float(material_config[f"{operation}_speed"]) / 60  # mm/s
+        passes = int(material_config.get(f"{operation}_passes", 1))
+
+        if operation == "engrave":
+            interval = float(material_config["engrave_interval"])
+            filled = (
+                area[(rect_layer == layer_id) & ~excluded].sum()
+                + path_area[(path_layer == layer_id) & ~path_excluded].sum()
+            )
+            length = filled / interval
+            if bitmaps:
+                # Image mode sweeps each bitmap's full width on every line
+                length += (
+                    sum(width * height for width, height in bitmaps) * bitmap_dpi / 25.4
+                )
+        else:
+            length = (
+                perimeter[rect_layer == layer_id].sum()
+                + path_perimeter[path_layer == layer_id].sum()
+                + text_length[text_layer == layer_id].sum()
+            )
+        length = float(length) * passes
+
+        layers[config["name"]] = {
+            "operation": operation,
+            "length_mm": length,
+            "passes": passes,
+            "seconds": length / speed if speed else 0.0,
+        }
+
+    total_travel = float(sum(travel_mm.values()))
+    travel_speed = float(material_config["travel_speed"]) / 60
+    return JobEstimate(
+        layers=layers,
+        travel_mm=total_travel,
+        travel_seconds=total_travel / travel_speed,
+    )
+
+
+def loop_lengths(
+    paths: List[List[List[Tuple[float, float]]]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Total perimeter and filled area of each multi-loop path
+
+    Holes wind opposite to their outlines, so the signed loop areas of a path sum
+    to its filled area.
+    """
+    if not paths:
+        return np.zeros(0), np.zeros(0)
+
+    points = np.array(
+        [point for loops in paths for loop in loops for point in loop], dtype=float
+    )
+    loop_sizes = np.array([len(loop) for loops in paths for loop in loops])
+    loop_path = np.repeat(np.arange(len(paths)), [len(loops) for loops in paths])
+
+    # Successor of every vertex within its own loop
+    loop_start = np.repeat(np.cumsum(loop_sizes) - loop_sizes, loop_sizes)
+    position = np.arange(len(points)) - loop_start
+    following = loop_start + (position + 1) % np.repeat(loop_sizes, loop_sizes)
+    x, y = points[:, 0], points[:, 1]
+    nx, ny = x[following], y[following]
+
+    vertex_path = np.repeat(loop_path, loop_sizes)
+    perimeter = np.bincount(vertex_path, np.hypot(nx - x, ny - y), minlength=len(paths))
+    signed_area = np.bincount(vertex_path, x * ny - nx * y, minlength=len(paths)) / 2
+    return perimeter, np.abs(signed_area)
@@ -0,0 +1,150 @@
+"""
+{
+  "file_type": "geometry_simplification",
+  "purpose": "Merge black marker modules into fewer, larger shapes",
+  "dependencies": ["numpy"],
+  "key_functions": {
+    "merge_runs": "Row run-length rectangles merged vertically when identical",
+    "merge_greedy": "Greedy maximal rectangles",
+    "trace_outlines": "Closed outline loops (outer boundaries and holes)"
+  },
+  "ai_navigation": {
+    "modify_for": "Adding new merge strategies",
+    "used_by": ["drawing.py"],
+    "output_format": "Rects as (row, col, height, width), loops as (x, y) vertices"
+  }
+}
+"""
+
+import numpy as np
+from typing import List, Tuple
+
+MERGE_STRATEGIES = ("none", "runs", "greedy", "contours")
+
+Rect = Tuple[int, int, int, int]
+Loop = List[Tuple[int, int]]
+
+
+def merge_runs(grid: np.ndarray) -> List[Rect]:
+    """Merge horizontal runs of black cells, stacking identical runs of adjacent rows"""
+    grid = np.asarray(grid, dtype=bool)
+    rects = []
+    open_runs = {}  # (col, width) -> [row, col, height, width]
+
+    for row in range(grid.shape[0]):
+        # Run starts/ends from the sign changes of the padded row
+        padded = np.concatenate(([False], grid[row], [False])).astype(np.int8)
+        changes = np.flatnonzero(np.diff(padded))
+        runs = {
+            (int(start), int(end - start))
+            for start, end in zip(changes[::2], changes[1::2])
+        }
+
+        for key in list(open_runs):
+            if key in runs:
+                open_runs[key][2] += 1
+            else:
+                rects.append(tuple(open_runs.pop(key)))
+        for col, width in runs:
+            if (col, width) not in open_runs:
+                open_runs[(col, width)] = [row, col, 1, width]
+
+    rects.extend(tuple(rect) for rect in open_runs.values())
+    rects.sort()
+    return rects
+
+
+def merge_greedy(grid: np.ndarray) -> List[Rect]:
+    """Cover black cells with greedy maximal rectangles (widest first, then tallest)"""
+    remaining = np.array(grid, dtype=bool)
+    rows, cols = remaining.shape
+    rects = []
+
+    for row in range(rows):
+        for col in range(cols):
+            if not remaining[row, col]:
+                continue
+
+            width = 1
+            while col + width < cols and remaining[row, col + width]:
+                width += 1
+            height = 1
+            while (
+                row + height < rows and remaining[row + height, col : col + width].all()
+            ):
+                height += 1
+
+            remaining[row : row + height, col : col + width] = False
+            rects.append((row, col, height, width))
+    return rects
+
+
+def trace_outlines(grid: np.ndarray) -> List[Loop]:
+    """Trace black regions into closed loops of grid vertices
+
+    Outer boundaries run clockwise and holes counter-clockwise (y pointing down),
+    so the loops fill correctly with both nonzero and even-odd rules. Regions that
+    only touch diagonally are traced as separate loops.
+    """
+    grid = np.asarray(grid, dtype=bool)
+    padded = np.pad(grid, 1)
+
+    # Directed boundary edges keep the black cell on their right-hand side
+    edges = {}
+    for row, col in zip(*np.nonzero(grid)):
+        r, c = int(row), int(col)
+        if not padded[r, c + 1]:
+            edges.setdefault((c, r), []).append((c + 1, r))
+        if not padded[r + 1, c + 2]:
+            edges.setdefault((c + 1, r), []).append((c + 1, r + 1))
+        if not padded[r + 2, c + 1]:
+            edges.setdefault((c + 1, r + 1), []).append((c, r + 1))
+        if not padded[r + 1, c]:
+            edges.setdefault((c, r + 1), []).append((c, r))
+
+    loops = []
+    while edges:
+        start = min(edges)
+        loop = []
+        current, direction = start, None
+        while True:
+            loop.append(current)
+            targets = edges[current]
+            target = _next_target(current, direction, targets)
+            targets.remove(target)
+            if not targets:
+                del edges[current]
+            direction = (target[0] - current[0], target[1] - current[1])
+            current = target
+            if current == start:
+                break
+        loops.append(_drop_collinear(loop))
+    return loops
+
+
+def _next_target(vertex, direction, targets):
+    """Pick the outgoing edge at a vertex, preferring a right turn at pinch points"""
+    if len(targets) == 1 or direction is None:
+        return targets[0]
+
+    dx, dy = direction
+    preferences = [(-dy, dx), (dx, dy), (dy, -dx)]  # right, straight, left (y down)
+    for pref in preferences:
+        for target in targets:
+            if (target[0] - vertex[0], target[1] - vertex[1]) == pref:
+                return target
+    return targets[0]
+
+
+def _drop_collinear(loop: Loop) -> Loop:
+    """Remove vertices lying on a straight segment"""
+    simplified = []
+    count = len(loop)
+    for i in range(count):
+        prev_pt, point, next_pt = loop[i - 1], loop[i], loop[(i + 1) % count]
+        cross = (point[0] - prev_pt[0]) * (next_pt[1] - point[1]) - (
+            point[1] - prev_pt[1]
+        ) * (next_pt[0] - point[0])
+        if cross != 0:
+            simplified.append(point)
+    return simplified
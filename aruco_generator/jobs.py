@@ -0,0 +1,261 @@
+"""
+{
+  "file_type": "batch_job_manager",
+  "purpose": "Run batch ZIP generation as background jobs with database-backed state",
+  "dependencies": ["batch.py", "app.py (db)"],
+  "main_class": "BatchJobManager",
+  "key_methods": {
+    "submit": "Queue a batch job and return its id",
+    "status": "Current job state from the database (stalled jobs read as failed)",
+    "cancel": "Flag a queued or running job as cancelled",
+    "result_path": "Path of a finished job's ZIP on disk",
+    "expire": "Fail stalled jobs, delete finished jobs and results older than the TTL"
+  },
+  "ai_navigation": {
+    "modify_for": "Changing job lifecycle, retention or progress reporting",
+    "used_by": ["web.py job endpoints"],
+    "output_format": "ZIPs under instance/batch_jobs, state in the batch_jobs table"
+  }
+}
+"""
+
+import json
+import os
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any
+from app import db
+from .batch import BatchGenerator
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+# A running job whose partial ZIP has not grown for this long lost its worker (restart
+# or crash)
+STALLED_JOB_SECONDS = 300
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJob(db.Model):
+    __tablename__ = "batch_jobs"
+
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(16), nullable=False, default="queued")
+    config = db.Column(db.Text, nullable=False)
+    files_total = db.Column(db.Integer, nullable=False)
+    files_done = db.Column(db.Integer, nullable=False, default=0)
+    result_bytes = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize job state for the API"""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "progress": round(self.files_done / self.files_total, 3)
+            if self.files_total
+            else 0.0,
+            "result_bytes": self.result_bytes,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class BatchJobManager:
+    def __init__(
+        self,
+        app,
+        batch_generator: BatchGenerator,
+        result_dir: str,
+        max_workers: int = 2,
+        ttl_seconds: int = 3600,
+    ):
+        self.app = app
+        self.batch_generator = batch_generator
+        self.result_dir = result_dir
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="batch-job")
+        os.makedirs(result_dir, exist_ok=True)
+
+    def submit(
+        self,
+        config: Dict[str, Any],
+        batch_size: int,
+        markers_per_file: int,
+        compresslevel: int,
+        deterministic: bool = False,
+    ) -> str:
+        """Queue a batch job and return its id"""
+        self.expire()
+
+        job = BatchJob(
+            id=uuid.uuid4().hex,
+            status="queued",
+            files_total=batch_size,
+            config=json.dumps(config, sort_keys=True),
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self._executor.submit(
+            self._run,
+            job.id,
+            config,
+            batch_size,
+            markers_per_file,
+            compresslevel,
+            deterministic,
+        )
+        return job.id
+
+    def status(self, job_id: str) -> Dict[str, Any] | None:
+        """Current job state, or None for unknown ids"""
+        job = db.session.get(BatchJob, job_id)
+        if job is None:
+            return None
+        if self._stalled(job):
+            self._fail(job, "Interrupted: the worker running this job stopped")
+            db.session.commit()
+        return job.to_dict()
+
+    def cancel(self, job_id: str) -> Dict[str, Any] | None:
+        """Flag a queued or running job cancelled; the runner stops at its next file"""
+        job = db.session.get(BatchJob, job_id)
+        if job is None:
+            return None
+        if job.status not in FINISHED_STATES:
+            job.status = "cancelled"
+            job.finished_at = datetime.now()
+            db.session.commit()
+        return job.to_dict()
+
+    def result_path(self, job_id: str) -> str:
+        """Path of a job's ZIP on disk (exists once the job is done)"""
+        return os.path.join(self.result_dir, f"{job_id}.zip")
+
+    def expire(self) -> int:
+        """Fail stalled jobs, then delete jobs (and files) finished before the TTL"""
+        cutoff = datetime.now() - self.ttl
+        for job in BatchJob.query.filter(BatchJob.status.notin_(FINISHED_STATES)).all():
+            if self._stalled(job):
+                self._fail(job, "Interrupted: the worker running this job stopped")
+            elif job.status == "queued" and job.created_at < cutoff:
+                # Queued in the executor of a worker that has since exited
+                self._fail(
+                    job,
+                    "Interrupted: the worker holding this job stopped before it ran",
+                )
+
+        expired = BatchJob.query.filter(
+            BatchJob.status.in_(FINISHED_STATES), BatchJob.finished_at < cutoff
+        ).all()
+        for job in expired:
+            for path in (self.result_path(job.id), self.result_path(job.id) + ".part"):
+                if os.path.exists(path):
+                    os.remove(path)
+            db.session.delete(job)
+        db.session.commit()
+        return len(expired)
+
+    def _stalled(self, job: BatchJob) -> bool:
+        """Running job whose partial ZIP saw no write for STALLED_JOB_SECONDS"""
+        if job.status != "running":
+            return False
+        part_path = self.result_path(job.id) + ".part"
+        try:
+            last_activity = datetime.fromtimestamp(os.path.getmtime(part_path))
+        except OSError:
+            last_activity = job.created_at
+        return datetime.now() - last_activity > timedelta(seconds=STALLED_JOB_SECONDS)
+
+    def _fail(self, job: BatchJob, error: str):
+        """Mark a job failed (caller commits)"""
+        job.status = "failed"
+        job.error = error
+        job.finished_at = datetime.now()
+
+    def _run(
+        self,
+        job_id: str,
+        config: Dict[str, Any],
+        batch_size: int,
+        markers_per_file: int,
+        compresslevel: int,
+        deterministic: bool,
+    ):
+        """Render the batch to disk, publishing progress and honouring cancellation"""
+        with self.app.app_context():
+            job = db.session.get(BatchJob, job_id)
+            if job is None or job.status != "queued":
+                return
+            job.status = "running"
+            db.session.commit()
+
+            final_path = self.result_path(job_id)
+            part_path = final_path + ".part"
+            timings = []
+            written = []
+            files_done = 0
+            try:
+                with open(part_path, "wb") as fp:
+                    for chunk in self.batch_generator.iter_batch_zip(
+                        config,
+                        batch_size,
+                        markers_per_file,
+                        timings,
+                        compresslevel,
+                        deterministic,
+                        written,
+                    ):
+                        fp.write(chunk)
+                        # Rendering runs ahead of the ZIP; count members on disk.
+                        # BATCH_SUMMARY.txt is written last, after every file
+                        if min(len(written), len(timings)) == files_done:
+                            continue
+
+                        # A file finished: publish progress and pick up cancellation
+                        # from any worker
+                        db.session.refresh(job)
+                        if job.status in FINISHED_STATES:
+                            break
+                        files_done = job.files_done = min(len(written), len(timings))
+                        db.session.commit()
+
+                db.session.refresh(job)
+                if job.status in FINISHED_STATES:
+                    # Cancelled, or failed as stalled by another worker
+                    os.remove(part_path)
+                    return
+
+                os.replace(part_path, final_path)
+                job.status = "done"
+                job.files_done = len(timings)
+                job.result_bytes = os.path.getsize(final_path)
+                job.finished_at = datetime.now()
+                db.session.commit()
+                logger.debug(
+                    "Batch job %s finished: %d files, %d bytes",
+                    job_id,
+                    job.files_done,
+                    job.result_bytes,
+                )
+
+            except Exception as e:
+                logger.exception("Batch job %s failed", job_id)
+                db.session.rollback()
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                job = db.session.get(BatchJob, job_id)
+                if job is None:
+                    # Deleted while running; nothing left to report to
+                    return
+                self._fail(job, str(e))
+                db.session.commit()
@@ -0,0 +1,220 @@
+"""
+{
+  "file_type": "sheet_layout",
+  "purpose": "Pack equal-size markers onto bed/stock sheets, overflowing onto more",
+  "dependencies": ["numpy"],
+  "key_functions": {
+    "plan_sheets": "Densest grid per sheet (labels below or beside), overflow onward",
+    "grid_shape": "Near-square rows x cols for a marker count (last row partial)",
+    "grid_positions": "Row-major marker offsets for a grid"
+  },
+  "ai_navigation": {
+    "modify_for": "Changing packing strategy or utilization reporting",
+    "used_by": ["batch.py", "web.py"],
+    "output_format": "LayoutPlan of SheetLayout entries with marker positions in mm"
+  }
+}
+"""
+
+import math
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Tuple
+
+LABEL_PLACEMENTS = ("auto", "below", "beside", "none")
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    index: int
+    rows: int
+    cols: int
+    count: int
+    x: np.ndarray = field(repr=False)
+    y: np.ndarray = field(repr=False)
+    used_width: float
+    used_height: float
+    utilization: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary without positions"""
+        return {
+            "sheet": self.index + 1,
+            "rows": self.rows,
+            "cols": self.cols,
+            "markers": self.count,
+            "used_width_mm": round(self.used_width, 2),
+            "used_height_mm": round(self.used_height, 2),
+            "utilization_pct": round(100 * self.utilization, 1),
+        }
+
+
+@dataclass(frozen=True)
+class LayoutPlan:
+    sheet_width: float
+    sheet_height: float
+    margin: float
+    size: float
+    spacing: float
+    label_placement: str
+    capacity: int
+    sheets: List[SheetLayout]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plan report with per-sheet utilization"""
+        markers = sum(sheet.count for sheet in self.sheets)
+        return {
+            "sheet_width_mm": self.sheet_width,
+            "sheet_height_mm": self.sheet_height,
+            "margin_mm": self.margin,
+            "label_placement": self.label_placement,
+            "markers_per_sheet": self.capacity,
+            "sheet_count": len(self.sheets),
+            "total_markers": markers,
+            "overall_utilization_pct": round(
+                100
+                * markers
+                * self.size**2
+                / (len(self.sheets) * self.sheet_width * self.sheet_height),
+                1,
+            ),
+            "sheets": [sheet.to_dict() for sheet in self.sheets],
+        }
+
+
+def plan_sheets(
+    count: int,
+    size_mm: float,
+    spacing_mm: float,
+    sheet_width_mm: float,
+    sheet_height_mm: float,
+    margin_mm: float = 5.0,
+    label_mm: float = 0.0,
+    label_placement: str = "auto",
+) -> LayoutPlan:
+    """Pack `count` markers onto as few sheets as possible
+
+    Equal squares pack densest as a regular grid, so each full sheet holds the
+    largest grid fitting inside the margins. `label_mm` is how far a label reaches
+    past its marker's edge: below it, or beside it when rotated ("auto" picks
+    whichever fits more markers). Labels of the last row or column must stay
+    inside the margins too. The last sheet gets the most compact grid for its
+    remainder.
+    """
+    if label_placement not in LABEL_PLACEMENTS:
+        raise ValueError(f"Unknown label placement: {label_placement}")
+    if count < 1 or size_mm <= 0 or spacing_mm < 0 or margin_mm < 0 or label_mm < 0:
+        raise ValueError(
+            "Invalid layout: count and size must be positive, "
+            "spacing and margins non-negative"
+        )
+
+    usable_width = sheet_width_mm - 2 * margin_mm
+    usable_height = sheet_height_mm - 2 * margin_mm
+    # Per placement: label reach past the marker along x and y (it sets the pitch when
+    # wider than the spacing)
+    candidates = {
+        "below": (0.0, label_mm),
+        "beside": (label_mm, 0.0),
+        "none": (0.0, 0.0),
+    }
+    if label_placement != "auto":
+        candidates = {label_placement: candidates[label_placement]}
+    else:
+        del candidates["none"]
+
+    # Grid capacity for each placement; ties keep labels below
+    best = None
+    for placement, (label_x, label_y) in candidates.items():
+        pitch_x = size_mm + max(spacing_mm, label_x)
+        pitch_y = size_mm + max(spacing_mm, label_y)
+        max_cols = _fit(usable_width - label_x, size_mm, pitch_x)
+        max_rows = _fit(usable_height - label_y, size_mm, pitch_y)
+        if best is None or max_rows * max_cols > best[1] * best[2]:
+            best = (placement, max_rows, max_cols, pitch_x, pitch_y, label_x, label_y)
+    placement, max_rows, max_cols, pitch_x, pitch_y, label_x, label_y = best
+    capacity = max_rows * max_cols
+    if capacity == 0:
+        raise ValueError(
+            f"A {size_mm}mm marker does not fit on a "
+            f"{sheet_width_mm}x{sheet_height_mm}mm sheet with {margin_mm}mm margins"
+        )
+
+    sheets = []
+    remaining = count
+    while remaining > 0:
+        sheet_count = min(remaining, capacity)
+        rows, cols = (
+            (max_rows, max_cols)
+            if sheet_count == capacity
+            else grid_shape(sheet_count, max_rows, max_cols)
+        )
+        x, y = grid_positions(sheet_count, cols, pitch_x, pitch_y)
+        used_width = (cols - 1) * pitch_x + size_mm + label_x
+        used_height = (rows - 1) * pitch_y + size_mm + label_y
+        sheets.append(
+            SheetLayout(
+                index=len(sheets),
+                rows=rows,
+                cols=cols,
+                count=sheet_count,
+                x=x + margin_mm,
+                y=y + margin_mm,
+                used_width=used_width,
+                used_height=used_height,
+                utilization=sheet_count
+                * size_mm**2
+                / (sheet_width_mm * sheet_height_mm),
+            )
+        )
+        remaining -= sheet_count
+
+    return LayoutPlan(
+        sheet_width=sheet_width_mm,
+        sheet_height=sheet_height_mm,
+        margin=margin_mm,
+        size=size_mm,
+        spacing=spacing_mm,
+        label_placement=placement,
+        capacity=capacity,
+        sheets=sheets,
+    )
+
+
+def grid_shape(
+    count: int, max_rows: int | None = None, max_cols: int | None = None
+) -> Tuple[int, int]:
+    """Most compact rows x cols holding `count` markers (last row may be partial)"""
+    if count <= 1:
+        return 1, 1
+
+    best = None
+    for cols in range(1, (max_cols or count) + 1):
+        rows = math.ceil(count / cols)
+        if max_rows is not None and rows > max_rows:
+            continue
+        # Exact grids up to 3:1 first, otherwise the squarest grid with the fewest holes
+        empty = rows * cols - count
+        exact = empty == 0 and max(rows, cols) <= 3 * min(rows, cols)
+        key = (not exact, max(rows, cols), empty, -cols)
+        if best is None or key < best[0]:
+            best = (key, rows, cols)
+    if best is None:
+        raise ValueError(f"{count} markers do not fit in a {max_rows}x{max_cols} grid")
+    _, rows, cols = best
+    return rows, cols
+
+
+def grid_positions(
+    count: int, cols: int, pitch_x: float, pitch_y: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-major top-left offsets for `count` markers in a grid of `cols` columns"""
+    index = np.arange(count)
+    return (index % cols) * float(pitch_x), (index // cols) * float(pitch_y)
+
+
+def _fit(length: float, size: float, pitch: float) -> int:
+    """How many markers of `size` at `pitch` fit along `length`"""
+    if length < size:
+        return 0
+    return int((length - size) // pitch) + 1 if pitch > 0 else 1
@@ -2,13 +2,21 @@
 {
   "file_type": "lightburn_exporter",
   "purpose": "Export ArUCO markers to LightBurn .lbrn2 format for laser cutting",
-  "dependencies": ["xml.etree.ElementTree", "drawing.py"],
+  "dependencies": ["drawing.py", "toolpath.py", "estimate.py"],
   "main_class": "LightBurnExporter",
   "key_methods": {
-    "export": "Export drawing context to LightBurn format with material settings",
+    "iter_export": "Stream the .lbrn2 document as UTF-8 byte chunks (constant memory)",
+    "write": "Write the .lbrn2 document to any binary file-like object",
+    "export": "Export drawing context to LightBurn format (BytesIO)",
+    "_path_xml": "Write merged outline paths as multi-loop LightBurn shapes",
+    "_iter_bitmaps": "Write engrave fills as 1-bit Bitmap shapes (bitmap fill modes)",
+    "_iter_marker_groups": "One Group per marker, a compound path per layer",
+    "plan_toolpath": "Travel-reducing shape order per layer with travel before/after",
+    "estimate_job": "Estimated machine seconds per layer plus travel (estimate.py)",
+    "_iter_ordered_shapes": "Write flat shapes in a planned toolpath order",
     "get_material_info": "Return material configuration for UI",
-    "_add_material_cut_settings": "Add laser cutting parameters",
-    "_add_enhanced_notes": "Add metadata and material info"
+    "_cut_settings_xml": "Add laser cutting parameters",
+    "_notes_xml": "Add metadata and material info"
   },
   "material_presets": {
     "1_16_cast_acrylic": "Default 1/16 inch cast acrylic settings",
@@ -24,194 +32,799 @@
 }
 """
 
-import xml.etree.ElementTree as ET
+import base64
+import struct
+import zlib
+import numpy as np
 from io import BytesIO
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, BinaryIO, List, Tuple
 from .drawing import DrawingContext
+from .toolpath import ToolpathOrder, order_layers
+from .estimate import JobEstimate, estimate_job
+
+# Shapes serialized per chunk by LightBurnExporter.iter_export
+LBRN_CHUNK_SHAPES = 1024
+
+# Engrave layer output: vector shapes, one 1-bit bitmap per marker, or one for the sheet
+FILL_MODES = ("vector", "bitmap_marker", "bitmap_sheet")
+DEFAULT_BITMAP_DPI = 254
+
+# Shape layout: one Path per rectangle/outline, or one Group of compound paths per
+# marker
+SHAPE_GROUPINGS = ("shape", "marker")
+
 
 class LightBurnExporter:
     def __init__(self):
         # Material-specific settings for 1/16" White/Black 2-Ply Cast Acrylic
         self.material_settings = {
             "1_16_cast_acrylic": {
-                "name": "1/16\" Cast Acrylic (Default)",
+                "name": '1/16" Cast Acrylic (Default)',
                 "description": "White/Black 2-Ply Cast Acrylic",
-                "cut_speed": 150,      # mm/min
-                "cut_power": 75,       # %
+                "cut_speed": 150,  # mm/min
+                "cut_power": 75,  # %
                 "cut_passes": 1,
                 "engrave_speed": 800,  # mm/min
-                "engrave_power": 45,   # %
-                "mark_speed": 1000,    # mm/min
-                "mark_power": 20,      # %
+                "engrave_power": 45,  # %
+                "mark_speed": 1000,  # mm/min
+                "mark_power": 20,  # %
+                "engrave_interval": 0.1,  # mm between fill scan lines
+                "travel_speed": 6000,  # mm/min, laser off
             }
         }
-        
+
         # Layer configuration with material-specific settings
         self.layer_settings = {
-            0: {"index": "0", "name": "ArUCO Fill", "type": "Cut", "priority": "2", "operation": "engrave"},
-            1: {"index": "1", "name": "ArUCO Border", "type": "Cut", "priority": "1", "operation": "cut"},  
-            2: {"index": "30", "name": "ArUCO Labels", "type": "Tool", "priority": "0", "operation": "mark"}
+            0: {
+                "index": "0",
+                "name": "ArUCO Fill",
+                "type": "Cut",
+                "priority": "2",
+                "operation": "engrave",
+            },
+            1: {
+                "index": "1",
+                "name": "ArUCO Border",
+                "type": "Cut",
+                "priority": "1",
+                "operation": "cut",
+            },
+            2: {
+                "index": "30",
+                "name": "ArUCO Labels",
+                "type": "Tool",
+                "priority": "0",
+                "operation": "mark",
+            },
         }
-    
-    def export(self, context: DrawingContext, metadata: Dict[str, Any] | None = None, 
-               material: str = "1_16_cast_acrylic") -> BytesIO:
+
+    def export(
+        self,
+        context: DrawingContext,
+        metadata: Dict[str, Any] | None = None,
+        material: str = "1_16_cast_acrylic",
+        fill_mode: str = "vector",
+        bitmap_dpi: int = DEFAULT_BITMAP_DPI,
+        grouping: str = "shape",
+        toolpath: ToolpathOrder | None = None,
+    ) -> BytesIO:
         """Export drawing context to LightBurn .lbrn2 format with material settings"""
-        
-        # Create root element
-        root = ET.Element('LightBurnProject', {
-            'AppVersion': "1.0.06",
-            'FormatVersion': "1",
-            'MaterialHeight': "1.5875",  # 1/16" in mm
-            'MirrorX': "False", 
-            'MirrorY': "False"
-        })
-        root.text = "\n"
-        
-        # Add material-specific cut settings
-        self._add_material_cut_settings(root, material)
-        
-        # Create main shape group
-        main_group = ET.SubElement(root, "Shape", Type="Group")
-        main_group.text = "\n "
-        main_group.tail = "\n"
-        
-        children = ET.SubElement(main_group, "Children")
-        children.text = "\n "
-        children.tail = "\n"
-        
-        # Add all drawing elements
-        for element in context.elements:
-            if element['type'] == 'rect':
-                self._add_rectangle(children, element)
-            elif element['type'] == 'text':
-                self._add_text(children, element)
-        
-        # Add enhanced metadata with material info
-        if metadata:
-            self._add_enhanced_notes(root, metadata, material)
-        
-        # Generate XML output
-        tree = ET.ElementTree(root)
         output = BytesIO()
-        tree.write(output, encoding="utf-8", xml_declaration=True, method="xml")
+        self.write(
+            context,
+            output,
+            metadata,
+            material,
+            fill_mode,
+            bitmap_dpi,
+            grouping,
+            toolpath,
+        )
         output.seek(0)
         return output
-    
-    def _add_material_cut_settings(self, root, material: str):
+
+    def write(
+        self,
+        context: DrawingContext,
+        fp: BinaryIO,
+        metadata: Dict[str, Any] | None = None,
+        material: str = "1_16_cast_acrylic",
+        fill_mode: str = "vector",
+        bitmap_dpi: int = DEFAULT_BITMAP_DPI,
+        grouping: str = "shape",
+        toolpath: ToolpathOrder | None = None,
+    ) -> int:
+        """Write .lbrn2 document to a binary file object, returning bytes written"""
+        written = 0
+        for chunk in self.iter_export(
+            context, metadata, material, fill_mode, bitmap_dpi, grouping, toolpath
+        ):
+            fp.write(chunk)
+            written += len(chunk)
+        return written
+
+    def iter_export(
+        self,
+        context: DrawingContext,
+        metadata: Dict[str, Any] | None = None,
+        material: str = "1_16_cast_acrylic",
+        fill_mode: str = "vector",
+        bitmap_dpi: int = DEFAULT_BITMAP_DPI,
+        grouping: str = "shape",
+        toolpath: ToolpathOrder | None = None,
+    ) -> Iterator[bytes]:
+        """Yield the .lbrn2 document as UTF-8 chunks without building it in memory
+
+        fill_mode "bitmap_marker"/"bitmap_sheet" replaces the engrave-layer shapes of
+        cell-geometry markers with 1-bit Bitmap shapes at bitmap_dpi; cut borders and
+        labels stay vector. grouping "marker" writes each marker as a Group holding one
+        compound path per layer, so it can be selected as a unit in LightBurn.
+        A toolpath from plan_toolpath writes each layer's shapes in that travel-reducing
+        order and adds the travel before and after to the Notes.
+        """
+        if fill_mode not in FILL_MODES:
+            raise ValueError(f"Unknown fill mode: {fill_mode}")
+        if grouping not in SHAPE_GROUPINGS:
+            raise ValueError(f"Unknown shape grouping: {grouping}")
+        if toolpath is not None and grouping != "shape":
+            raise ValueError("Path ordering needs grouping 'shape'")
+
+        engrave_layer = self._engrave_layer()
+        bitmap_ids = self._bitmap_ids(context, fill_mode)
+
+        # Project header
+        yield (
+            "<?xml version='1.0' encoding='utf-8'?>\n"
+            '<LightBurnProject AppVersion="1.0.06" FormatVersion="1" '
+            'MaterialHeight="1.5875" MirrorX="False" MirrorY="False">\n'
+        ).encode(
+            "utf-8"
+        )  # 1/16" in mm
+
+        # Add material-specific cut settings
+        yield self._cut_settings_xml(material, fill_mode, bitmap_dpi).encode("utf-8")
+
+        # Open main shape group
+        yield '<Shape Type="Group">\n <Children>\n '.encode("utf-8")
+
+        if grouping == "marker":
+            for group_xml in self._iter_marker_groups(
+                context, engrave_layer, bitmap_ids, fill_mode, bitmap_dpi
+            ):
+                yield group_xml.encode("utf-8")
+        elif toolpath is not None:
+            yield from self._iter_ordered_shapes(
+                context, engrave_layer, bitmap_ids, toolpath
+            )
+            if metadata:
+                report = toolpath.report()
+                metadata = {
+                    **metadata,
+                    "Travel Distance": f"{report['travel_after_mm']}mm "
+                    f"(unordered {report['travel_before_mm']}mm)",
+                }
+        else:
+            yield from self._iter_flat_shapes(context, engrave_layer, bitmap_ids)
+
+        if bitmap_ids and grouping == "shape":
+            # Grouped exports place bitmaps inside their marker groups instead
+            for _, bitmap_xml in self._iter_bitmaps(
+                context, fill_mode, bitmap_dpi, engrave_layer
+            ):
+                yield bitmap_xml.encode("utf-8")
+
+        yield "</Children>\n</Shape>\n".encode("utf-8")
+
+        # Add enhanced metadata with material info
+        if metadata:
+            estimate = self.estimate_job(
+                context, material, fill_mode, bitmap_dpi, toolpath
+            )
+            metadata = {
+                **metadata,
+                "Estimated Job Time": _format_duration(estimate.total_seconds),
+            }
+            yield self._notes_xml(metadata, material).encode("utf-8")
+
+        yield b"</LightBurnProject>"
+
+    def _iter_flat_shapes(
+        self, context: DrawingContext, engrave_layer: int, bitmap_ids: set
+    ) -> Iterator[bytes]:
+        """Yield every rectangle, path and text as its own shape, in chunks"""
+        # Add rectangles straight from the context's column arrays
+        columns = self._rect_columns(context, engrave_layer, bitmap_ids)
+        for start in range(0, len(columns[0]), LBRN_CHUNK_SHAPES):
+            stop = start + LBRN_CHUNK_SHAPES
+            yield "".join(
+                self._rectangle_xml(x, y, width, height, layer)
+                for x, y, width, height, layer in zip(
+                    *(column[start:stop].tolist() for column in columns)
+                )
+            ).encode("utf-8")
+
+        # Add remaining path and text shapes
+        for start in range(0, len(context.shapes), LBRN_CHUNK_SHAPES):
+            chunk = []
+            for element in context.shapes[start : start + LBRN_CHUNK_SHAPES]:
+                if element["type"] == "path":
+                    if (
+                        element["layer"] == engrave_layer
+                        and element.get("marker_id") in bitmap_ids
+                    ):
+                        continue
+                    chunk.append(self._path_xml(element))
+                elif element["type"] == "text":
+                    chunk.append(self._text_xml(element))
+            yield "".join(chunk).encode("utf-8")
+
+    def plan_toolpath(
+        self, context: DrawingContext, fill_mode: str = "vector"
+    ) -> ToolpathOrder:
+        """Order the cut and mark layers' flat shapes to cut travel (NN + 2-opt)
+
+        LightBurn scans every fill of the engrave layer together, line by line, so
+        their order does not change its travel: that layer keeps drawing order and
+        is left out of the travel figures.
+        """
+        engrave_layer = self._engrave_layer()
+        x, y, layer = self._item_starts(
+            context, engrave_layer, self._bitmap_ids(context, fill_mode)
+        )
+        strategies = {
+            layer_id: "scan" if layer_id == engrave_layer else "nearest"
+            for layer_id in self.layer_settings
+        }
+        return order_layers(x, y, layer, strategies)
+
+    def estimate_job(
+        self,
+        context: DrawingContext,
+        material: str = "1_16_cast_acrylic",
+        fill_mode: str = "vector",
+        bitmap_dpi: int = DEFAULT_BITMAP_DPI,
+        toolpath: ToolpathOrder | None = None,
+    ) -> JobEstimate:
+        """Estimate machine time per layer plus travel for the exported shapes"""
+        material_config = self.material_settings.get(
+            material, self.material_settings["1_16_cast_acrylic"]
+        )
+        engrave_layer = self._engrave_layer()
+        bitmap_ids = self._bitmap_ids(context, fill_mode)
+        if toolpath is None:
+            # Shapes are written in drawing order within each layer; engrave fills
+            # are scanned, with no travel between shapes
+            toolpath = order_layers(
+                *self._item_starts(context, engrave_layer, bitmap_ids),
+                {engrave_layer: "scan"},
+            )
+
+        bitmaps = []
+        if fill_mode == "bitmap_marker":
+            bitmaps = [(size, size) for _, _, _, size, _ in context.marker_cells]
+        elif bitmap_ids:
+            min_x = min(x for _, x, _, _, _ in context.marker_cells)
+            min_y = min(y for _, _, y, _, _ in context.marker_cells)
+            max_x = max(x + size for _, x, _, size, _ in context.marker_cells)
+            max_y = max(y + size for _, _, y, size, _ in context.marker_cells)
+            bitmaps = [(max_x - min_x, max_y - min_y)]
+        return estimate_job(
+            context,
+            self.layer_settings,
+            material_config,
+            toolpath.travel_after,
+            bitmap_ids,
+            bitmaps,
+            bitmap_dpi,
+        )
+
+    def _item_starts(
+        self, context: DrawingContext, engrave_layer: int, bitmap_ids: set
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Start point and layer of every flat shape in toolpath index space"""
+        columns, elements = self._ordered_items(context, engrave_layer, bitmap_ids)
+
+        # Shape start points: rectangle corner, first path vertex, text anchor
+        starts = [
+            element["loops"][0][0]
+            if element["type"] == "path"
+            else (element["x"], element["y"])
+            for element in elements
+        ]
+        x = np.concatenate((columns[0], [px for px, _ in starts]))
+        y = np.concatenate((columns[1], [py for _, py in starts]))
+        layer = np.concatenate(
+            (columns[4], [element["layer"] for element in elements])
+        ).astype(int)
+        return x, y, layer
+
+    def _iter_ordered_shapes(
+        self,
+        context: DrawingContext,
+        engrave_layer: int,
+        bitmap_ids: set,
+        toolpath: ToolpathOrder,
+    ) -> Iterator[bytes]:
+        """Yield flat shapes layer by layer in the planned toolpath order"""
+        columns, elements = self._ordered_items(context, engrave_layer, bitmap_ids)
+        rect_count = len(columns[0])
+        rect_rows = list(zip(*(column.tolist() for column in columns)))
+        for layer_order in toolpath.orders.values():
+            for start in range(0, len(layer_order), LBRN_CHUNK_SHAPES):
+                chunk = []
+                for index in layer_order[start : start + LBRN_CHUNK_SHAPES].tolist():
+                    if index < rect_count:
+                        chunk.append(self._rectangle_xml(*rect_rows[index]))
+                    elif elements[index - rect_count]["type"] == "path":
+                        chunk.append(self._path_xml(elements[index - rect_count]))
+                    else:
+                        chunk.append(self._text_xml(elements[index - rect_count]))
+                yield "".join(chunk).encode("utf-8")
+
+    def _ordered_items(
+        self, context: DrawingContext, engrave_layer: int, bitmap_ids: set
+    ) -> Tuple[Tuple[np.ndarray, ...], List[Dict[str, Any]]]:
+        """Rectangle columns, then path/text elements as flat shapes (toolpath order)"""
+        elements = [
+            element
+            for element in context.shapes
+            if element["type"] == "text"
+            or (
+                element["type"] == "path"
+                and not (
+                    element["layer"] == engrave_layer
+                    and element.get("marker_id") in bitmap_ids
+                )
+            )
+        ]
+        return self._rect_columns(context, engrave_layer, bitmap_ids), elements
+
+    def _engrave_layer(self) -> int:
+        """Layer whose operation is engrave"""
+        return next(
+            layer
+            for layer, config in self.layer_settings.items()
+            if config["operation"] == "engrave"
+        )
+
+    def _bitmap_ids(self, context: DrawingContext, fill_mode: str) -> set:
+        """Markers whose engrave fill is written as a bitmap
+
+        Bitmap modes turn the engrave layer into an image setting, so every fill on
+        it must come from a cell-geometry marker; vector fills left there (pixel
+        geometry) would be engraved as an image pass.
+        """
+        if fill_mode == "vector":
+            return set()
+        bitmap_ids = {marker_id for marker_id, *_ in context.marker_cells}
+
+        engrave_layer = self._engrave_layer()
+        rects = context.rects
+        fill_ids = set(
+            np.unique(rects.marker_id[rects.layer == engrave_layer]).tolist()
+        )
+        fill_ids.update(
+            shape.get("marker_id", -1)
+            for shape in context.shapes
+            if shape["type"] == "path" and shape["layer"] == engrave_layer
+        )
+        if fill_ids - bitmap_ids:
+            raise ValueError(
+                f"fill_mode {fill_mode} needs cell geometry; "
+                "pixel-geometry markers can only be exported with vector fills"
+            )
+        return bitmap_ids
+
+    def _rect_columns(
+        self, context: DrawingContext, engrave_layer: int, bitmap_ids: set
+    ) -> Tuple[np.ndarray, ...]:
+        """Rectangle x, y, width, height, layer columns, minus bitmap-replaced fills"""
+        rects = context.rects
+        columns = (rects.x, rects.y, rects.width, rects.height, rects.layer)
+        if bitmap_ids:
+            # Engrave fills of bitmap markers are replaced by their bitmaps
+            keep = ~(
+                (rects.layer == engrave_layer)
+                & np.isin(rects.marker_id, list(bitmap_ids))
+            )
+            columns = tuple(column[keep] for column in columns)
+        return columns
+
+    def _iter_marker_groups(
+        self,
+        context: DrawingContext,
+        engrave_layer: int,
+        bitmap_ids: set,
+        fill_mode: str,
+        bitmap_dpi: int,
+    ) -> Iterator[str]:
+        """Yield one Group per marker: a compound path per layer plus its label"""
+        loops = {}  # marker_id -> layer -> closed loops
+        extras = {}  # marker_id -> text and bitmap shapes
+
+        rects = context.rects
+        keep = np.ones(len(rects), dtype=bool)
+        if bitmap_ids:
+            keep = ~(
+                (rects.layer == engrave_layer)
+                & np.isin(rects.marker_id, list(bitmap_ids))
+            )
+        columns = (
+            rects.x,
+            rects.y,
+            rects.width,
+            rects.height,
+            rects.layer,
+            rects.marker_id,
+        )
+        for x, y, width, height, layer, marker_id in zip(
+            *(column[keep].tolist() for column in columns)
+        ):
+            loops.setdefault(marker_id, {}).setdefault(layer, []).append(
+                [(x, y), (x + width, y), (x + width, y + height), (x, y + height)]
+            )
+
+        for element in context.shapes:
+            marker_id = element.get("marker_id", -1)
+            if element["type"] == "path":
+                if element["layer"] == engrave_layer and marker_id in bitmap_ids:
+                    continue
+                loops.setdefault(marker_id, {}).setdefault(element["layer"], []).extend(
+                    element["loops"]
+                )
+            elif element["type"] == "text":
+                extras.setdefault(marker_id, []).append(self._text_xml(element))
+
+        if bitmap_ids:
+            for marker_id, bitmap_xml in self._iter_bitmaps(
+                context, fill_mode, bitmap_dpi, engrave_layer
+            ):
+                extras.setdefault(marker_id, []).append(bitmap_xml)
+
+        for marker_id in dict.fromkeys([*loops, *extras]):
+            shapes = [
+                self._path_xml({"layer": layer, "loops": layer_loops})
+                for layer, layer_loops in sorted(loops.get(marker_id, {}).items())
+            ]
+            shapes += extras.get(marker_id, [])
+            if marker_id < 0:
+                # Sheet-level shapes (outer border, sheet bitmap) stay outside marker
+                # groups
+                yield "".join(shapes)
+            else:
+                yield '<Shape Type="Group">\n <Children>\n ' + "".join(
+                    shapes
+                ) + "</Children>\n</Shape>\n "
+
+    def _iter_bitmaps(
+        self, context: DrawingContext, fill_mode: str, dpi: int, layer: int
+    ) -> Iterator[Tuple[int, str]]:
+        """Rasterize modules into (marker_id, Bitmap shape) pairs, -1 for a sheet"""
+        px_per_mm = dpi / 25.4
+
+        if fill_mode == "bitmap_marker":
+            for marker_id, x, y, size, bits in context.marker_cells:
+                black = _rasterize_modules(
+                    [(0.0, 0.0, size, bits)], size, size, px_per_mm
+                )
+                yield marker_id, self._bitmap_xml(black, x, y, px_per_mm, layer)
+            return
+
+        placements = [
+            (x, y, size, bits) for _, x, y, size, bits in context.marker_cells
+        ]
+        min_x = min(x for x, _, _, _ in placements)
+        min_y = min(y for _, y, _, _ in placements)
+        max_x = max(x + size for x, _, size, _ in placements)
+        max_y = max(y + size for _, y, size, _ in placements)
+        black = _rasterize_modules(
+            [(x - min_x, y - min_y, size, bits) for x, y, size, bits in placements],
+            max_x - min_x,
+            max_y - min_y,
+            px_per_mm,
+        )
+        yield -1, self._bitmap_xml(black, min_x, min_y, px_per_mm, layer)
+
+    def _bitmap_xml(
+        self, black: np.ndarray, x: float, y: float, px_per_mm: float, layer: int
+    ) -> str:
+        """Add 1-bit Bitmap shape whose top-left pixel corner sits at (x, y)"""
+        layer_idx = self.layer_settings[layer]["index"]
+        height_px, width_px = black.shape
+        width_mm = width_px / px_per_mm
+        height_mm = height_px / px_per_mm
+
+        # Vector shapes are written with y growing row by row while LightBurn's Y axis
+        # points up, so the bitmap is flipped to land exactly on the vector geometry
+        data = base64.b64encode(_png_1bit(black[::-1], px_per_mm)).decode("ascii")
+
+        return (
+            f'<Shape Type="Bitmap" CutIndex={_attr(layer_idx)} '
+            f'W="{width_mm:.4f}" H="{height_mm:.4f}" '
+            'Gamma="1" Contrast="0" Brightness="0" EnhanceAmount="0" EnhanceRadius="0" '
+            f'EnhanceDenoise="0" File="" SourceHash="0" Data="{data}">\n '
+            f"<XForm>1 0 0 1 {x + width_mm / 2:.4f} {y + height_mm / 2:.4f}</XForm>\n "
+            "</Shape>\n "
+        )
+
+    def _cut_settings_xml(
+        self,
+        material: str,
+        fill_mode: str = "vector",
+        bitmap_dpi: int = DEFAULT_BITMAP_DPI,
+    ) -> str:
         """Add material-specific cut settings for different layers"""
-        material_config = self.material_settings.get(material, self.material_settings["1_16_cast_acrylic"])
-        
+        material_config = self.material_settings.get(
+            material, self.material_settings["1_16_cast_acrylic"]
+        )
+
+        settings = []
         for layer_id, layer_config in self.layer_settings.items():
             operation = layer_config["operation"]
-            
+
             # Create cut setting element
-            cs = ET.SubElement(root, "CutSetting", Type=layer_config["type"])
-            ET.SubElement(cs, "index", Value=layer_config["index"])
-            ET.SubElement(cs, "name", Value=layer_config["name"])
-            ET.SubElement(cs, "priority", Value=layer_config["priority"])
-            
+            values = [
+                ("index", layer_config["index"]),
+                ("name", layer_config["name"]),
+                ("priority", layer_config["priority"]),
+            ]
+
             # Add operation-specific settings
             if operation == "cut":
-                ET.SubElement(cs, "runBlower", Value="1")
-                ET.SubElement(cs, "speed", Value=str(material_config["cut_speed"]))
-                ET.SubElement(cs, "maxPower", Value=str(material_config["cut_power"]))
-                ET.SubElement(cs, "minPower", Value=str(material_config["cut_power"]))
-                ET.SubElement(cs, "numPasses", Value=str(material_config["cut_passes"]))
-                ET.SubElement(cs, "zOffset", Value="0")
-                ET.SubElement(cs, "perforate", Value="0")
-                ET.SubElement(cs, "overcut", Value="0")
-                ET.SubElement(cs, "tabsEnabled", Value="0")
-                
+                values += [
+                    ("runBlower", "1"),
+                    ("speed", material_config["cut_speed"]),
+                    ("maxPower", material_config["cut_power"]),
+                    ("minPower", material_config["cut_power"]),
+                    ("numPasses", material_config["cut_passes"]),
+                    ("zOffset", "0"),
+                    ("perforate", "0"),
+                    ("overcut", "0"),
+                    ("tabsEnabled", "0"),
+                ]
+
+            elif operation == "engrave" and fill_mode != "vector":
+                # Bitmap fills run as a single threshold image pass at the bitmap DPI
+                values += [
+                    ("runBlower", "1"),
+                    ("speed", material_config["engrave_speed"]),
+                    ("maxPower", material_config["engrave_power"]),
+                    ("minPower", material_config["engrave_power"]),
+                    ("interval", f"{25.4 / bitmap_dpi:.4f}"),
+                    ("dpi", bitmap_dpi),
+                    ("ditherMode", "threshold"),
+                ]
+                settings.append(
+                    '<CutSetting_Img type="Image">'
+                    + "".join(
+                        f"<{tag} Value={_attr(value)} />" for tag, value in values
+                    )
+                    + "</CutSetting_Img>"
+                )
+                continue
+
             elif operation == "engrave":
-                ET.SubElement(cs, "runBlower", Value="1")
-                ET.SubElement(cs, "speed", Value=str(material_config["engrave_speed"]))
-                ET.SubElement(cs, "maxPower", Value=str(material_config["engrave_power"]))
-                ET.SubElement(cs, "minPower", Value=str(material_config["engrave_power"]))
-                ET.SubElement(cs, "perforate", Value="0")
-                ET.SubElement(cs, "overcut", Value="0")
-                ET.SubElement(cs, "priority", Value=layer_config["priority"])
-                
+                values += [
+                    ("runBlower", "1"),
+                    ("speed", material_config["engrave_speed"]),
+                    ("maxPower", material_config["engrave_power"]),
+                    ("minPower", material_config["engrave_power"]),
+                    ("perforate", "0"),
+                    ("overcut", "0"),
+                    ("priority", layer_config["priority"]),
+                ]
+
             elif operation == "mark":
-                ET.SubElement(cs, "speed", Value=str(material_config["mark_speed"]))
-                ET.SubElement(cs, "maxPower", Value=str(material_config["mark_power"]))
-                ET.SubElement(cs, "minPower", Value=str(material_config["mark_power"]))
-                ET.SubElement(cs, "perforate", Value="0")
-    
-    def _add_rectangle(self, parent, element):
+                values += [
+                    ("speed", material_config["mark_speed"]),
+                    ("maxPower", material_config["mark_power"]),
+                    ("minPower", material_config["mark_power"]),
+                    ("perforate", "0"),
+                ]
+
+            settings.append(
+                f'<CutSetting Type={_attr(layer_config["type"])}>'
+                + "".join(f"<{tag} Value={_attr(value)} />" for tag, value in values)
+                + "</CutSetting>"
+            )
+        return "".join(settings)
+
+    def _rectangle_xml(self, x: float, y: float, w: float, h: float, layer: int) -> str:
         """Add rectangle shape to LightBurn XML"""
-        layer_idx = str(self.layer_settings[element['layer']]['index'])
-        
-        shape = ET.SubElement(parent, "Shape", Type="Path", CutIndex=layer_idx)
-        shape.text = "\n "
-        shape.tail = "\n "
-        
+        layer_idx = self.layer_settings[layer]["index"]
+
         # Create rectangle vertices
-        x, y = element['x'], element['y']
-        w, h = element['width'], element['height']
-        
-        vertices = [
-            f"V{x:.3f} {y:.3f}c0x1c1x1",
-            f"V{x+w:.3f} {y:.3f}c0x1c1x1",
-            f"V{x+w:.3f} {y+h:.3f}c0x1c1x1", 
+        vertices = (
+            f"V{x:.3f} {y:.3f}c0x1c1x1"
+            f"V{x+w:.3f} {y:.3f}c0x1c1x1"
+            f"V{x+w:.3f} {y+h:.3f}c0x1c1x1"
             f"V{x:.3f} {y+h:.3f}c0x1c1x1"
-        ]
-        
-        vl = ET.SubElement(shape, "VertList")
-        vl.text = "".join(vertices)
-        vl.tail = "\n "
-        
-        pl = ET.SubElement(shape, "PrimList")
-        pl.text = "LineClosed"
-        pl.tail = "\n "
-    
-    def _add_text(self, parent, element):
+        )
+
+        return (
+            f'<Shape Type="Path" CutIndex={_attr(layer_idx)}>\n '
+            f"<VertList>{vertices}</VertList>\n "
+            "<PrimList>LineClosed</PrimList>\n "
+            "</Shape>\n "
+        )
+
+    def _path_xml(self, element: Dict[str, Any]) -> str:
+        """Add multi-loop path shape (outline with holes) to LightBurn XML"""
+        layer_idx = self.layer_settings[element["layer"]]["index"]
+
+        # Each loop becomes a closed run of line primitives over its own vertices
+        vertices = []
+        primitives = []
+        for loop in element["loops"]:
+            first = len(vertices)
+            for px, py in loop:
+                vertices.append(f"V{px:.3f} {py:.3f}c0x1c1x1")
+            for i in range(len(loop)):
+                start = first + i
+                end = first + (i + 1) % len(loop)
+                primitives.append(f"L{start} {end}")
+
+        return (
+            f'<Shape Type="Path" CutIndex={_attr(layer_idx)}>\n '
+            f'<VertList>{"".join(vertices)}</VertList>\n '
+            f'<PrimList>{"".join(primitives)}</PrimList>\n '
+            "</Shape>\n "
+        )
+
+    def _text_xml(self, element: Dict[str, Any]) -> str:
         """Add text shape to LightBurn XML"""
-        layer_idx = str(self.layer_settings[element['layer']]['index'])
-        
-        shape = ET.SubElement(parent, "Shape", Type="Text", CutIndex=layer_idx)
-        shape.text = "\n "
-        shape.tail = "\n "
-        
+        layer_idx = self.layer_settings[element["layer"]]["index"]
+
+        # Rotated labels carry a transform turning them about their anchor point
+        xform = ""
+        if element.get("rotation"):
+            angle = np.radians(element["rotation"])
+            a, b = np.cos(angle), np.sin(angle)
+            x, y = element["x"], element["y"]
+            xform = (
+                f"<XForm>{a:.6f} {b:.6f} {-b:.6f} {a:.6f} "
+                f"{x - a * x + b * y:.4f} {y - b * x - a * y:.4f}</XForm>"
+            )
+
         # Text properties
-        ET.SubElement(shape, "Text", LText=element['text'])
-        ET.SubElement(shape, "Font", Size=str(element['font_size']), Bold="False", Italic="False")
-        ET.SubElement(shape, "Pos", x=str(element['x']), y=str(element['y']))
-    
-    def _add_enhanced_notes(self, root, metadata, material: str):
+        return (
+            f'<Shape Type="Text" CutIndex={_attr(layer_idx)}>\n '
+            f"{xform}"
+            f'<Text LText={_attr(element["text"])} />'
+            f'<Font Size={_attr(element["font_size"])} Bold="False" Italic="False" />'
+            f'<Pos x={_attr(element["x"])} y={_attr(element["y"])} />'
+            "</Shape>\n "
+        )
+
+    def _notes_xml(self, metadata: Dict[str, Any], material: str) -> str:
         """Add enhanced metadata with material and settings info"""
-        material_config = self.material_settings.get(material, self.material_settings["1_16_cast_acrylic"])
-        
+        material_config = self.material_settings.get(
+            material, self.material_settings["1_16_cast_acrylic"]
+        )
+
         notes_text = "ArUCO Marker Generator - Optimized for Laser Cutting\n\n"
         notes_text += "=== GENERATION SETTINGS ===\n"
         for key, value in metadata.items():
             notes_text += f"{key}: {value}\n"
-        
-        notes_text += f"\n=== MATERIAL SETTINGS ===\n"
+
+        notes_text += "\n=== MATERIAL SETTINGS ===\n"
         notes_text += f"Material: {material_config['name']}\n"
         notes_text += f"Description: {material_config['description']}\n"
-        notes_text += f"Thickness: 1/16\" (1.5875mm)\n\n"
-        
-        notes_text += f"=== RECOMMENDED LASER SETTINGS ===\n"
-        notes_text += f"Border Cut: {material_config['cut_speed']}mm/min @ {material_config['cut_power']}% power\n"
-        notes_text += f"Fill Engrave: {material_config['engrave_speed']}mm/min @ {material_config['engrave_power']}% power\n"
-        notes_text += f"Label Mark: {material_config['mark_speed']}mm/min @ {material_config['mark_power']}% power\n\n"
-        
-        notes_text += f"=== LAYER INFORMATION ===\n"
-        notes_text += f"Layer 00 (Black): ArUCO marker fill areas - ENGRAVE\n"
-        notes_text += f"Layer 01 (Blue): Border outlines - CUT\n"
-        notes_text += f"Layer T1 (Red): ID labels - MARK/ENGRAVE\n\n"
-        
-        notes_text += f"=== USAGE INSTRUCTIONS ===\n"
-        notes_text += f"1. Load material and set focus height\n"
-        notes_text += f"2. Review and adjust laser settings if needed\n"
-        notes_text += f"3. Run test cuts on scrap material first\n"
-        notes_text += f"4. Process layers in order: Fill (engrave) → Borders (cut) → Labels (mark)\n"
-        notes_text += f"5. Use air assist for clean cuts and prevent charring"
-        
-        notes = ET.SubElement(root, "Notes", ShowOnLoad="1", Notes=notes_text)
-        notes.text = ""
-        notes.tail = "\n"
-    
+        notes_text += 'Thickness: 1/16" (1.5875mm)\n\n'
+
+        notes_text += "=== RECOMMENDED LASER SETTINGS ===\n"
+        notes_text += (
+            f"Border Cut: {material_config['cut_speed']}mm/min"
+            f" @ {material_config['cut_power']}% power\n"
+        )
+        notes_text += (
+            f"Fill Engrave: {material_config['engrave_speed']}mm/min"
+            f" @ {material_config['engrave_power']}% power\n"
+        )
+        notes_text += (
+            f"Label Mark: {material_config['mark_speed']}mm/min"
+            f" @ {material_config['mark_power']}% power\n\n"
+        )
+
+        notes_text += "=== LAYER INFORMATION ===\n"
+        notes_text += "Layer 00 (Black): ArUCO marker fill areas - ENGRAVE\n"
+        notes_text += "Layer 01 (Blue): Border outlines - CUT\n"
+        notes_text += "Layer T1 (Red): ID labels - MARK/ENGRAVE\n\n"
+
+        notes_text += "=== USAGE INSTRUCTIONS ===\n"
+        notes_text += "1. Load material and set focus height\n"
+        notes_text += "2. Review and adjust laser settings if needed\n"
+        notes_text += "3. Run test cuts on scrap material first\n"
+        notes_text += (
+            "4. Process layers in order: "
+            "Fill (engrave) → Borders (cut) → Labels (mark)\n"
+        )
+        notes_text += "5. Use air assist for clean cuts and prevent charring"
+
+        return f'<Notes ShowOnLoad="1" Notes={_attr(notes_text)} />\n'
+
     def get_material_info(self) -> Dict[str, Any]:
         """Return material configuration info for UI"""
         return self.material_settings
+
+
+def _format_duration(seconds: float) -> str:
+    """Human-readable duration like 1h 02m 05s"""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m {seconds:02d}s"
+    return f"{minutes}m {seconds:02d}s"
+
+
+def _attr(value: Any) -> str:
+    """Quote an XML attribute value (same escaping as ElementTree)"""
+    text = str(value)
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return f'"{text}"'
+
+
+def _rasterize_modules(
+    placements: List[Tuple[float, float, float, np.ndarray]],
+    width_mm: float,
+    height_mm: float,
+    px_per_mm: float,
+) -> np.ndarray:
+    """Rasterize (x, y, size, bits) module grids into a boolean image, True = black"""
+    black = np.zeros(
+        (max(1, round(height_mm * px_per_mm)), max(1, round(width_mm * px_per_mm))),
+        dtype=bool,
+    )
+    for x, y, size, bits in placements:
+        col_start, col_end = round(x * px_per_mm), round((x + size) * px_per_mm)
+        row_start, row_end = round(y * px_per_mm), round((y + size) * px_per_mm)
+        if col_end <= col_start or row_end <= row_start:
+            continue
+
+        # Nearest-module lookup for every pixel row and column of the marker
+        cells = bits.shape[0]
+        rows = (np.arange(row_end - row_start) * cells) // (row_end - row_start)
+        cols = (np.arange(col_end - col_start) * cells) // (col_end - col_start)
+        black[row_start:row_end, col_start:col_end] |= bits[np.ix_(rows, cols)].astype(
+            bool
+        )
+    return black
+
+
+def _png_1bit(black: np.ndarray, px_per_mm: float) -> bytes:
+    """Encode a boolean image (True = black) as a 1-bit grayscale PNG with DPI"""
+    height, width = black.shape
+    scanlines = np.packbits(~black, axis=1)  # PNG grayscale: 1 = white
+    raw = np.concatenate(
+        (np.zeros((height, 1), dtype=np.uint8), scanlines), axis=1
+    ).tobytes()
+    px_per_meter = round(px_per_mm * 1000)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + tag
+            + data
+            + struct.pack(">I", zlib.crc32(tag + data))
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 1, 0, 0, 0, 0))
+        + chunk(b"pHYs", struct.pack(">IIB", px_per_meter, px_per_meter, 1))
+        + chunk(b"IDAT", zlib.compress(raw, 9))
+        + chunk(b"IEND", b"")
+    )
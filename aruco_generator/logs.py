@@ -0,0 +1,118 @@
+"""
+{
+  "file_type": "logging_setup",
+  "purpose": "Queued, size-rotated logging so request threads never block on log I/O",
+  "dependencies": [],
+  "key_functions": {
+    "setup_logging": "Route root logging through a queue to a log file and stderr",
+    "RateLimiter.allow": "Per-client token bucket for endpoints that log on request"
+  },
+  "ai_navigation": {
+    "modify_for": "Changing log destinations, formats or rotation",
+    "used_by": ["web.py"],
+    "output_format": "Plain-text log lines in LOG_FILE (per-process {pid} files rotate)"
+  }
+}
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Dict, Tuple
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Client buckets kept by a RateLimiter before idle ones are dropped
+RATE_LIMITER_MAX_CLIENTS = 10000
+
+
+def setup_logging(
+    path: str,
+    level: str = "DEBUG",
+    max_bytes: int = 5 * 1024 * 1024,
+    backup_count: int = 3,
+) -> logging.handlers.QueueListener:
+    """Send root logging through a queue to a log file and the console (stderr)
+
+    Callers only enqueue records; one listener thread formats and writes them, so
+    slow disks and log floods cannot stall request or render threads. Calling it
+    again in the same process returns the running listener.
+
+    Every gunicorn worker runs this, so a plain `path` is shared: it is only
+    appended to, and rotation is left to an external tool (the handler reopens a
+    moved file). A `{pid}` in `path` gives each process its own file, rotated at
+    `max_bytes`. An empty `path` logs to stderr only, for supervisors that
+    collect and rotate output themselves.
+    """
+    root = logging.getLogger()
+    for handler in root.handlers:
+        if isinstance(handler, logging.handlers.QueueHandler) and hasattr(
+            handler, "listener"
+        ):
+            return handler.listener
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if "{pid}" in path:
+        # Only this process writes the file, so rotating it cannot race another
+        handlers.append(
+            logging.handlers.RotatingFileHandler(
+                path.format(pid=os.getpid()),
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                delay=True,
+            )
+        )
+    elif path:
+        handlers.append(logging.handlers.WatchedFileHandler(path, delay=True))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers)
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.listener = listener
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    listener.start()
+    # Flush whatever is still queued on shutdown
+    atexit.register(listener.stop)
+    return listener
+
+
+class RateLimiter:
+    """Token bucket per client: `rate` requests per second, bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[
+            str, Tuple[float, float]
+        ] = {}  # client -> (tokens, last update)
+        self._lock = threading.Lock()
+
+    def allow(self, client: str) -> bool:
+        """Take one token for `client`; False when its bucket is empty"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[client] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > RATE_LIMITER_MAX_CLIENTS:
+                self._prune(now)
+            return allowed
+
+    def _prune(self, now: float):
+        """Drop buckets that have refilled completely (caller holds the lock)"""
+        refill = self.burst / self.rate if self.rate else float("inf")
+        self._buckets = {
+            client: bucket
+            for client, bucket in self._buckets.items()
+            if now - bucket[1] < refill
+        }
@@ -0,0 +1,226 @@
+"""
+{
+  "file_type": "request_metrics",
+  "purpose": "Per-request stage timings (Server-Timing) aggregated for Prometheus",
+  "dependencies": ["flask (g, request)"],
+  "main_class": "Metrics",
+  "key_methods": {
+    "start_request": "Start the stage clock for the current request",
+    "lap": "Record the time since the previous lap as one request stage",
+    "timed_stream": "Wrap a streamed body, timing it as a stage and counting its bytes",
+    "observe_stage": "Record a stage timed outside the request thread",
+    "count": "Add to an element/byte counter for the current endpoint",
+    "server_timing": "Server-Timing header value for the stages run so far",
+    "observe_request": "Record total request latency",
+    "render_prometheus": "All metrics in Prometheus text exposition format"
+  },
+  "ai_navigation": {
+    "modify_for": "Adding stages, counters or histogram buckets",
+    "used_by": ["web.py"],
+    "output_format": "Prometheus text format 0.0.4 (values are per worker process)"
+  }
+}
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple
+from flask import g, has_request_context, request
+
+# Latency buckets in seconds (upper bounds; +Inf is implicit)
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set"""
+
+    def __init__(
+        self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: Dict[
+            Labels, List[float]
+        ] = {}  # labels -> bucket counts + [sum, count]
+
+    def observe(self, labels: Labels, value: float):
+        """Record one observation (caller holds the registry lock)"""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        """Exposition lines: cumulative _bucket series plus _sum and _count"""
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket{_labels((*labels, ('le', le)))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(labels)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_labels(labels)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, value: float = 1):
+        """Add to the counter (caller holds the registry lock)"""
+        self._series[labels] = self._series.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        """Exposition lines for every label set"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines += [
+            f"{self.name}{_labels(labels)} {value:g}"
+            for labels, value in sorted(self._series.items())
+        ]
+        return lines
+
+
+class Metrics:
+    def __init__(self, prefix: str = "aruco"):
+        self._lock = threading.Lock()
+        self.requests = Histogram(
+            f"{prefix}_request_duration_seconds",
+            "Request latency until the response body is closed",
+        )
+        self.stages = Histogram(
+            f"{prefix}_stage_duration_seconds", "Time spent in each request stage"
+        )
+        self.elements = Counter(
+            f"{prefix}_elements_total", "Markers, shapes and files produced"
+        )
+        self.bytes = Counter(
+            f"{prefix}_response_bytes_total",
+            "Response body bytes produced by streamed stages",
+        )
+
+    def start_request(self):
+        """Start the stage clock for the current request"""
+        g.request_started = g.last_lap = time.perf_counter()
+        g.stage_timings = []
+
+    def lap(self, name: str):
+        """Record the time since the previous lap (or request start) as stage `name`"""
+        now = time.perf_counter()
+        seconds = now - g.get("last_lap", now)
+        g.last_lap = now
+        g.setdefault("stage_timings", []).append((name, seconds))
+        self.observe_stage(name, seconds)
+
+    def timed_stream(self, chunks: Iterable, name: str) -> Iterator:
+        """Yield a streamed body, timing it as stage `name` and counting its bytes"""
+        endpoint = _endpoint()
+        elapsed = 0.0
+        size = 0
+        try:
+            iterator = iter(chunks)
+            while True:
+                started = time.perf_counter()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - started
+                size += len(chunk)
+                yield chunk
+        finally:
+            # Body stages run after the headers went out, so they only reach the
+            # histograms
+            self.observe_stage(name, elapsed, endpoint)
+            with self._lock:
+                self.bytes.inc((("endpoint", endpoint),), size)
+
+    def observe_stage(self, name: str, seconds: float, endpoint: str | None = None):
+        """Record a stage measured elsewhere (e.g. render time summed over workers)"""
+        with self._lock:
+            self.stages.observe(
+                (("endpoint", endpoint or _endpoint()), ("stage", name)), seconds
+            )
+
+    def count(self, kind: str, value: int):
+        """Add `value` produced elements of `kind` (markers, shapes, files)"""
+        with self._lock:
+            self.elements.inc((("endpoint", _endpoint()), ("kind", kind)), value)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value for the stages recorded on this request"""
+        timings = g.get("stage_timings", [])
+        total = (
+            time.perf_counter() - g.request_started if "request_started" in g else None
+        )
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float):
+        """Record the latency of one finished request"""
+        with self._lock:
+            self.requests.observe(
+                (("endpoint", endpoint), ("method", method), ("status", str(status))),
+                seconds,
+            )
+
+    def render_prometheus(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.stages, self.elements, self.bytes):
+                lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+def _endpoint() -> str:
+    """Flask endpoint of the current request ('none' outside requests or unmatched)"""
+    if has_request_context() and request.endpoint:
+        return request.endpoint
+    return "none"
+
+
+def _labels(labels: Labels) -> str:
+    """Format a label set as {name="value",...}"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
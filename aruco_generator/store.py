@@ -0,0 +1,264 @@
+"""
+{
+  "file_type": "artifact_store",
+  "purpose": "Content-addressed on-disk store of rendered responses for all workers",
+  "dependencies": ["app.py (db)"],
+  "main_class": "ArtifactStore",
+  "key_methods": {
+    "get": "Open stored artifact for a config hash, or None (expired/missing: miss)",
+    "put": "Store a rendered body",
+    "capture": "Pass a streamed body through while writing it to the store",
+    "evict": "Drop expired, then least recently used artifacts (when full or hourly)",
+    "stats": "Entry count, bytes and hits"
+  },
+  "ai_navigation": {
+    "modify_for": "Changing retention or what responses are stored",
+    "used_by": ["web.py download and batch routes"],
+    "output_format": "instance/artifact_store/<xx>/<hash> files, stored_artifacts rows"
+  }
+}
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Any, Iterable, Iterator
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+
+# Last-access times are only rewritten when older than this, so hot hits don't write the
+# database each time
+ACCESS_UPDATE_SECONDS = 60
+
+# Expired entries are swept at most this often; size-based eviction runs whenever the
+# store is over its limit
+EVICT_INTERVAL_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
+
+class StoredArtifact(db.Model):
+    __tablename__ = "stored_artifacts"
+
+    key = db.Column(db.String(64), primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)
+    mimetype = db.Column(db.String(64), nullable=False)
+    headers = db.Column(db.Text, nullable=False, default="{}")
+    size = db.Column(db.Integer, nullable=False)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    accessed_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.now, index=True
+    )
+
+
+@dataclass(frozen=True)
+class StoreHit:
+    file: BinaryIO
+    mimetype: str
+    headers: Dict[str, str]
+    size: int
+
+
+class ArtifactStore:
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = timedelta(seconds=ttl_seconds)
+        # Running byte total (this worker's view, resynced from the index by every
+        # eviction)
+        self._bytes: int | None = None
+        self._evicted_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """File holding the artifact for `key` (fanned out by its first two digits)"""
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> StoreHit | None:
+        """Stored artifact for `key` opened for reading, or None; expired or missing
+        entries are dropped
+
+        The file is opened here so another worker evicting it before the response is
+        sent cannot turn the hit into an error: the open handle outlives the unlink.
+        """
+        fp = None
+        try:
+            entry = db.session.get(StoredArtifact, key)
+            if entry is None:
+                return None
+            now = datetime.now()
+            if entry.created_at >= now - self.ttl:
+                try:
+                    fp = open(self.path(key), "rb")
+                except FileNotFoundError:
+                    pass
+            if fp is None:
+                self._delete(entry)
+                db.session.commit()
+                return None
+
+            entry.hits += 1
+            if now - entry.accessed_at > timedelta(seconds=ACCESS_UPDATE_SECONDS):
+                entry.accessed_at = now
+            db.session.commit()
+            return StoreHit(
+                file=fp,
+                mimetype=entry.mimetype,
+                headers=json.loads(entry.headers),
+                size=entry.size,
+            )
+        except SQLAlchemyError:
+            # The store only saves work; rendering proceeds if the index is unavailable
+            db.session.rollback()
+            if fp is not None:
+                fp.close()
+            logger.exception("Artifact store lookup failed for %s", key)
+            return None
+
+    def put(
+        self,
+        key: str,
+        kind: str,
+        data: bytes,
+        mimetype: str,
+        headers: Dict[str, str] | None = None,
+    ):
+        """Store a rendered body under `key`"""
+        for _ in self.capture(key, kind, [data], mimetype, headers):
+            pass
+
+    def capture(
+        self,
+        key: str,
+        kind: str,
+        chunks: Iterable[bytes | str],
+        mimetype: str,
+        headers: Dict[str, str] | None = None,
+    ) -> Iterator[bytes | str]:
+        """Yield `chunks` unchanged while writing them (str as UTF-8) to the store
+
+        The artifact is indexed only after the last chunk, so an aborted download
+        (client disconnect, render error) leaves nothing behind. Bodies larger than
+        the whole store are passed through without being kept.
+        """
+        directory = os.path.dirname(self.path(key))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{key}.")
+        size = 0
+        complete = False
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                for chunk in chunks:
+                    data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                    if size <= self.max_bytes:
+                        fp.write(data)
+                    size += len(data)
+                    yield chunk
+            complete = size <= self.max_bytes
+        finally:
+            if complete:
+                self._commit(key, kind, tmp_path, size, mimetype, headers or {})
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self) -> int:
+        """Drop expired artifacts, then least recently used ones down to max_bytes"""
+        removed = 0
+        for entry in StoredArtifact.query.filter(
+            StoredArtifact.created_at < datetime.now() - self.ttl
+        ).all():
+            self._delete(entry)
+            removed += 1
+        db.session.flush()
+
+        total = self._total_bytes()
+        if total > self.max_bytes:
+            for entry in StoredArtifact.query.order_by(
+                StoredArtifact.accessed_at
+            ).all():
+                if total <= self.max_bytes:
+                    break
+                total -= entry.size
+                self._delete(entry)
+                removed += 1
+        db.session.commit()
+        self._bytes = total
+        self._evicted_at = time.monotonic()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes and total hits"""
+        count, size, hits = db.session.query(
+            func.count(StoredArtifact.key),
+            func.coalesce(func.sum(StoredArtifact.size), 0),
+            func.coalesce(func.sum(StoredArtifact.hits), 0),
+        ).one()
+        return {
+            "entries": count,
+            "bytes": int(size),
+            "max_bytes": self.max_bytes,
+            "hits": int(hits),
+        }
+
+    def _commit(
+        self,
+        key: str,
+        kind: str,
+        tmp_path: str,
+        size: int,
+        mimetype: str,
+        headers: Dict[str, str],
+    ):
+        """Move a finished body into place and index it (possibly already stored)"""
+        try:
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path(key))
+            now = datetime.now()
+            db.session.merge(
+                StoredArtifact(
+                    key=key,
+                    kind=kind,
+                    mimetype=mimetype,
+                    headers=json.dumps(headers),
+                    size=size,
+                    hits=0,
+                    created_at=now,
+                    accessed_at=now,
+                )
+            )
+            db.session.commit()
+
+            # Other workers' writes are only seen at the next resync, so the periodic
+            # sweep also bounds drift
+            self._bytes = (
+                self._total_bytes() if self._bytes is None else self._bytes + size
+            )
+            if (
+                self._bytes > self.max_bytes
+                or time.monotonic() - self._evicted_at > EVICT_INTERVAL_SECONDS
+            ):
+                self.evict()
+        except (OSError, SQLAlchemyError):
+            db.session.rollback()
+            logger.exception("Failed to store artifact %s", key)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _total_bytes(self) -> int:
+        """Bytes of all indexed artifacts"""
+        return int(
+            db.session.query(func.coalesce(func.sum(StoredArtifact.size), 0)).scalar()
+        )
+
+    def _delete(self, entry: StoredArtifact):
+        """Remove an entry's file and row (caller commits)"""
+        path = self.path(entry.key)
+        if os.path.exists(path):
+            os.remove(path)
+        db.session.delete(entry)
@@ -0,0 +1,189 @@
+"""
+{
+  "file_type": "toolpath_ordering",
+  "purpose": "Reorder closed shapes within traced laser layers to cut travel moves",
+  "dependencies": ["numpy"],
+  "key_functions": {
+    "order_layers": "Per-layer shape order plus travel before/after",
+    "nearest_neighbor_order": "Greedy nearest-next-shape order from the laser origin",
+    "two_opt": "Reverse segments of an open route while that shortens travel",
+    "travel_distance": "Travel length visiting shape start points in order"
+  },
+  "ai_navigation": {
+    "modify_for": "Changing ordering heuristics or their size limits",
+    "used_by": ["lightburn.py"],
+    "output_format": "Index arrays per layer and a travel report in mm"
+  }
+}
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple
+
+PATH_ORDERS = ("none", "optimized")
+
+# Per-layer strategies. The laser scans all fills of a "scan" layer together, line by
+# line, so shape order cannot change its travel: it is kept and left out of the totals
+LAYER_STRATEGIES = ("nearest", "scan")
+
+# 2-opt is quadratic per pass, so larger layers keep the nearest-neighbour route
+TWO_OPT_MAX_SHAPES = 2000
+TWO_OPT_MAX_PASSES = 8
+
+# Laser head position before the first shape (LightBurn user origin)
+ORIGIN = (0.0, 0.0)
+
+
+@dataclass(frozen=True)
+class ToolpathOrder:
+    orders: Dict[int, np.ndarray]
+    travel_before: Dict[int, float]
+    travel_after: Dict[int, float]
+
+    def report(self) -> Dict[str, Any]:
+        """Travel distances in mm, total and per layer"""
+        before = sum(self.travel_before.values())
+        after = sum(self.travel_after.values())
+        return {
+            "travel_before_mm": round(before, 1),
+            "travel_after_mm": round(after, 1),
+            "travel_saved_pct": round(100 * (before - after) / before, 1)
+            if before
+            else 0.0,
+            "layers": {
+                str(layer): {
+                    "shapes": len(self.orders[layer]),
+                    "travel_before_mm": round(self.travel_before[layer], 1),
+                    "travel_after_mm": round(self.travel_after[layer], 1),
+                }
+                for layer in self.travel_before
+            },
+        }
+
+
+def order_layers(
+    x: np.ndarray, y: np.ndarray, layer: np.ndarray, strategies: Dict[int, str]
+) -> ToolpathOrder:
+    """Order shape start points (x, y) within each layer
+
+    Shapes are closed loops, so the laser ends each one where it started and travel
+    is the distance between consecutive start points. Each layer uses the strategy
+    named in `strategies` ("nearest" or "scan"); other layers keep their order.
+    "scan" layers get no travel figures. Returned orders index into the input
+    arrays.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    layer = np.asarray(layer)
+
+    orders, before, after = {}, {}, {}
+    for layer_id in dict.fromkeys(layer.tolist()):
+        index = np.flatnonzero(layer == layer_id)
+        layer_x, layer_y = x[index], y[index]
+        strategy = strategies.get(layer_id)
+        if strategy == "scan":
+            orders[layer_id] = index
+            continue
+        if strategy == "nearest":
+            order = nearest_neighbor_order(layer_x, layer_y)
+            if len(order) <= TWO_OPT_MAX_SHAPES:
+                order = two_opt(order, layer_x, layer_y)
+        elif strategy is None:
+            order = np.arange(len(index))
+        else:
+            raise ValueError(f"Unknown layer strategy: {strategy}")
+
+        # Heuristics never make a layer worse than it was written
+        original = travel_distance(layer_x, layer_y)
+        optimized = travel_distance(layer_x[order], layer_y[order])
+        if optimized > original:
+            order, optimized = np.arange(len(index)), original
+        orders[layer_id] = index[order]
+        before[layer_id] = original
+        after[layer_id] = optimized
+
+    return ToolpathOrder(orders=orders, travel_before=before, travel_after=after)
+
+
+def travel_distance(
+    x: np.ndarray, y: np.ndarray, origin: Tuple[float, float] = ORIGIN
+) -> float:
+    """Travel from the origin through every start point in order"""
+    if len(x) == 0:
+        return 0.0
+    px = np.concatenate(([origin[0]], x))
+    py = np.concatenate(([origin[1]], y))
+    return float(np.hypot(np.diff(px), np.diff(py)).sum())
+
+
+def nearest_neighbor_order(
+    x: np.ndarray, y: np.ndarray, origin: Tuple[float, float] = ORIGIN
+) -> np.ndarray:
+    """Greedy route: from the origin, always move to the closest unvisited start"""
+    count = len(x)
+    order = np.empty(count, dtype=np.intp)
+    visited = np.zeros(count, dtype=bool)
+    cx, cy = origin
+    for step in range(count):
+        distance = np.hypot(x - cx, y - cy)
+        distance[visited] = np.inf
+        nearest = int(np.argmin(distance))
+        order[step] = nearest
+        visited[nearest] = True
+        cx, cy = x[nearest], y[nearest]
+    return order
+
+
+def two_opt(
+    order: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    origin: Tuple[float, float] = ORIGIN,
+    max_passes: int = TWO_OPT_MAX_PASSES,
+) -> np.ndarray:
+    """Improve an open route starting at the origin by reversing segments
+
+    Reversing route[i..j] replaces edges (i-1, i) and (j, j+1) with (i-1, j) and
+    (i, j+1); all j for a given i are evaluated at once.
+    """
+    route = np.asarray(order, dtype=np.intp).copy()
+    count = len(route)
+    if count < 3:
+        return route
+
+    for _ in range(max_passes):
+        improved = False
+        px = np.concatenate(([origin[0]], x[route]))
+        py = np.concatenate(([origin[1]], y[route]))
+        for i in range(1, count):
+            j = np.arange(i + 1, count + 1)
+            removed = np.hypot(px[i] - px[i - 1], py[i] - py[i - 1]) + _next_edge(
+                px, py, j
+            )
+            added = np.hypot(px[j] - px[i - 1], py[j] - py[i - 1]) + _next_edge(
+                px, py, j, start=i
+            )
+            gain = removed - added
+            best = int(np.argmax(gain))
+            if gain[best] > 1e-9:
+                k = int(j[best])
+                px[i : k + 1] = px[i : k + 1][::-1].copy()
+                py[i : k + 1] = py[i : k + 1][::-1].copy()
+                route[i - 1 : k] = route[i - 1 : k][::-1].copy()
+                improved = True
+        if not improved:
+            break
+    return route
+
+
+def _next_edge(
+    px: np.ndarray, py: np.ndarray, j: np.ndarray, start: int | None = None
+) -> np.ndarray:
+    """Length of the edge leaving point j (or point `start`); 0 at the route end"""
+    following = np.minimum(j + 1, len(px) - 1)
+    fx = px[j] if start is None else px[start]
+    fy = py[j] if start is None else py[start]
+    length = np.hypot(px[following] - fx, py[following] - fy)
+    length[j + 1 >= len(px)] = 0.0
+    return length
@@ -5,10 +5,11 @@
   "routes": {
     "/": "Main application page with streamlined UI",
     "/api/dictionaries": "Get available ArUCO dictionaries",
-    "/api/preview": "Generate SVG preview",
+    "/api/preview": "SVG preview (JSON, or streamed image/svg+xml with ?format=svg)",
     "/api/download": "Download LightBurn file",
     "/api/quick-test": "Quick test generation",
-    "/api/quick-test/download": "Download quick test file"
+    "/api/quick-test/download": "Download quick test file",
+    "/api/download_ids": "Download one LightBurn file with an arbitrary ID list"
   },
   "dependencies": ["aruco.py", "drawing.py", "lightburn.py", "batch.py"],
   "ai_navigation": {
@@ -20,482 +21,1315 @@
 """
 
 import os
+import json
+import time
+import threading
 import logging
-import traceback
 from datetime import datetime
-from flask import render_template, request, jsonify, send_file
-from .aruco import ArUCOGenerator
+from functools import partial
+from flask import (
+    render_template,
+    request,
+    jsonify,
+    send_file,
+    Response,
+    stream_with_context,
+    g,
+)
+from .aruco import ArUCOGenerator, load_marker_atlas
 from .drawing import DrawingContext
-from .lightburn import LightBurnExporter
-from .batch import BatchGenerator
+from .lightburn import (
+    LightBurnExporter,
+    FILL_MODES,
+    SHAPE_GROUPINGS,
+    DEFAULT_BITMAP_DPI,
+)
+from .batch import BatchGenerator, parse_id_list
+from .jobs import BatchJobManager, FINISHED_STATES
+from .config import config_hash
+from .artifacts import ArtifactCache
+from .store import ArtifactStore
+from .geometry import MERGE_STRATEGIES
+from .toolpath import PATH_ORDERS
+from .metrics import Metrics
+from .logs import setup_logging, RateLimiter
 
 # Get Flask app from main app.py
-from app import app
+from app import app, db
+
+setup_logging(
+    app.config["LOG_FILE"],
+    app.config["LOG_LEVEL"],
+    app.config["LOG_MAX_BYTES"],
+    app.config["LOG_BACKUP_COUNT"],
+)
+logger = logging.getLogger(__name__)
 
-# Initialize generators
+# Initialize generators on the memory-mapped marker atlas (spawned batch workers map it
+# again)
+if app.config["MARKER_ATLAS"]:
+    load_marker_atlas(app.config["MARKER_ATLAS"])
 aruco_gen = ArUCOGenerator()
 lightburn_exporter = LightBurnExporter()
+batch_generator = BatchGenerator(
+    app.config["BATCH_POOL"],
+    app.config["BATCH_WORKERS"],
+    app.config["MARKER_ATLAS"] or None,
+)
+batch_jobs = BatchJobManager(
+    app,
+    batch_generator,
+    os.path.join(app.instance_path, "batch_jobs"),
+    app.config["BATCH_JOB_WORKERS"],
+    app.config["BATCH_JOB_TTL"],
+)
+metrics = Metrics()
+artifact_store = (
+    ArtifactStore(
+        app.config["ARTIFACT_STORE_DIR"],
+        app.config["ARTIFACT_STORE_MAX_BYTES"],
+        app.config["ARTIFACT_STORE_TTL"],
+    )
+    if app.config["ARTIFACT_STORE_DIR"]
+    else None
+)
+error_report_limiter = RateLimiter(
+    app.config["LOG_ERROR_RATE"] / 60, max(1, app.config["LOG_ERROR_RATE"] // 3)
+)
+
+# Longest frontend error field written to the log
+MAX_ERROR_FIELD_LENGTH = 4000
+
+# Seconds one job event stream stays open, kept below gunicorn's default 30 s worker
+# timeout; EventSource clients reconnect and resume from the current status
+JOB_EVENTS_MAX_SECONDS = 25
+
+# Preset configurations offered by the UI
+PRESETS = {
+    "business_cards": {
+        "name": "Business Cards",
+        "description": "Small markers for business cards",
+        "dictionary": "4X4_50",
+        "rows": 2,
+        "cols": 5,
+        "size_mm": 15,
+        "spacing_mm": 3,
+        "include_borders": True,
+        "include_labels": False,
+    },
+    "inventory_tags": {
+        "name": "Inventory Tags",
+        "description": "Medium markers for inventory management",
+        "dictionary": "4X4_100",
+        "rows": 5,
+        "cols": 10,
+        "size_mm": 10,
+        "spacing_mm": 2,
+        "include_borders": True,
+        "include_labels": True,
+    },
+    "large_markers": {
+        "name": "Large Display Markers",
+        "description": "Large markers for wall displays",
+        "dictionary": "6X6_50",
+        "rows": 1,
+        "cols": 1,
+        "size_mm": 50,
+        "spacing_mm": 10,
+        "include_borders": True,
+        "include_labels": True,
+    },
+    "test_sheet": {
+        "name": "Test Sheet",
+        "description": "Standard test grid",
+        "dictionary": "4X4_50",
+        "rows": 3,
+        "cols": 3,
+        "size_mm": 20,
+        "spacing_mm": 5,
+        "include_borders": True,
+        "include_labels": True,
+    },
+    "production_run": {
+        "name": "Production Run",
+        "description": "Large batch for production",
+        "dictionary": "5X5_250",
+        "rows": 10,
+        "cols": 10,
+        "size_mm": 8,
+        "spacing_mm": 1,
+        "include_borders": False,
+        "include_labels": False,
+    },
+}
+
+# Fixed quick-test sheet: two 2" 6X6_250 markers stacked vertically with an outer border
+QUICK_TEST_CONFIG = {
+    "dictionary": "6X6_250",  # Good balance of reliability and marker count
+    "start_id": 0,
+    "rows": 2,
+    "cols": 1,
+    "size_mm": 50.8,  # 2 inches
+    "spacing_mm": 5.0,
+    "include_borders": True,
+    "include_labels": True,
+    "include_outer_border": True,
+    "border_width": 2.5,  # 2.5mm border around the whole thing
+}
+
+
+def _deterministic(data: dict) -> bool:
+    """Whether to render without timestamps (overrides DETERMINISTIC_OUTPUT)"""
+    value = data.get("deterministic", app.config["DETERMINISTIC_OUTPUT"])
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "1", "false", "0"):
+        return value.strip().lower() in ("true", "1")
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise ValueError(f"deterministic must be true or false, got {value!r}")
+
+
+def _not_modified(etag: str):
+    """Return a 304 response if the client already holds this ETag, else None"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+def _stored_response(etag: str):
+    """Serve a stored artifact for this config hash from disk, else None
+
+    The store hands back an open file, which send_file streams and closes.
+    """
+    if artifact_store is None:
+        return None
+    stored = artifact_store.get(etag)
+    if stored is None:
+        return None
+    response = send_file(
+        stored.file, mimetype=stored.mimetype, conditional=False, etag=False
+    )
+    response.content_length = stored.size
+    response.headers.update(stored.headers)
+    response.set_etag(etag)
+    response.headers["X-Artifact-Store"] = "hit"
+    metrics.lap("store")
+    return response
+
+
+def _store_body(
+    etag: str, kind: str, chunks, mimetype: str, headers: dict | None = None
+):
+    """Stream `chunks` while saving them to the artifact store (ETag added on serve)"""
+    if artifact_store is None:
+        return chunks
+    headers = {key: value for key, value in (headers or {}).items() if key != "ETag"}
+    return artifact_store.capture(etag, kind, chunks, mimetype, headers)
+
+
+@app.before_request
+def _start_timing():
+    metrics.start_request()
+
+
+@app.after_request
+def _finish_timing(response):
+    """Add Server-Timing for the stages so far; record latency when the body closes"""
+    if g.get("stage_timings"):
+        response.headers["Server-Timing"] = metrics.server_timing()
+    endpoint, method, status, started = (
+        request.endpoint or "none",
+        request.method,
+        response.status_code,
+        g.request_started,
+    )
+    response.call_on_close(
+        lambda: metrics.observe_request(
+            endpoint, method, status, time.perf_counter() - started
+        )
+    )
+    return response
+
 
-@app.route('/')
+@app.route("/")
 def index():
     """Main application page"""
     dictionaries = aruco_gen.get_dictionary_info()
-    return render_template('index.html', dictionaries=dictionaries)
+    return render_template("index.html", dictionaries=dictionaries)
 
-@app.route('/api/dictionaries')
+
+@app.route("/api/dictionaries")
 def get_dictionaries():
     """API endpoint to get available ArUCO dictionaries"""
     return jsonify(aruco_gen.get_dictionary_info())
 
-@app.route('/api/preview', methods=['POST'])
+
+@app.route("/api/preview", methods=["POST"])
 def generate_preview():
     """Generate SVG preview of markers"""
     try:
         data = request.get_json()
-        
+
         # Validate input parameters
-        dictionary = data.get('dictionary')
-        start_id = int(data.get('start_id', 0))
-        rows = int(data.get('rows', 1))
-        cols = int(data.get('cols', 1))
-        size_mm = float(data.get('size_mm', 20))
-        spacing_mm = float(data.get('spacing_mm', 5))
-        include_borders = data.get('include_borders', True)
-        include_labels = data.get('include_labels', True)
-        include_outer_border = data.get('include_outer_border', False)
-        border_width = float(data.get('border_width', 2.0))
-        
+        dictionary = data.get("dictionary")
+        start_id = int(data.get("start_id", 0))
+        rows = int(data.get("rows", 1))
+        cols = int(data.get("cols", 1))
+        size_mm = float(data.get("size_mm", 20))
+        spacing_mm = float(data.get("spacing_mm", 5))
+        include_borders = data.get("include_borders", True)
+        include_labels = data.get("include_labels", True)
+        include_outer_border = data.get("include_outer_border", False)
+        border_width = float(data.get("border_width", 2.0))
+        merge = data.get("merge", "none")
+        svg_encoding = data.get("svg_encoding", "compact")
+        fill_mode = data.get("fill_mode", "vector")
+        bitmap_dpi = int(data.get("bitmap_dpi", DEFAULT_BITMAP_DPI))
+        path_order = data.get("path_order", "none")
+
         # Validate dictionary
         if dictionary not in aruco_gen.dictionaries:
-            return jsonify({'error': f'Invalid dictionary: {dictionary}'}), 400
-        
+            return jsonify({"error": f"Invalid dictionary: {dictionary}"}), 400
+
+        if svg_encoding not in ("compact", "rects"):
+            return jsonify({"error": f"Invalid SVG encoding: {svg_encoding}"}), 400
+
+        # Export options only feed the job time estimate
+        if fill_mode not in FILL_MODES:
+            return jsonify({"error": f"Invalid fill_mode: {fill_mode}"}), 400
+        if not 50 <= bitmap_dpi <= 1200:
+            return jsonify({"error": "bitmap_dpi must be between 50 and 1200"}), 400
+        if path_order not in PATH_ORDERS:
+            return jsonify({"error": f"Invalid path_order: {path_order}"}), 400
+
         # Validate marker count
-        dict_info = aruco_gen.get_dictionary_info()[dictionary]
+        max_markers = aruco_gen.registry.max_markers(dictionary)
         total_markers = rows * cols
-        if start_id + total_markers > dict_info['max_markers']:
-            return jsonify({
-                'error': f'Too many markers. Dictionary {dictionary} supports max {dict_info["max_markers"]} markers.'
-            }), 400
-        
+        if start_id + total_markers > max_markers:
+            return (
+                jsonify(
+                    {
+                        "error": f"Too many markers. Dictionary {dictionary} "
+                        f"supports max {max_markers} markers."
+                    }
+                ),
+                400,
+            )
+
         # Validate dimensions
         if size_mm <= 0 or spacing_mm < 0:
-            return jsonify({'error': 'Invalid dimensions. Size must be positive, spacing non-negative.'}), 400
-        
+            return (
+                jsonify(
+                    {
+                        "error": "Invalid dimensions. Size must be positive, "
+                        "spacing non-negative."
+                    }
+                ),
+                400,
+            )
+
         if rows <= 0 or cols <= 0:
-            return jsonify({'error': 'Grid dimensions must be positive.'}), 400
-        
-        # Generate markers
-        markers = aruco_gen.generate_grid(start_id, dictionary, rows, cols, size_mm, spacing_mm)
-        
+            return jsonify({"error": "Grid dimensions must be positive."}), 400
+
+        # Previews contain no timestamps, so the config hash is a strong ETag
+        output_format = (
+            "svg" if request.args.get("format", data.get("format")) == "svg" else "json"
+        )
+        etag = config_hash(
+            "preview",
+            {
+                "dictionary": dictionary,
+                "start_id": start_id,
+                "rows": rows,
+                "cols": cols,
+                "size_mm": size_mm,
+                "spacing_mm": spacing_mm,
+                "include_borders": bool(include_borders),
+                "include_labels": bool(include_labels),
+                "include_outer_border": bool(include_outer_border),
+                "border_width": border_width,
+                "merge": merge,
+                "svg_encoding": svg_encoding,
+                "format": output_format,
+                "fill_mode": fill_mode,
+                "bitmap_dpi": bitmap_dpi,
+                "path_order": path_order,
+            },
+        )
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+        metrics.lap("parse")
+
+        # Previews render in milliseconds and change on every edit, so they skip the
+        # artifact store
+        markers = aruco_gen.generate_grid_table(
+            start_id, dictionary, rows, cols, size_mm, spacing_mm
+        )
+        metrics.lap("markers")
+
         # Create drawing context
         context = DrawingContext()
-        context.add_marker_grid(markers, include_borders, include_outer_border, border_width)
-        
+        geometry_report = context.add_marker_grid(
+            markers, include_borders, include_outer_border, border_width, merge
+        )
+
         if include_labels:
             context.add_text_labels(markers)
-        
-        # Generate SVG
-        svg_content = context.get_svg()
-        
+        metrics.lap("geometry")
+        metrics.count("markers", len(markers))
+        metrics.count("shapes", geometry_report["shapes"])
+
         # Calculate total dimensions
-        total_width, total_height = aruco_gen.calculate_total_size(rows, cols, size_mm, spacing_mm)
-        
+        total_width, total_height = aruco_gen.calculate_total_size(
+            rows, cols, size_mm, spacing_mm
+        )
+
         # Add border width to dimensions if outer border is included
         if include_outer_border:
             total_width += 2 * border_width
             total_height += 2 * border_width
-        
-        return jsonify({
-            'svg': svg_content,
-            'dimensions': {
-                'width': round(total_width, 2),
-                'height': round(total_height, 2)
-            },
-            'total_width': total_width,
-            'total_height': total_height,
-            'marker_count': len(markers),
-            'success': True
-        })
-        
+
+        # Machine time for the file /api/download would produce from the same config
+        toolpath = (
+            lightburn_exporter.plan_toolpath(context, fill_mode)
+            if path_order == "optimized"
+            else None
+        )
+        estimate = lightburn_exporter.estimate_job(
+            context, fill_mode=fill_mode, bitmap_dpi=bitmap_dpi, toolpath=toolpath
+        )
+        metrics.lap("estimate")
+
+        # Raw mode streams the SVG document itself; metadata travels in headers
+        if output_format == "svg":
+            headers = {
+                "ETag": f'"{etag}"',
+                "X-Dimensions-Width": str(round(total_width, 2)),
+                "X-Dimensions-Height": str(round(total_height, 2)),
+                "X-Marker-Count": str(len(markers)),
+                "X-Geometry-Shapes": str(geometry_report["shapes"]),
+                "X-Geometry-Cells": str(geometry_report["cells"]),
+                "X-Estimated-Seconds": str(round(estimate.total_seconds, 1)),
+            }
+            svg_stream = metrics.timed_stream(
+                context.iter_svg(compact=svg_encoding == "compact"), "svg"
+            )
+            return Response(
+                stream_with_context(svg_stream),
+                mimetype="image/svg+xml",
+                headers=headers,
+            )
+
+        # Generate SVG
+        svg_content = context.get_svg(compact=svg_encoding == "compact")
+        metrics.lap("svg")
+
+        response = jsonify(
+            {
+                "svg": svg_content,
+                "dimensions": {
+                    "width": round(total_width, 2),
+                    "height": round(total_height, 2),
+                },
+                "total_width": total_width,
+                "total_height": total_height,
+                "marker_count": len(markers),
+                "geometry": geometry_report,
+                "estimate": estimate.to_dict(),
+                "success": True,
+            }
+        )
+        response.set_etag(etag)
+        return response
+
     except ValueError as e:
-        return jsonify({'error': str(e)}), 400
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
 
-@app.route('/api/download', methods=['POST'])
+
+@app.route("/api/download", methods=["POST"])
 def download_lightburn():
     """Generate and download LightBurn file"""
     try:
         data = request.get_json()
-        
+
         # Validate input (same as preview)
-        dictionary = data.get('dictionary')
-        start_id = int(data.get('start_id', 0))
-        rows = int(data.get('rows', 1))
-        cols = int(data.get('cols', 1))
-        size_mm = float(data.get('size_mm', 20))
-        spacing_mm = float(data.get('spacing_mm', 5))
-        include_borders = data.get('include_borders', True)
-        include_labels = data.get('include_labels', True)
-        include_outer_border = data.get('include_outer_border', False)
-        border_width = float(data.get('border_width', 2.0))
-        
+        dictionary = data.get("dictionary")
+        start_id = int(data.get("start_id", 0))
+        rows = int(data.get("rows", 1))
+        cols = int(data.get("cols", 1))
+        size_mm = float(data.get("size_mm", 20))
+        spacing_mm = float(data.get("spacing_mm", 5))
+        include_borders = data.get("include_borders", True)
+        include_labels = data.get("include_labels", True)
+        include_outer_border = data.get("include_outer_border", False)
+        border_width = float(data.get("border_width", 2.0))
+        merge = data.get("merge", "none")
+        fill_mode = data.get("fill_mode", "vector")
+        bitmap_dpi = int(data.get("bitmap_dpi", DEFAULT_BITMAP_DPI))
+        grouping = data.get("grouping", "shape")
+        path_order = data.get("path_order", "none")
+
         # Validate dictionary
         if dictionary not in aruco_gen.dictionaries:
-            return jsonify({'error': f'Invalid dictionary: {dictionary}'}), 400
-        
+            return jsonify({"error": f"Invalid dictionary: {dictionary}"}), 400
+
+        # Validate engrave output (checked here since the export is streamed)
+        if fill_mode not in FILL_MODES:
+            return jsonify({"error": f"Invalid fill_mode: {fill_mode}"}), 400
+        if not 50 <= bitmap_dpi <= 1200:
+            return jsonify({"error": "bitmap_dpi must be between 50 and 1200"}), 400
+        if grouping not in SHAPE_GROUPINGS:
+            return jsonify({"error": f"Invalid grouping: {grouping}"}), 400
+        if path_order not in PATH_ORDERS:
+            return jsonify({"error": f"Invalid path_order: {path_order}"}), 400
+        if path_order != "none" and grouping != "shape":
+            return jsonify({"error": "path_order needs grouping 'shape'"}), 400
+
+        # Deterministic exports depend only on the config, so its hash is a strong ETag
+        deterministic = _deterministic(data)
+        etag = config_hash(
+            "download",
+            {
+                "dictionary": dictionary,
+                "start_id": start_id,
+                "rows": rows,
+                "cols": cols,
+                "size_mm": size_mm,
+                "spacing_mm": spacing_mm,
+                "include_borders": bool(include_borders),
+                "include_labels": bool(include_labels),
+                "include_outer_border": bool(include_outer_border),
+                "border_width": border_width,
+                "merge": merge,
+                "fill_mode": fill_mode,
+                "bitmap_dpi": bitmap_dpi,
+                "grouping": grouping,
+                "path_order": path_order,
+            },
+        )
+        if deterministic:
+            not_modified = _not_modified(etag)
+            if not_modified:
+                return not_modified
+        metrics.lap("parse")
+        stored = _stored_response(etag) if deterministic else None
+        if stored:
+            return stored
+
         # Generate markers
-        markers = aruco_gen.generate_grid(start_id, dictionary, rows, cols, size_mm, spacing_mm)
-        
+        markers = aruco_gen.generate_grid_table(
+            start_id, dictionary, rows, cols, size_mm, spacing_mm
+        )
+        metrics.lap("markers")
+
         # Create drawing context
         context = DrawingContext()
-        context.add_marker_grid(markers, include_borders, include_outer_border, border_width)
-        
+        geometry_report = context.add_marker_grid(
+            markers, include_borders, include_outer_border, border_width, merge
+        )
+
         if include_labels:
             context.add_text_labels(markers)
-        
+        metrics.lap("geometry")
+        metrics.count("markers", len(markers))
+        metrics.count("shapes", geometry_report["shapes"])
+
         # Create metadata
         metadata = {
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'dictionary': dictionary,
-            'rows': rows,
-            'cols': cols,
-            'size_mm': size_mm,
-            'spacing_mm': spacing_mm,
-            'total_markers': len(markers),
-            'start_id': start_id
+            **(
+                {"config_hash": etag}
+                if deterministic
+                else {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            ),
+            "dictionary": dictionary,
+            "rows": rows,
+            "cols": cols,
+            "size_mm": size_mm,
+            "spacing_mm": spacing_mm,
+            "total_markers": len(markers),
+            "start_id": start_id,
+            "geometry_merge": (
+                f"{merge} ({geometry_report['cells']} cells -> "
+                f"{geometry_report['shapes']} shapes)"
+            ),
+            "fill_mode": fill_mode
+            if fill_mode == "vector"
+            else f"{fill_mode} ({bitmap_dpi} DPI)",
         }
-        
-        # Export to LightBurn format
-        lbrn_file = lightburn_exporter.export(context, metadata)
-        
+
         # Generate filename
         filename = f"aruco_{dictionary}_{rows}x{cols}_id{start_id}.lbrn2"
-        
-        return send_file(
-            lbrn_file,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/xml'
+
+        # Stream LightBurn export as it is serialized
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        if deterministic:
+            headers["ETag"] = f'"{etag}"'
+
+        # Plan the toolpath up front so its travel report can go in the headers
+        toolpath = None
+        if path_order == "optimized":
+            toolpath = lightburn_exporter.plan_toolpath(context, fill_mode)
+            travel = toolpath.report()
+            headers["X-Travel-Before-mm"] = str(travel["travel_before_mm"])
+            headers["X-Travel-After-mm"] = str(travel["travel_after_mm"])
+            metrics.lap("toolpath")
+        lbrn_stream = metrics.timed_stream(
+            lightburn_exporter.iter_export(
+                context,
+                metadata,
+                fill_mode=fill_mode,
+                bitmap_dpi=bitmap_dpi,
+                grouping=grouping,
+                toolpath=toolpath,
+            ),
+            "lbrn",
         )
-        
+        if deterministic:
+            lbrn_stream = _store_body(
+                etag, "download", lbrn_stream, "application/xml", headers
+            )
+        return Response(
+            stream_with_context(lbrn_stream),
+            mimetype="application/xml",
+            headers=headers,
+        )
+
     except ValueError as e:
-        return jsonify({'error': str(e)}), 400
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
 
-@app.route('/api/presets')
+
+@app.route("/api/presets")
 def get_presets():
     """Get common preset configurations"""
-    return jsonify({
-        "business_cards": {
-            "name": "Business Cards",
-            "description": "Small markers for business cards",
-            "dictionary": "4X4_50",
-            "rows": 2,
-            "cols": 5,
-            "size_mm": 15,
-            "spacing_mm": 3,
-            "include_borders": True,
-            "include_labels": False
-        },
-        "inventory_tags": {
-            "name": "Inventory Tags", 
-            "description": "Medium markers for inventory management",
-            "dictionary": "4X4_100",
-            "rows": 5,
-            "cols": 10,
-            "size_mm": 10,
-            "spacing_mm": 2,
-            "include_borders": True,
-            "include_labels": True
-        },
-        "large_markers": {
-            "name": "Large Display Markers",
-            "description": "Large markers for wall displays",
-            "dictionary": "6X6_50",
-            "rows": 1,
-            "cols": 1,
-            "size_mm": 50,
-            "spacing_mm": 10,
-            "include_borders": True,
-            "include_labels": True
-        },
-        "test_sheet": {
-            "name": "Test Sheet",
-            "description": "Standard test grid",
-            "dictionary": "4X4_50",
-            "rows": 3,
-            "cols": 3,
-            "size_mm": 20,
-            "spacing_mm": 5,
-            "include_borders": True,
-            "include_labels": True
-        },
-        "production_run": {
-            "name": "Production Run",
-            "description": "Large batch for production",
-            "dictionary": "5X5_250",
-            "rows": 10,
-            "cols": 10,
-            "size_mm": 8,
-            "spacing_mm": 1,
-            "include_borders": False,
-            "include_labels": False
-        }
-    })
+    return _artifact_response(artifact_cache.get("presets"), "application/json")
+
+
+@app.route("/api/presets/<preset_name>/preview.svg")
+def get_preset_preview(preset_name):
+    """Precomputed SVG preview of a preset"""
+    if preset_name not in PRESETS:
+        return jsonify({"success": False, "error": "Preset not found"}), 404
+    return _artifact_response(
+        artifact_cache.get(f"preset_preview:{preset_name}"), "image/svg+xml"
+    )
+
 
-@app.route('/api/apply_preset/<preset_name>')
+@app.route("/api/apply_preset/<preset_name>")
 def apply_preset(preset_name):
     """Apply a specific preset configuration"""
-    presets_response = get_presets()
-    presets = presets_response.get_json()
-    if preset_name in presets:
-        return jsonify({"success": True, "preset": presets[preset_name]})
+    if preset_name in PRESETS:
+        return jsonify({"success": True, "preset": PRESETS[preset_name]})
     return jsonify({"success": False, "error": "Preset not found"}), 404
 
-@app.route('/api/material_info')
+
+@app.route("/api/material_info")
 def get_material_info():
     """Get material configuration information"""
     return jsonify(lightburn_exporter.get_material_info())
 
-@app.route('/api/quick-test', methods=['POST'])
+
+@app.route("/api/quick-test", methods=["POST"])
 def generate_quick_test():
-    """Generate quick test: 2 ArUCO codes (2" x 2") stacked vertically with outer border"""
+    """Generate quick test: 2 ArUCO codes (2" x 2") stacked, with outer border"""
     try:
-        # Fixed parameters for quick test
-        dictionary = "6X6_250"  # Good balance of reliability and marker count
-        start_id = 0
-        rows = 2
-        cols = 1
-        size_mm = 50.8  # 2 inches = 50.8mm
-        spacing_mm = 5.0  # Small spacing between markers
-        include_borders = True
-        include_labels = True
-        include_outer_border = True
-        border_width = 2.5  # 2.5mm border around the whole thing
-        
-        # Generate markers
-        markers = aruco_gen.generate_grid(start_id, dictionary, rows, cols, size_mm, spacing_mm)
-        
-        # Create drawing context
-        context = DrawingContext()
-        context.add_marker_grid(markers, include_borders, include_outer_border, border_width)
-        
-        if include_labels:
-            context.add_text_labels(markers)
-        
-        # Calculate total dimensions including border
-        total_width, total_height = aruco_gen.calculate_total_size(rows, cols, size_mm, spacing_mm)
-        total_width_with_border = total_width + (2 * border_width)
-        total_height_with_border = total_height + (2 * border_width)
-        
-        # Generate SVG
-        svg_content = context.get_svg()
-        
-        return jsonify({
-            'svg': svg_content,
-            'dimensions': {
-                'width': round(total_width_with_border, 2),
-                'height': round(total_height_with_border, 2)
-            },
-            'total_width': total_width_with_border,
-            'total_height': total_height_with_border,
-            'marker_count': len(markers),
-            'success': True,
-            'test_config': {
-                'dictionary': dictionary,
-                'start_id': start_id,
-                'rows': rows,
-                'cols': cols,
-                'size_mm': size_mm,
-                'spacing_mm': spacing_mm,
-                'include_borders': include_borders,
-                'include_labels': include_labels,
-                'include_outer_border': include_outer_border,
-                'border_width': border_width
-            }
-        })
-        
+        return _artifact_response(
+            artifact_cache.get("quick_test_preview"), "application/json"
+        )
     except Exception as e:
-        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
 
-@app.route('/api/quick-test/download', methods=['POST'])
+@app.route("/api/quick-test/download", methods=["POST"])
 def download_quick_test():
     """Download LightBurn file for quick test configuration"""
     try:
-        # Same fixed parameters as quick test preview
-        dictionary = "6X6_250"
-        start_id = 0
-        rows = 2
-        cols = 1
-        size_mm = 50.8  # 2 inches
-        spacing_mm = 5.0
-        include_borders = True
-        include_labels = True
-        include_outer_border = True
-        border_width = 2.5
-        
-        # Generate markers
-        markers = aruco_gen.generate_grid(start_id, dictionary, rows, cols, size_mm, spacing_mm)
-        
-        # Create drawing context
-        context = DrawingContext()
-        context.add_marker_grid(markers, include_borders, include_outer_border, border_width)
-        
-        if include_labels:
-            context.add_text_labels(markers)
-        
-        # Create metadata
-        metadata = {
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'dictionary': dictionary,
-            'rows': rows,
-            'cols': cols,
-            'size_mm': size_mm,
-            'spacing_mm': spacing_mm,
-            'total_markers': len(markers),
-            'start_id': start_id,
-            'test_type': 'Quick Test - 2x2 inch markers'
-        }
-        
-        # Export to LightBurn format
-        lbrn_file = lightburn_exporter.export(context, metadata)
-        
-        # Generate filename for quick test
-        filename = f"aruco_quick_test_{rows}x{cols}_2inch.lbrn2"
-        
-        return send_file(
-            lbrn_file,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/xml'
+        filename = (
+            f"aruco_quick_test_{QUICK_TEST_CONFIG['rows']}x{QUICK_TEST_CONFIG['cols']}"
+            "_2inch.lbrn2"
+        )
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+
+        # Deterministic files are identical on every call and served from memory
+        if _deterministic(request.get_json(silent=True) or {}):
+            return _artifact_response(
+                artifact_cache.get("quick_test_lbrn2"), "application/xml", headers
+            )
+
+        # Timestamped files are rendered per request
+        context, markers = _quick_test_context()
+        metadata = _quick_test_metadata(
+            {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}, len(markers)
+        )
+
+        # Stream LightBurn export as it is serialized
+        return Response(
+            stream_with_context(lightburn_exporter.iter_export(context, metadata)),
+            mimetype="application/xml",
+            headers=headers,
         )
-        
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
+
+def _artifact_response(artifact: dict, mimetype: str, headers: dict | None = None):
+    """Serve precomputed bytes with their ETag, or 304 if the client already has them"""
+    not_modified = _not_modified(artifact["etag"])
+    if not_modified:
+        return not_modified
+    response = Response(artifact["body"], mimetype=mimetype, headers=headers)
+    response.set_etag(artifact["etag"])
+    return response
 
-@app.route('/api/batch_generate', methods=['POST'])
+
+def _quick_test_context() -> tuple:
+    """Draw the fixed quick-test sheet, returning (context, markers)"""
+    config = QUICK_TEST_CONFIG
+    markers = aruco_gen.generate_grid_table(
+        config["start_id"],
+        config["dictionary"],
+        config["rows"],
+        config["cols"],
+        config["size_mm"],
+        config["spacing_mm"],
+    )
+
+    context = DrawingContext()
+    context.add_marker_grid(
+        markers,
+        config["include_borders"],
+        config["include_outer_border"],
+        config["border_width"],
+    )
+    if config["include_labels"]:
+        context.add_text_labels(markers)
+    return context, markers
+
+
+def _quick_test_metadata(stamp: dict, marker_count: int) -> dict:
+    """LightBurn notes for the quick-test file, led by a timestamp or config hash"""
+    config = QUICK_TEST_CONFIG
+    return {
+        **stamp,
+        "dictionary": config["dictionary"],
+        "rows": config["rows"],
+        "cols": config["cols"],
+        "size_mm": config["size_mm"],
+        "spacing_mm": config["spacing_mm"],
+        "total_markers": marker_count,
+        "start_id": config["start_id"],
+        "test_type": "Quick Test - 2x2 inch markers",
+    }
+
+
+def _render_quick_test_preview() -> dict:
+    """Quick-test preview JSON body"""
+    config = QUICK_TEST_CONFIG
+    context, markers = _quick_test_context()
+
+    # Calculate total dimensions including border
+    total_width, total_height = aruco_gen.calculate_total_size(
+        config["rows"], config["cols"], config["size_mm"], config["spacing_mm"]
+    )
+    total_width_with_border = total_width + (2 * config["border_width"])
+    total_height_with_border = total_height + (2 * config["border_width"])
+
+    # Same bytes jsonify would send (compact separators, trailing newline)
+    body = app.json.response(
+        {
+            "svg": context.get_svg(compact=True),
+            "dimensions": {
+                "width": round(total_width_with_border, 2),
+                "height": round(total_height_with_border, 2),
+            },
+            "total_width": total_width_with_border,
+            "total_height": total_height_with_border,
+            "marker_count": len(markers),
+            "success": True,
+            "test_config": dict(config),
+        }
+    ).get_data()
+    return {"body": body, "etag": config_hash("quick_test_preview", config)}
+
+
+def _render_quick_test_lbrn2() -> dict:
+    """Deterministic quick-test .lbrn2 file"""
+    etag = config_hash("quick_test", QUICK_TEST_CONFIG)
+    context, markers = _quick_test_context()
+    metadata = _quick_test_metadata({"config_hash": etag}, len(markers))
+    return {
+        "body": lightburn_exporter.export(context, metadata).getvalue(),
+        "etag": etag,
+    }
+
+
+def _render_preset_preview(preset_name: str) -> dict:
+    """Compact SVG preview of a preset with default preview settings"""
+    preset = PRESETS[preset_name]
+    markers = aruco_gen.generate_grid_table(
+        0,
+        preset["dictionary"],
+        preset["rows"],
+        preset["cols"],
+        float(preset["size_mm"]),
+        float(preset["spacing_mm"]),
+    )
+
+    context = DrawingContext()
+    context.add_marker_grid(markers, preset["include_borders"])
+    if preset["include_labels"]:
+        context.add_text_labels(markers)
+    return {
+        "body": context.get_svg(compact=True).encode("utf-8"),
+        "etag": config_hash("preset_preview", {"name": preset_name, **preset}),
+    }
+
+
+# Fixed-config artifacts rendered once (warmed in the background at startup)
+artifact_cache = ArtifactCache()
+artifact_cache.register(
+    "presets",
+    lambda: {
+        "body": app.json.response(PRESETS).get_data(),
+        "etag": config_hash("presets", PRESETS),
+    },
+)
+artifact_cache.register("quick_test_preview", _render_quick_test_preview)
+artifact_cache.register("quick_test_lbrn2", _render_quick_test_lbrn2)
+for _preset_name in PRESETS:
+    artifact_cache.register(
+        f"preset_preview:{_preset_name}", partial(_render_preset_preview, _preset_name)
+    )
+if app.config["WARM_ARTIFACTS"]:
+    threading.Thread(
+        target=artifact_cache.warm, name="artifact-warm", daemon=True
+    ).start()
+
+
+def _parse_batch_request(data: dict) -> dict:
+    """Validate a batch request, returning the canonical config that gets rendered"""
+    batch_size = int(data.get("batch_size", 5))
+    markers_per_file = int(data.get("markers_per_file", 10))
+    compression_level = int(
+        data.get("compression_level", app.config["BATCH_ZIP_LEVEL"])
+    )
+    max_files = app.config["BATCH_MAX_FILES"]
+    max_markers = app.config["BATCH_MAX_MARKERS_PER_FILE"]
+
+    # Validate batch parameters
+    if batch_size < 1 or batch_size > max_files:
+        raise ValueError(f"Batch size must be between 1 and {max_files}")
+    if markers_per_file < 1 or markers_per_file > max_markers:
+        raise ValueError(f"Markers per file must be between 1 and {max_markers}")
+    if not 0 <= compression_level <= 9:
+        raise ValueError("Compression level must be between 0 and 9")
+
+    config = _parse_marker_config(data, batch_size * markers_per_file)
+    config.update(
+        {
+            "batch_size": batch_size,
+            "markers_per_file": markers_per_file,
+            "compression_level": compression_level,
+        }
+    )
+    return config
+
+
+def _parse_sheet_request(data: dict) -> tuple:
+    """Validate a sheet layout request, returning (render config, layout plan)"""
+    ids = _parse_ids(data) if "ids" in data else None
+    total_markers = len(ids) if ids is not None else int(data.get("total_markers", 100))
+    compression_level = int(
+        data.get("compression_level", app.config["BATCH_ZIP_LEVEL"])
+    )
+    if total_markers < 1:
+        raise ValueError("Total markers must be at least 1")
+    if not 0 <= compression_level <= 9:
+        raise ValueError("Compression level must be between 0 and 9")
+    if "sheet_width_mm" not in data or "sheet_height_mm" not in data:
+        raise ValueError("sheet_width_mm and sheet_height_mm are required")
+
+    config = (
+        _parse_marker_config(data, total_markers)
+        if ids is None
+        else _parse_id_config(data, ids)
+    )
+    config.update(
+        {
+            "total_markers": total_markers,
+            "sheet_width_mm": float(data["sheet_width_mm"]),
+            "sheet_height_mm": float(data["sheet_height_mm"]),
+            "margin_mm": float(data.get("margin_mm", 5.0)),
+            "label_placement": data.get("label_placement", "auto"),
+            "compression_level": compression_level,
+        }
+    )
+    plan = batch_generator.plan_sheet_layout(
+        config,
+        total_markers,
+        config["sheet_width_mm"],
+        config["sheet_height_mm"],
+        config["margin_mm"],
+        config["label_placement"],
+    )
+
+    max_files = app.config["BATCH_MAX_FILES"]
+    max_markers = app.config["BATCH_MAX_MARKERS_PER_FILE"]
+    if len(plan.sheets) > max_files:
+        raise ValueError(
+            f"Layout needs {len(plan.sheets)} sheets (maximum {max_files})"
+        )
+    if plan.capacity > max_markers:
+        raise ValueError(
+            f"A sheet holds {plan.capacity} markers (maximum {max_markers} per file)"
+        )
+    return config, plan
+
+
+def _parse_ids(data: dict) -> list:
+    """Marker IDs listed in the request ("17, 203-204, 611" or a JSON list)"""
+    dictionary = data.get("dictionary")
+    if dictionary not in aruco_gen.dictionaries:
+        raise ValueError(f"Invalid dictionary: {dictionary}")
+    return parse_id_list(
+        data.get("ids"), aruco_gen.registry.max_markers(dictionary)
+    ).tolist()
+
+
+def _parse_id_config(data: dict, ids: list) -> dict:
+    """Marker settings for an explicit ID list (replaces start_id)"""
+    config = _parse_marker_config({**data, "start_id": 0}, 0)
+    config["start_id"] = 0
+    config["ids"] = ids
+    return config
+
+
+def _parse_marker_config(data: dict, total_markers: int) -> dict:
+    """Validate the marker settings shared by batch and sheet requests"""
+    config = {
+        "dictionary": data.get("dictionary"),
+        "start_id": int(data.get("start_id", 0)),
+        "size_mm": float(data.get("size_mm", 20)),
+        "spacing_mm": float(data.get("spacing_mm", 5)),
+        "include_borders": bool(data.get("include_borders", True)),
+        "include_labels": bool(data.get("include_labels", True)),
+        "include_outer_border": bool(data.get("include_outer_border", False)),
+        "border_width": float(data.get("border_width", 2.0)),
+        "merge": data.get("merge", "none"),
+        "fill_mode": data.get("fill_mode", "vector"),
+        "bitmap_dpi": int(data.get("bitmap_dpi", DEFAULT_BITMAP_DPI)),
+        "grouping": data.get("grouping", "shape"),
+        "path_order": data.get("path_order", "none"),
+    }
+
+    # Validate everything up front, since errors cannot be reported mid-stream
+    dictionary = config["dictionary"]
+    if dictionary not in aruco_gen.dictionaries:
+        raise ValueError(f"Invalid dictionary: {dictionary}")
+    if config["merge"] not in MERGE_STRATEGIES:
+        raise ValueError(f"Invalid merge strategy: {config['merge']}")
+    if config["fill_mode"] not in FILL_MODES:
+        raise ValueError(f"Invalid fill_mode: {config['fill_mode']}")
+    if config["grouping"] not in SHAPE_GROUPINGS:
+        raise ValueError(f"Invalid grouping: {config['grouping']}")
+    if config["path_order"] not in PATH_ORDERS:
+        raise ValueError(f"Invalid path_order: {config['path_order']}")
+    if config["path_order"] != "none" and config["grouping"] != "shape":
+        raise ValueError("path_order needs grouping 'shape'")
+    start_id = config["start_id"]
+    dictionary_size = aruco_gen.registry.max_markers(dictionary)
+    if start_id < 0 or start_id + total_markers > dictionary_size:
+        raise ValueError(
+            f"ID range {start_id}-{start_id + total_markers - 1} exceeds "
+            f"dictionary {dictionary} (0-{dictionary_size - 1})"
+        )
+
+    return config
+
+
+@app.route("/api/batch_generate", methods=["POST"])
 def batch_generate():
     """Generate batch of ArUCO files with sequential IDs"""
     try:
         data = request.get_json()
-        
-        # Extract batch parameters
-        batch_size = int(data.get('batch_size', 5))
-        markers_per_file = int(data.get('markers_per_file', 10))
-        
-        # Validate batch parameters
-        if batch_size < 1 or batch_size > 50:
-            return jsonify({'error': 'Batch size must be between 1 and 50'}), 400
-        if markers_per_file < 1 or markers_per_file > 100:
-            return jsonify({'error': 'Markers per file must be between 1 and 100'}), 400
-        
-        # Generate batch
-        batch_generator = BatchGenerator()
-        zip_file = batch_generator.generate_batch_files(data, batch_size, markers_per_file)
-        
+        config = _parse_batch_request(data)
+        batch_size = config["batch_size"]
+        markers_per_file = config["markers_per_file"]
+        compression_level = config["compression_level"]
+
+        # Deterministic archives are identified by their config hash
+        deterministic = _deterministic(data)
+        etag = batch_generator.batch_hash(
+            config, batch_size, markers_per_file, compression_level
+        )
+        if deterministic:
+            not_modified = _not_modified(etag)
+            if not_modified:
+                return not_modified
+        metrics.lap("parse")
+        stored = _stored_response(etag) if deterministic else None
+        if stored:
+            return stored
+
+        # Stream the batch as files are rendered and compressed on the shared pools
+        timings = []
+        started = time.perf_counter()
+
+        def stream():
+            yield from metrics.timed_stream(
+                batch_generator.iter_batch_zip(
+                    config,
+                    batch_size,
+                    markers_per_file,
+                    timings,
+                    compression_level,
+                    deterministic,
+                ),
+                "zip",
+            )
+            metrics.observe_stage("render", sum(t["seconds"] for t in timings))
+            metrics.count("files", len(timings))
+            metrics.count("markers", batch_size * markers_per_file)
+            app.logger.debug(
+                "Batch of %d files in %.3fs (%.3fs rendering): %s",
+                batch_size,
+                time.perf_counter() - started,
+                sum(t["seconds"] for t in timings),
+                ", ".join(f"{t['filename']}={t['seconds']:.3f}s" for t in timings),
+            )
+
         # Generate filename for batch
         total_markers = batch_size * markers_per_file
         filename = f"aruco_batch_{batch_size}files_{total_markers}markers.zip"
-        
-        return send_file(
-            zip_file,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/zip'
+
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        body = stream()
+        if deterministic:
+            headers["ETag"] = f'"{etag}"'
+            body = _store_body(etag, "batch", body, "application/zip", headers)
+        return Response(
+            stream_with_context(body), mimetype="application/zip", headers=headers
         )
-        
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
+
+@app.route("/api/download_ids", methods=["POST"])
+def download_ids():
+    """Download one LightBurn file with exactly the listed marker IDs, packed"""
+    try:
+        data = request.get_json()
+        ids = _parse_ids(data)
+        max_markers = app.config["BATCH_MAX_MARKERS_PER_FILE"]
+        if len(ids) > max_markers:
+            raise ValueError(f"{len(ids)} IDs listed (maximum {max_markers} per file)")
+        config = _parse_id_config(data, ids)
+
+        deterministic = _deterministic(data)
+        etag = batch_generator.id_list_hash(config)
+        if deterministic:
+            not_modified = _not_modified(etag)
+            if not_modified:
+                return not_modified
+        metrics.lap("parse")
+        stored = _stored_response(etag) if deterministic else None
+        if stored:
+            return stored
+
+        filename, payload = batch_generator.render_id_list(config, deterministic)
+        metrics.lap("render")
+        metrics.count("markers", len(ids))
+
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        if deterministic:
+            headers["ETag"] = f'"{etag}"'
+            if artifact_store is not None:
+                artifact_store.put(
+                    etag,
+                    "download",
+                    payload,
+                    "application/xml",
+                    {"Content-Disposition": headers["Content-Disposition"]},
+                )
+        return Response(payload, mimetype="application/xml", headers=headers)
+
     except ValueError as e:
-        return jsonify({'error': str(e)}), 400
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
+
+@app.route("/api/layout", methods=["POST"])
+def plan_layout():
+    """Plan how markers pack onto bed/stock sheets, with per-sheet utilization"""
+    try:
+        _, plan = _parse_sheet_request(request.get_json())
+        return jsonify(plan.to_dict())
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
+
+@app.route("/api/batch_sheets", methods=["POST"])
+def batch_sheets():
+    """Generate one LightBurn file per bed/stock sheet, overflowing onto more"""
+    try:
+        data = request.get_json()
+        config, plan = _parse_sheet_request(data)
+        compression_level = config["compression_level"]
+
+        deterministic = _deterministic(data)
+        etag = batch_generator.sheet_hash(config, plan, compression_level)
+        if deterministic:
+            not_modified = _not_modified(etag)
+            if not_modified:
+                return not_modified
+        metrics.lap("parse")
+        stored = _stored_response(etag) if deterministic else None
+        if stored:
+            return stored
+
+        def stream():
+            timings = []
+            yield from metrics.timed_stream(
+                batch_generator.iter_sheet_zip(
+                    config, plan, timings, compression_level, deterministic
+                ),
+                "zip",
+            )
+            metrics.observe_stage("render", sum(t["seconds"] for t in timings))
+            metrics.count("files", len(timings))
+            metrics.count("markers", config["total_markers"])
+
+        filename = (
+            f"aruco_sheets_{len(plan.sheets)}sheets_"
+            f"{config['total_markers']}markers.zip"
+        )
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        body = stream()
+        if deterministic:
+            headers["ETag"] = f'"{etag}"'
+            body = _store_body(etag, "batch", body, "application/zip", headers)
+        return Response(
+            stream_with_context(body), mimetype="application/zip", headers=headers
+        )
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
+
+@app.route("/api/jobs/batch", methods=["POST"])
+def submit_batch_job():
+    """Queue a batch ZIP job and return its id"""
+    try:
+        data = request.get_json()
+        config = _parse_batch_request(data)
+        job_id = batch_jobs.submit(
+            config,
+            config["batch_size"],
+            config["markers_per_file"],
+            config["compression_level"],
+            _deterministic(data),
+        )
+
+        return (
+            jsonify(
+                {
+                    "job_id": job_id,
+                    "status_url": f"/api/jobs/{job_id}",
+                    "events_url": f"/api/jobs/{job_id}/events",
+                    "result_url": f"/api/jobs/{job_id}/result",
+                    "cancel_url": f"/api/jobs/{job_id}/cancel",
+                }
+            ),
+            202,
+        )
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
+
+@app.route("/api/jobs/<job_id>")
+def batch_job_status(job_id):
+    """Report batch job progress (files done out of total)"""
+    status = batch_jobs.status(job_id)
+    if status is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(status)
+
+
+@app.route("/api/jobs/<job_id>/events")
+def batch_job_events(job_id):
+    """Stream batch job progress as server-sent events for up to 25 seconds
+
+    The stream ends with the job, or with an `event: reconnect` once
+    JOB_EVENTS_MAX_SECONDS pass; stalled jobs turn `failed` via status().
+    """
+    if batch_jobs.status(job_id) is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+
+    def events():
+        last = None
+        deadline = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+        yield "retry: 1000\n\n"
+        while True:
+            db.session.expire_all()
+            status = batch_jobs.status(job_id)
+            if status is None:
+                return
+            if status != last:
+                yield f"data: {json.dumps(status)}\n\n"
+                last = status
+            if status["status"] in FINISHED_STATES:
+                return
+            if time.monotonic() > deadline:
+                # Free the worker before it times out; the client reconnects or polls
+                yield f"event: reconnect\ndata: {json.dumps(status)}\n\n"
+                return
+            time.sleep(0.5)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.route("/api/jobs/<job_id>/result")
+def batch_job_result(job_id):
+    """Download a finished batch job's ZIP from disk"""
+    status = batch_jobs.status(job_id)
+    if status is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    if status["status"] != "done":
+        return jsonify({"error": f"Job is {status['status']}", "job": status}), 409
+
+    return send_file(
+        batch_jobs.result_path(job_id),
+        as_attachment=True,
+        download_name=f"aruco_batch_{job_id}.zip",
+        mimetype="application/zip",
+    )
+
+
+@app.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_batch_job(job_id):
+    """Cancel a queued or running batch job"""
+    status = batch_jobs.cancel(job_id)
+    if status is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    return jsonify(status)
+
 
 # Error logging and debugging endpoints
-@app.route('/api/log-error', methods=['POST'])
+@app.route("/api/log-error", methods=["POST"])
 def log_error():
     """Log frontend errors for debugging"""
+    if not error_report_limiter.allow(request.remote_addr or "unknown"):
+        return jsonify({"error": "Too many error reports"}), 429
     try:
-        error_data = request.get_json()
-        
-        # Log to console
-        print(f"[FRONTEND ERROR] {error_data.get('context', 'Unknown')}: {error_data.get('message', 'No message')}")
-        
-        # Log to file for AI debugging
-        with open('debug_logs.txt', 'a') as f:
-            f.write(f"{datetime.now().isoformat()} - FRONTEND ERROR\n")
-            f.write(f"Context: {error_data.get('context', 'Unknown')}\n")
-            f.write(f"Message: {error_data.get('message', 'No message')}\n")
-            f.write(f"Stack: {error_data.get('stack', 'No stack trace')}\n")
-            f.write(f"URL: {error_data.get('url', 'Unknown')}\n")
-            f.write("-" * 80 + "\n")
-        
-        return jsonify({'status': 'logged'}), 200
+        error_data = request.get_json(silent=True)
+        if not isinstance(error_data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+
+        def field(name, default):
+            return str(error_data.get(name, default))[:MAX_ERROR_FIELD_LENGTH]
+
+        logger.error(
+            "FRONTEND ERROR\nContext: %s\nMessage: %s\nStack: %s\nURL: %s",
+            field("context", "Unknown"),
+            field("message", "No message"),
+            field("stack", "No stack trace"),
+            field("url", "Unknown"),
+        )
+
+        return jsonify({"status": "logged"}), 200
     except Exception as e:
-        print(f"Failed to log frontend error: {e}")
-        return jsonify({'error': 'Failed to log error'}), 500
+        logger.warning("Failed to log frontend error: %s", e)
+        return jsonify({"error": "Failed to log error"}), 500
 
-@app.route('/api/debug/status')
+
+@app.route("/api/debug/status")
 def debug_status():
     """Get application debug status"""
     try:
         status = {
-            'timestamp': datetime.now().isoformat(),
-            'app_running': True,
-            'aruco_generator': bool(aruco_gen),
-            'lightburn_exporter': bool(lightburn_exporter),
-            'dictionaries_loaded': len(aruco_gen.get_dictionary_info()) > 0,
-            'debug_mode': app.debug,
-            'environment': os.environ.get('FLASK_ENV', 'production')
+            "timestamp": datetime.now().isoformat(),
+            "app_running": True,
+            "aruco_generator": bool(aruco_gen),
+            "lightburn_exporter": bool(lightburn_exporter),
+            "dictionaries_loaded": len(aruco_gen.registry.info) > 0,
+            "marker_tables": aruco_gen.registry.table_stats(),
+            "artifact_cache": artifact_cache.stats(),
+            "artifact_store": artifact_store.stats()
+            if artifact_store is not None
+            else None,
+            "debug_mode": app.debug,
+            "environment": os.environ.get("FLASK_ENV", "production"),
         }
-        
-        # Log status for AI debugging
-        with open('debug_logs.txt', 'a') as f:
-            f.write(f"{datetime.now().isoformat()} - STATUS CHECK\n")
-            f.write(f"Status: {status}\n")
-            f.write("-" * 80 + "\n")
-        
+
+        logger.debug("STATUS CHECK: %s", status)
+
         return jsonify(status)
     except Exception as e:
-        return jsonify({'error': str(e), 'app_running': False}), 500
+        return jsonify({"error": str(e), "app_running": False}), 500
+
+
+@app.route("/api/debug/metrics")
+def debug_metrics():
+    """Latency histograms, stage timings and element/byte counters (Prometheus text)"""
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
 
 @app.errorhandler(404)
 def not_found_error(error):
-    # Log 404 errors for debugging
-    with open('debug_logs.txt', 'a') as f:
-        f.write(f"{datetime.now().isoformat()} - 404 ERROR\n")
-        f.write(f"Path: {request.path}\n")
-        f.write(f"Method: {request.method}\n")
-        f.write("-" * 80 + "\n")
-    
-    return render_template('index.html', dictionaries=aruco_gen.get_dictionary_info()), 404
+    logger.info("404 ERROR %s %s", request.method, request.path)
+
+    # API clients get a small JSON body; only browser paths fall back to the app page
+    if request.path.startswith("/api/"):
+        return jsonify({"error": "Not found"}), 404
+    return (
+        render_template("index.html", dictionaries=aruco_gen.get_dictionary_info()),
+        404,
+    )
+
 
 @app.errorhandler(500)
 def internal_error(error):
-    # Log 500 errors with full traceback
-    with open('debug_logs.txt', 'a') as f:
-        f.write(f"{datetime.now().isoformat()} - 500 ERROR\n")
-        f.write(f"Path: {request.path}\n")
-        f.write(f"Method: {request.method}\n")
-        f.write(f"Error: {str(error)}\n")
-        f.write(f"Traceback: {traceback.format_exc()}\n")
-        f.write("-" * 80 + "\n")
-    
-    return jsonify({'error': 'Internal server error'}), 500
-
-# Enhanced logging setup
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('debug_logs.txt'),
-        logging.StreamHandler()
-    ]
-)
+    original = getattr(error, "original_exception", None)
+    logger.error(
+        "500 ERROR %s %s: %s",
+        request.method,
+        request.path,
+        original or error,
+        exc_info=original or True,
+    )
 
-# Log application startup
-with open('debug_logs.txt', 'a') as f:
-    f.write(f"{datetime.now().isoformat()} - APPLICATION STARTUP\n")
-    f.write(f"ArUCO Generator initialized: {bool(aruco_gen)}\n")
-    f.write(f"LightBurn Exporter initialized: {bool(lightburn_exporter)}\n")
-    f.write("-" * 80 + "\n")
+    return jsonify({"error": "Internal server error"}), 500
+
+
+logger.info(
+    "APPLICATION STARTUP: ArUCO Generator initialized: %s, "
+    "LightBurn Exporter initialized: %s",
+    bool(aruco_gen),
+    bool(lightburn_exporter),
+)
@@ -0,0 +1,212 @@
+"""
+{
+  "file_type": "zip_stream_writer",
+  "purpose": "Stream ZIP archives while deflating members in parallel threads",
+  "dependencies": ["zlib (stdlib)"],
+  "main_class": "ZipStream",
+  "key_methods": {
+    "iter_zip": "Yield archive bytes as members finish compressing, in member order",
+    "ordered_map": "Bounded-window Executor map that yields results in input order"
+  },
+  "ai_navigation": {
+    "modify_for": "Changing archive layout, compression or ZIP64 handling",
+    "used_by": ["batch.py"],
+    "output_format": "ZIP bytes (local headers carry final CRC/sizes, ZIP64 if needed)"
+  }
+}
+"""
+
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+DEFAULT_COMPRESSION_LEVEL = 6
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_ZIP64_END_RECORD = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_ZIP32_LIMIT = 0xFFFFFFFF
+_UTF8_FLAG = 0x800
+
+
+def ordered_map(
+    executor: Executor, fn: Callable[[Any], Any], items: Iterable[Any], window: int
+) -> Iterator[Any]:
+    """Map fn over items on executor, keeping at most `window` results in flight"""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _deflate(member: Tuple[str, bytes, int]) -> Tuple[str, bytes, int, int, int]:
+    """Compress one member to (name, data, crc, size, method); zlib releases the GIL"""
+    name, payload, level = member
+    crc = zlib.crc32(payload)
+    if level == 0:
+        return name, payload, crc, len(payload), 0
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return name, compressor.compress(payload) + compressor.flush(), crc, len(payload), 8
+
+
+class ZipStream:
+    def __init__(
+        self,
+        compresslevel: int = DEFAULT_COMPRESSION_LEVEL,
+        max_workers: int | None = None,
+        executor: Executor | None = None,
+    ):
+        if not 0 <= compresslevel <= 9:
+            raise ValueError("Compression level must be between 0 and 9")
+        self.compresslevel = compresslevel
+        self.max_workers = max_workers
+        self.executor = executor
+
+    def iter_zip(
+        self,
+        members: Iterable[Tuple[str, bytes]],
+        date_time: Tuple[int, int, int, int, int, int] | None = None,
+        written: List[str] | None = None,
+    ) -> Iterator[bytes]:
+        """Yield a ZIP of (name, payload) members, compressing ahead in parallel
+
+        Members are rendered and deflated ahead of the consumer; `written` receives
+        each name once the consumer has taken all of its bytes.
+        """
+        dos_time, dos_date = _dos_timestamp(date_time or time.localtime()[:6])
+        executor = self.executor or ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix="zip"
+        )
+        window = 2 * (self.max_workers or os.cpu_count() or 1)
+
+        entries: List[Tuple[bytes, int, int, int, int, int]] = []
+        offset = 0
+        try:
+            jobs = ((name, payload, self.compresslevel) for name, payload in members)
+            for name, data, crc, size, method in ordered_map(
+                executor, _deflate, jobs, window
+            ):
+                encoded_name = name.encode("utf-8")
+
+                # Sizes are known up front, so no data descriptor is needed
+                zip64 = size >= _ZIP32_LIMIT or len(data) >= _ZIP32_LIMIT
+                extra = struct.pack("<2H2Q", 1, 16, size, len(data)) if zip64 else b""
+                header = _LOCAL_HEADER.pack(
+                    b"PK\x03\x04",
+                    45 if zip64 else 20,
+                    0,
+                    _UTF8_FLAG,
+                    method,
+                    dos_time,
+                    dos_date,
+                    crc,
+                    _ZIP32_LIMIT if zip64 else len(data),
+                    _ZIP32_LIMIT if zip64 else size,
+                    len(encoded_name),
+                    len(extra),
+                )
+                yield header + encoded_name + extra
+                yield data
+                if written is not None:
+                    written.append(name)
+
+                entries.append((encoded_name, crc, len(data), size, method, offset))
+                offset += len(header) + len(encoded_name) + len(extra) + len(data)
+        finally:
+            if self.executor is None:
+                executor.shutdown(cancel_futures=True)
+
+        yield self._central_directory(entries, offset, dos_time, dos_date)
+
+    def _central_directory(
+        self,
+        entries: List[Tuple[bytes, int, int, int, int, int]],
+        start: int,
+        dos_time: int,
+        dos_date: int,
+    ) -> bytes:
+        """Build the central directory and end records for the written members"""
+        records = []
+        for encoded_name, crc, compressed, size, method, offset in entries:
+            # ZIP64 extra carries whichever of size, compressed size and offset overflow
+            fields = [
+                value for value in (size, compressed, offset) if value >= _ZIP32_LIMIT
+            ]
+            extra = (
+                struct.pack(f"<2H{len(fields)}Q", 1, 8 * len(fields), *fields)
+                if fields
+                else b""
+            )
+            version = 45 if fields else 20
+            records.append(
+                _CENTRAL_HEADER.pack(
+                    b"PK\x01\x02",
+                    version,
+                    3,
+                    version,
+                    0,
+                    _UTF8_FLAG,
+                    method,
+                    dos_time,
+                    dos_date,
+                    crc,
+                    min(compressed, _ZIP32_LIMIT),
+                    min(size, _ZIP32_LIMIT),
+                    len(encoded_name),
+                    len(extra),
+                    0,
+                    0,
+                    0,
+                    0o100644 << 16,
+                    min(offset, _ZIP32_LIMIT),
+                )
+                + encoded_name
+                + extra
+            )
+        directory = b"".join(records)
+
+        count = len(entries)
+        end = start + len(directory)
+        trailer = b""
+        if count >= 0xFFFF or start >= _ZIP32_LIMIT or len(directory) >= _ZIP32_LIMIT:
+            trailer = _ZIP64_END_RECORD.pack(
+                b"PK\x06\x06",
+                _ZIP64_END_RECORD.size - 12,
+                45,
+                45,
+                0,
+                0,
+                count,
+                count,
+                len(directory),
+                start,
+            ) + _ZIP64_LOCATOR.pack(b"PK\x06\x07", 0, end, 1)
+        trailer += _END_RECORD.pack(
+            b"PK\x05\x06",
+            0,
+            0,
+            min(count, 0xFFFF),
+            min(count, 0xFFFF),
+            min(len(directory), _ZIP32_LIMIT),
+            min(start, _ZIP32_LIMIT),
+            0,
+        )
+        return directory + trailer
+
+
+def _dos_timestamp(date_time: Tuple[int, int, int, int, int, int]) -> Tuple[int, int]:
+    """Pack (year, month, day, hour, minute, second) into DOS time and date words"""
+    year, month, day, hour, minute, second = date_time
+    year = max(year, 1980)
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (
+        month << 5
+    ) | day
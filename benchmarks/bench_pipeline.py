@@ -0,0 +1,354 @@
+"""
+{
+  "file_type": "benchmark_suite",
+  "purpose": "Reproducible pipeline timings with a diffable JSON baseline",
+  "dependencies": ["aruco_generator", "web.py (presets only)"],
+  "key_functions": {
+    "run_suite": "Benchmark every case and stage, returning the results document",
+    "compare": "Diff results against a baseline: regressions and output changes",
+    "measure": "Best-of-N wall time, tracemalloc peak and output bytes for one stage"
+  },
+  "usage": {
+    "record": "python benchmarks/bench_pipeline.py --output benchmarks/baseline.json",
+    "check": "python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json",
+    "quick": "python benchmarks/bench_pipeline.py --quick --baseline <baseline>"
+  },
+  "ai_navigation": {
+    "modify_for": "Adding stages or cases (keep case keys stable for baselines)",
+    "used_by": ["developers before deploy"],
+    "output_format": "JSON: meta, skipped, {case: {stage: {seconds, peak_bytes, ...}}}"
+  }
+}
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Run from a checkout without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aruco_generator.aruco import ArUCOGenerator  # noqa: E402
+from aruco_generator.batch import BatchGenerator  # noqa: E402
+from aruco_generator.drawing import DrawingContext  # noqa: E402
+from aruco_generator.lightburn import LightBurnExporter  # noqa: E402
+
+# 31x31 (961 IDs) is the largest grid the 1000-marker dictionaries can fill;
+# grids that need more IDs than a dictionary has are listed under "skipped"
+GRID_SIZES = (1, 2, 4, 8, 16, 31, 32)
+QUICK_GRID_SIZES = (1, 8)
+QUICK_DICTIONARIES = ("4X4_50", "6X6_250", "7X7_1000")
+
+# Batch stage: small sequential batch per dictionary
+BATCH_FILES = 5
+BATCH_MARKERS_PER_FILE = 10
+
+# Relative slowdown (or memory growth) that counts as a regression
+DEFAULT_THRESHOLD = 0.25
+
+# Timings this short are mostly noise and are not compared
+MIN_COMPARABLE_SECONDS = 0.001
+
+# Fixed render settings so cases are comparable across runs
+GRID_CONFIG = {
+    "size_mm": 20.0,
+    "spacing_mm": 5.0,
+    "include_borders": True,
+    "include_labels": True,
+    "include_outer_border": False,
+    "border_width": 2.0,
+}
+
+# Metadata without timestamps keeps export bytes stable
+METADATA = {"benchmark": "bench_pipeline"}
+
+
+def measure(
+    fn: Callable[[], Any],
+    repeat: int,
+    size: Callable[[Any], int | None] = lambda _: None,
+) -> Dict[str, Any]:
+    """Best-of-`repeat` wall time after a warm-up, then one tracemalloc run for peak"""
+    fn()
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    output_bytes = size(result)
+    del result
+
+    # Tracing slows allocation-heavy code, so memory gets its own run
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": best, "peak_bytes": peak, "output_bytes": output_bytes}
+
+
+def grid_stages(
+    generator: ArUCOGenerator,
+    exporter: LightBurnExporter,
+    config: Dict[str, Any],
+    repeat: int,
+) -> Dict[str, Dict[str, Any]]:
+    """Benchmark each pipeline stage for one grid config"""
+    dictionary, rows, cols = config["dictionary"], config["rows"], config["cols"]
+    size_mm, spacing_mm = float(config["size_mm"]), float(config["spacing_mm"])
+
+    def build_context() -> DrawingContext:
+        context = DrawingContext()
+        context.add_marker_grid(
+            table,
+            config["include_borders"],
+            config["include_outer_border"],
+            config["border_width"],
+        )
+        if config["include_labels"]:
+            context.add_text_labels(table)
+        return context
+
+    table = generator.generate_grid_table(
+        0, dictionary, rows, cols, size_mm, spacing_mm
+    )
+    context = build_context()
+    return {
+        "generate_grid": measure(
+            lambda: generator.generate_grid(
+                0, dictionary, rows, cols, size_mm, spacing_mm
+            ),
+            repeat,
+        ),
+        "generate_grid_table": measure(
+            lambda: generator.generate_grid_table(
+                0, dictionary, rows, cols, size_mm, spacing_mm
+            ),
+            repeat,
+            lambda result: result.nbytes,
+        ),
+        "add_marker_grid": measure(build_context, repeat),
+        "get_svg": measure(
+            context.get_svg, repeat, lambda svg: len(svg.encode("utf-8"))
+        ),
+        "export": measure(
+            lambda: exporter.export(context, METADATA),
+            repeat,
+            lambda output: len(output.getbuffer()),
+        ),
+    }
+
+
+def batch_stage(batch: BatchGenerator, dictionary: str, repeat: int) -> Dict[str, Any]:
+    """Benchmark a small deterministic sequential-ID batch ZIP"""
+    config = {"dictionary": dictionary, "start_id": 0, **GRID_CONFIG}
+    return measure(
+        lambda: batch.generate_batch_files(
+            config, BATCH_FILES, BATCH_MARKERS_PER_FILE, deterministic=True
+        ),
+        repeat,
+        lambda output: len(output.getbuffer()),
+    )
+
+
+def load_presets() -> Dict[str, Dict[str, Any]]:
+    """Presets as served by /api/presets (importing web.py sets up the Flask app)"""
+    os.environ.setdefault("WARM_ARTIFACTS", "0")
+    from aruco_generator.web import PRESETS
+
+    return PRESETS
+
+
+def run_suite(
+    dictionaries: List[str],
+    sizes: Tuple[int, ...],
+    repeat: int,
+    include_presets: bool = True,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """Benchmark every case and stage, returning the results document"""
+    generator = ArUCOGenerator()
+    exporter = LightBurnExporter()
+    batch = BatchGenerator(pool="serial")
+    results = {}
+    skipped = {}
+
+    for dictionary in dictionaries:
+        capacity = generator.registry.max_markers(dictionary)
+        for n in sizes:
+            key = f"grid/{dictionary}/{n}x{n}"
+            if n * n > capacity:
+                skipped[key] = f"needs {n * n} IDs, dictionary has {capacity}"
+                continue
+            log(key)
+            results[key] = grid_stages(
+                generator,
+                exporter,
+                {"dictionary": dictionary, "rows": n, "cols": n, **GRID_CONFIG},
+                repeat,
+            )
+
+        key = f"batch/{dictionary}/{BATCH_FILES}x{BATCH_MARKERS_PER_FILE}"
+        log(key)
+        results[key] = {"generate_batch_files": batch_stage(batch, dictionary, repeat)}
+
+    if include_presets:
+        for name, preset in load_presets().items():
+            key = f"preset/{name}"
+            log(key)
+            results[key] = grid_stages(
+                generator, exporter, {**GRID_CONFIG, **preset}, repeat
+            )
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> Dict[str, List[str]]:
+    """Diff results against a baseline: slower/larger stages and changed output sizes"""
+    report = {
+        "regressions": [],
+        "improvements": [],
+        "output_changes": [],
+        "missing": [],
+    }
+    for key, stages in baseline["results"].items():
+        for stage, old in stages.items():
+            new = current["results"].get(key, {}).get(stage)
+            if new is None:
+                report["missing"].append(f"{key} {stage}")
+                continue
+
+            for metric in ("seconds", "peak_bytes"):
+                if not old[metric] or (
+                    metric == "seconds"
+                    and max(old[metric], new[metric]) < MIN_COMPARABLE_SECONDS
+                ):
+                    continue
+                ratio = new[metric] / old[metric]
+                line = (
+                    f"{key} {stage} {metric}: "
+                    f"{old[metric]:.6g} -> {new[metric]:.6g} ({ratio:.2f}x)"
+                )
+                if ratio > 1 + threshold:
+                    report["regressions"].append(line)
+                elif ratio < 1 / (1 + threshold):
+                    report["improvements"].append(line)
+
+            if old["output_bytes"] != new["output_bytes"]:
+                report["output_changes"].append(
+                    f"{key} {stage} output_bytes: "
+                    f"{old['output_bytes']} -> {new['output_bytes']}"
+                )
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the marker generation-to-export pipeline"
+    )
+    parser.add_argument(
+        "--output", help="Write results JSON here (e.g. a new baseline)"
+    )
+    parser.add_argument(
+        "--baseline", help="Compare against this results JSON; exit 1 on regressions"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative slowdown or memory growth counted as a regression",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Timing runs per stage (best is kept)"
+    )
+    parser.add_argument(
+        "--dictionary", action="append", help="Only these dictionaries (repeatable)"
+    )
+    parser.add_argument(
+        "--sizes", help="Comma-separated square grid sizes (default 1,2,4,8,16,31,32)"
+    )
+    parser.add_argument(
+        "--no-presets", action="store_true", help="Skip the web presets"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Three dictionaries, 1x1 and 8x8 grids"
+    )
+    args = parser.parse_args()
+
+    dictionaries = args.dictionary or list(ArUCOGenerator().dictionaries)
+    sizes = GRID_SIZES
+    if args.quick:
+        dictionaries = args.dictionary or list(QUICK_DICTIONARIES)
+        sizes = QUICK_GRID_SIZES
+    if args.sizes:
+        sizes = tuple(int(size) for size in args.sizes.split(","))
+
+    results = run_suite(
+        dictionaries,
+        sizes,
+        args.repeat,
+        not args.no_presets,
+        log=lambda key: print(f"  {key}", file=sys.stderr),
+    )
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+            fp.write("\n")
+        print(f"Wrote {len(results['results'])} cases to {args.output}")
+    if results["skipped"]:
+        print(f"SKIPPED ({len(results['skipped'])}):")
+        for key, reason in results["skipped"].items():
+            print(f"  {key}: {reason}")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as fp:
+        baseline = json.load(fp)
+    # Only cases run this time are compared (a --quick run checks a subset)
+    baseline = {
+        **baseline,
+        "results": {
+            key: stages
+            for key, stages in baseline["results"].items()
+            if key in results["results"]
+        },
+    }
+    report = compare(results, baseline, args.threshold)
+    for section in ("regressions", "output_changes", "improvements", "missing"):
+        if report[section]:
+            print(f"\n{section.replace('_', ' ').upper()} ({len(report[section])}):")
+            for line in report[section]:
+                print(f"  {line}")
+    if not report["regressions"]:
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@
 class ArUCOGenerator {
     constructor() {
         this.debugMode = true;
+        this.previewCache = new Map();  // request body -> { etag, result }
         this.setupErrorLogging();
         this.initializeElements();
         this.attachEventListeners();
@@ -19,6 +20,18 @@ class ArUCOGenerator {
         return div.innerHTML;
     }
 
+    // Format seconds as "1h 02m" or "3m 05s"
+    formatDuration(seconds) {
+        const total = Math.round(seconds);
+        const hours = Math.floor(total / 3600);
+        const minutes = Math.floor((total % 3600) / 60);
+        const secs = total % 60;
+        if (hours > 0) {
+            return `${hours}h ${String(minutes).padStart(2, '0')}m`;
+        }
+        return `${minutes}m ${String(secs).padStart(2, '0')}s`;
+    }
+
     // Safely set innerHTML with escaped content
     safeSetInnerHTML(element, htmlContent) {
         if (!element) return;
@@ -635,26 +648,62 @@ class ArUCOGenerator {
     }
 
     // Core generation methods
+    async fetchPreview(data) {
+        // Raw SVG preview: the document streams as the body, metadata arrives in headers
+        const body = JSON.stringify(data);
+        const cached = this.previewCache.get(body);
+        const headers = { 'Content-Type': 'application/json' };
+        if (cached) {
+            headers['If-None-Match'] = cached.etag;
+        }
+
+        const response = await fetch('/api/preview?format=svg', {
+            method: 'POST',
+            headers,
+            body
+        });
+
+        // Unchanged config: the server skipped rendering
+        if (response.status === 304 && cached) {
+            return cached.result;
+        }
+
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.error || 'Preview generation failed');
+        }
+
+        const result = {
+            svg: await response.text(),
+            dimensions: {
+                width: parseFloat(response.headers.get('X-Dimensions-Width')),
+                height: parseFloat(response.headers.get('X-Dimensions-Height'))
+            },
+            marker_count: parseInt(response.headers.get('X-Marker-Count'), 10),
+            estimate: { total_seconds: parseFloat(response.headers.get('X-Estimated-Seconds')) },
+            success: true
+        };
+
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            // Keep only the most recent previews
+            if (this.previewCache.size >= 20) {
+                this.previewCache.delete(this.previewCache.keys().next().value);
+            }
+            this.previewCache.set(body, { etag, result });
+        }
+        return result;
+    }
+
     async generatePreview(data, type) {
         try {
             this.log('Generating preview', { data, type });
             this.showLoading();
             
-            const response = await fetch('/api/preview', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(data)
-            });
-
-            if (response.ok) {
-                const result = await response.json();
-                this.log('Preview generated successfully', result);
-                this.showPreview(result, data);
-                this.currentGenerationData = { data, type };
-            } else {
-                const error = await response.json();
-                throw new Error(error.error || 'Preview generation failed');
-            }
+            const result = await this.fetchPreview(data);
+            this.log('Preview generated successfully', result.dimensions);
+            this.showPreview(result, data);
+            this.currentGenerationData = { data, type };
         } catch (error) {
             this.logError('Preview Generation', error);
             this.showError(error.message || 'Failed to generate preview');
@@ -666,25 +715,14 @@ class ArUCOGenerator {
             this.log('Generating advanced preview', data);
             this.showAdvancedLoading();
             
-            const response = await fetch('/api/preview', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(data)
-            });
-
-            if (response.ok) {
-                const result = await response.json();
-                this.log('Advanced preview generated successfully', result);
-                this.showAdvancedPreview(result, data);
-                this.currentAdvancedData = data;
-                
-                // Enable download button
-                if (this.downloadAdvancedBtn) {
-                    this.downloadAdvancedBtn.disabled = false;
-                }
-            } else {
-                const error = await response.json();
-                throw new Error(error.error || 'Advanced preview generation failed');
+            const result = await this.fetchPreview(data);
+            this.log('Advanced preview generated successfully', result.dimensions);
+            this.showAdvancedPreview(result, data);
+            this.currentAdvancedData = data;
+            
+            // Enable download button
+            if (this.downloadAdvancedBtn) {
+                this.downloadAdvancedBtn.disabled = false;
             }
         } catch (error) {
             this.logError('Advanced Preview Generation', error);
@@ -822,6 +860,9 @@ class ArUCOGenerator {
             if (this.dimensionsInfo && result.dimensions) {
                 this.dimensionsInfo.textContent = 
                     `Dimensions: ${result.dimensions.width}mm × ${result.dimensions.height}mm`;
+                if (result.estimate && !isNaN(result.estimate.total_seconds)) {
+                    this.dimensionsInfo.textContent += ` · Est. job time: ${this.formatDuration(result.estimate.total_seconds)}`;
+                }
             }
 
             // Enable download button
@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# app.py reads its configuration at import: point it at a throwaway database, store and
+# log before any test imports it
+_TMP = tempfile.mkdtemp(prefix="aruco-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ["ARTIFACT_STORE_DIR"] = os.path.join(_TMP, "artifact_store")
+os.environ["LOG_FILE"] = os.path.join(_TMP, "test.log")
+os.environ["WARM_ARTIFACTS"] = "0"
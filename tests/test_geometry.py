@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from aruco_generator.aruco import ArUCOGenerator
+from aruco_generator.geometry import merge_greedy, merge_runs, trace_outlines
+
+
+def _winding(loops, shape):
+    """Nonzero winding number and even-odd crossing count at every cell center"""
+    rows, cols = shape
+    cy, cx = np.mgrid[0:rows, 0:cols] + 0.5
+    winding = np.zeros(shape, dtype=int)
+    crossings = np.zeros(shape, dtype=int)
+    for loop in loops:
+        for (x0, y0), (x1, y1) in zip(loop, loop[1:] + loop[:1]):
+            if x0 != x1:
+                continue
+            # Vertical edge at x0: count it for centers to its left spanning its y range
+            hit = (cx < x0) & (cy > min(y0, y1)) & (cy < max(y0, y1))
+            winding += np.where(hit, 1 if y1 > y0 else -1, 0)
+            crossings += hit
+    return winding, crossings
+
+
+def _grids():
+    generator = ArUCOGenerator()
+    for marker_id in range(50):
+        yield generator.generate_marker_bits(marker_id, "4X4_50")
+    for marker_id in (0, 17, 249):
+        yield generator.generate_marker_bits(marker_id, "7X7_250")
+
+    yield np.ones((3, 3), dtype=np.uint8) - np.pad([[1]], 1)  # ring with a hole
+    yield np.eye(3, dtype=np.uint8)  # cells touching only at corners
+    yield np.array([[1, 0, 1], [0, 1, 0], [1, 0, 1]], dtype=np.uint8)
+    yield np.zeros((4, 4), dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    for _ in range(25):
+        yield (rng.random((9, 9)) < 0.5).astype(np.uint8)
+
+
+GRIDS = list(_grids())
+
+
+@pytest.mark.parametrize("grid", GRIDS)
+def test_outlines_rasterize_to_module_grid(grid):
+    loops = trace_outlines(grid)
+    winding, crossings = _winding(loops, grid.shape)
+
+    # Outer loops clockwise (+1), holes counter-clockwise: nonzero and even-odd agree
+    assert np.array_equal(winding != 0, grid.astype(bool))
+    assert np.array_equal(crossings % 2 == 1, grid.astype(bool))
+    assert set(np.unique(winding)) <= {0, 1}
+
+
+@pytest.mark.parametrize("grid", GRIDS)
+def test_outline_loops_are_closed_rectilinear_without_collinear_points(grid):
+    for loop in trace_outlines(grid):
+        assert len(loop) >= 4
+        for prev_pt, point, next_pt in zip(
+            loop[-1:] + loop[:-1], loop, loop[1:] + loop[:1]
+        ):
+            assert prev_pt[0] == point[0] or prev_pt[1] == point[1]
+            assert (prev_pt[0] == point[0]) != (point[0] == next_pt[0])
+
+
+@pytest.mark.parametrize("merge", [merge_runs, merge_greedy])
+@pytest.mark.parametrize("grid", GRIDS)
+def test_rectangles_cover_black_cells_once(merge, grid):
+    coverage = np.zeros(grid.shape, dtype=int)
+    for row, col, height, width in merge(grid):
+        coverage[row : row + height, col : col + width] += 1
+    assert np.array_equal(coverage, grid.astype(int))
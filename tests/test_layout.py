@@ -0,0 +1,132 @@
+import pytest
+
+from aruco_generator.batch import (
+    LABEL_CLEARANCE_MM,
+    LABEL_FONT_SIZE,
+    BatchGenerator,
+)
+from aruco_generator.drawing import DrawingContext
+from aruco_generator.layout import grid_shape, plan_sheets
+
+SHEET_CASES = [
+    # count, size, spacing, width, height, margin, label_mm, placement
+    (30, 20.0, 5.0, 105.0, 105.0, 5.0, 4.0, "auto"),
+    (30, 20.0, 5.0, 105.0, 105.0, 5.0, 4.0, "beside"),
+    (100, 15.0, 2.0, 300.0, 200.0, 10.0, 4.0, "auto"),
+    (100, 15.0, 6.0, 300.0, 200.0, 10.0, 4.0, "below"),
+    (7, 50.0, 0.0, 400.0, 120.0, 0.0, 4.0, "auto"),
+    (500, 10.0, 1.0, 600.0, 400.0, 5.0, 0.0, "none"),
+]
+
+
+def _label_reach(plan, label_mm):
+    """How far labels reach past each marker along x and y"""
+    return {
+        "below": (0.0, label_mm),
+        "beside": (label_mm, 0.0),
+        "none": (0.0, 0.0),
+    }[plan.label_placement]
+
+
+@pytest.mark.parametrize(
+    "count, size, spacing, width, height, margin, label_mm, placement", SHEET_CASES
+)
+def test_markers_and_labels_stay_inside_margins(
+    count, size, spacing, width, height, margin, label_mm, placement
+):
+    plan = plan_sheets(count, size, spacing, width, height, margin, label_mm, placement)
+    label_x, label_y = _label_reach(plan, label_mm)
+
+    assert sum(sheet.count for sheet in plan.sheets) == count
+    for sheet in plan.sheets:
+        assert sheet.count <= plan.capacity
+        assert sheet.x.min() >= margin and sheet.y.min() >= margin
+        assert sheet.x.max() + size + label_x <= width - margin + 1e-9
+        assert sheet.y.max() + size + label_y <= height - margin + 1e-9
+        assert sheet.used_width <= width - 2 * margin + 1e-9
+        assert sheet.used_height <= height - 2 * margin + 1e-9
+
+
+@pytest.mark.parametrize(
+    "count, size, spacing, width, height, margin, label_mm, placement", SHEET_CASES
+)
+def test_neighbouring_markers_and_labels_do_not_overlap(
+    count, size, spacing, width, height, margin, label_mm, placement
+):
+    plan = plan_sheets(count, size, spacing, width, height, margin, label_mm, placement)
+    label_x, label_y = _label_reach(plan, label_mm)
+
+    for sheet in plan.sheets:
+        xs = sorted(set(sheet.x.tolist()))
+        ys = sorted(set(sheet.y.tolist()))
+        for a, b in zip(xs, xs[1:]):
+            assert b - a >= size + max(spacing, label_x) - 1e-9
+        for a, b in zip(ys, ys[1:]):
+            assert b - a >= size + max(spacing, label_y) - 1e-9
+
+
+def test_105mm_sheet_fits_3x4_with_labels_below():
+    # 4x4 would fit the markers alone, but the last row's labels would cross the
+    # bottom margin
+    plan = plan_sheets(30, 20.0, 5.0, 105.0, 105.0, 5.0, LABEL_CLEARANCE_MM)
+
+    assert plan.label_placement == "below"
+    assert plan.capacity == 12
+    assert [(sheet.rows, sheet.cols) for sheet in plan.sheets] == [
+        (3, 4),
+        (3, 4),
+        (2, 3),
+    ]
+    assert plan_sheets(30, 20.0, 5.0, 105.0, 105.0, 5.0, 0.0, "none").capacity == 16
+
+
+@pytest.mark.parametrize("placement", ["auto", "below", "beside"])
+def test_rendered_labels_stay_inside_margins(placement):
+    width = height = 105.0
+    margin, size = 5.0, 20.0
+    config = {"size_mm": size, "spacing_mm": 5.0, "include_labels": True}
+    plan = BatchGenerator().plan_sheet_layout(
+        config, 30, width, height, margin, placement
+    )
+
+    for sheet in plan.sheets:
+        markers = [
+            {"id": i, "x": float(x), "y": float(y), "size": size}
+            for i, (x, y) in enumerate(zip(sheet.x, sheet.y))
+        ]
+        context = DrawingContext()
+        context.add_text_labels(markers, LABEL_FONT_SIZE, plan.label_placement)
+        for label in context.shapes:
+            # Text anchors sit at the baseline; descenders reach about 1 mm further
+            if plan.label_placement == "beside":
+                assert label["x"] + 1.0 <= width - margin
+            else:
+                assert label["y"] + 1.0 <= height - margin
+
+
+def test_labels_disabled_uses_marker_pitch_only():
+    config = {"size_mm": 20.0, "spacing_mm": 5.0, "include_labels": False}
+    plan = BatchGenerator().plan_sheet_layout(config, 16, 105.0, 105.0)
+
+    assert plan.label_placement == "none"
+    assert plan.capacity == 16
+
+
+def test_invalid_layouts():
+    with pytest.raises(ValueError):
+        plan_sheets(10, 200.0, 5.0, 100.0, 100.0)
+    with pytest.raises(ValueError):
+        plan_sheets(0, 20.0, 5.0, 100.0, 100.0)
+    with pytest.raises(ValueError):
+        plan_sheets(10, 20.0, 5.0, 100.0, 100.0, label_placement="above")
+    with pytest.raises(ValueError):
+        grid_shape(50, 7, 7)
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 12, 13, 48, 49])
+def test_grid_shape_holds_count_within_limits(count):
+    rows, cols = grid_shape(count, 7, 7)
+
+    assert rows * cols >= count
+    assert rows <= 7 and cols <= 7
+    assert (rows - 1) * cols < count
@@ -0,0 +1,36 @@
+import pytest
+
+from aruco_generator.aruco import ArUCOGenerator
+from aruco_generator.drawing import DrawingContext
+from aruco_generator.lightburn import LightBurnExporter
+
+
+def _context(geometry, merge="none"):
+    markers = ArUCOGenerator().generate_grid(
+        0, "4X4_50", 2, 2, 20.0, 5.0, geometry=geometry
+    )
+    context = DrawingContext()
+    context.add_marker_grid(markers, merge=merge)
+    context.add_text_labels(markers)
+    return context
+
+
+@pytest.mark.parametrize("fill_mode", ["bitmap_marker", "bitmap_sheet"])
+@pytest.mark.parametrize("merge", ["none", "contours"])
+def test_bitmap_fill_modes_write_image_layer_for_cell_geometry(fill_mode, merge):
+    data = LightBurnExporter().export(_context("cells", merge), fill_mode=fill_mode)
+
+    assert b"<CutSetting_Img" in data.getvalue()
+
+
+@pytest.mark.parametrize("fill_mode", ["bitmap_marker", "bitmap_sheet"])
+@pytest.mark.parametrize("merge", ["none", "contours"])
+def test_bitmap_fill_modes_reject_pixel_geometry(fill_mode, merge):
+    with pytest.raises(ValueError, match="cell geometry"):
+        LightBurnExporter().export(_context("pixels", merge), fill_mode=fill_mode)
+
+
+def test_vector_fills_keep_vector_cut_setting_for_pixel_geometry():
+    data = LightBurnExporter().export(_context("pixels", "contours")).getvalue()
+
+    assert b"<CutSetting_Img" not in data
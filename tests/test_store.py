@@ -0,0 +1,145 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import app, db
+from aruco_generator.store import (
+    ACCESS_UPDATE_SECONDS,
+    ArtifactStore,
+    StoredArtifact,
+)
+
+TTL_SECONDS = 3600
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    """ArtifactStore factory over an empty index, inside an app context"""
+    with app.app_context():
+        db.create_all()
+        StoredArtifact.query.delete()
+        db.session.commit()
+        yield lambda max_bytes=1000: ArtifactStore(
+            str(tmp_path), max_bytes, TTL_SECONDS
+        )
+        db.session.rollback()
+        StoredArtifact.query.delete()
+        db.session.commit()
+
+
+def _key(name: str) -> str:
+    return name * 64
+
+
+def _age(key: str, **fields: timedelta):
+    """Move an entry's timestamps into the past"""
+    entry = db.session.get(StoredArtifact, key)
+    for name, delta in fields.items():
+        setattr(entry, name, datetime.now() - delta)
+    db.session.commit()
+
+
+def _stored_keys():
+    return {entry.key for entry in StoredArtifact.query.all()}
+
+
+def test_put_get_round_trip(make_store):
+    store = make_store()
+    store.put(_key("a"), "download", b"payload", "application/xml", {"X-A": "1"})
+
+    hit = store.get(_key("a"))
+    with hit.file:
+        assert hit.file.read() == b"payload"
+    assert (hit.mimetype, hit.headers, hit.size) == (
+        "application/xml",
+        {"X-A": "1"},
+        7,
+    )
+    assert store.get(_key("b")) is None
+    assert store.stats()["hits"] == 1
+
+
+def test_expired_entries_are_misses_and_removed(make_store):
+    store = make_store()
+    store.put(_key("a"), "download", b"old", "text/plain")
+    _age(_key("a"), created_at=timedelta(seconds=TTL_SECONDS + 1))
+
+    assert store.get(_key("a")) is None
+    assert _stored_keys() == set()
+    assert not os.path.exists(store.path(_key("a")))
+
+
+def test_evict_sweeps_expired_entries_only(make_store):
+    store = make_store()
+    store.put(_key("a"), "download", b"old", "text/plain")
+    store.put(_key("b"), "download", b"new", "text/plain")
+    _age(_key("a"), created_at=timedelta(seconds=TTL_SECONDS + 1))
+
+    assert store.evict() == 1
+    assert _stored_keys() == {_key("b")}
+
+
+def test_least_recently_used_entries_are_evicted_first(make_store):
+    store = make_store(max_bytes=300)
+    for name in "abc":
+        store.put(_key(name), "download", b"x" * 100, "text/plain")
+    _age(_key("a"), accessed_at=timedelta(hours=3))
+    _age(_key("b"), accessed_at=timedelta(hours=1))
+    _age(_key("c"), accessed_at=timedelta(hours=2))
+    assert _stored_keys() == {_key("a"), _key("b"), _key("c")}
+
+    store.put(_key("d"), "download", b"x" * 100, "text/plain")
+    assert _stored_keys() == {_key("b"), _key("c"), _key("d")}
+    assert not os.path.exists(store.path(_key("a")))
+
+    store.put(_key("e"), "download", b"x" * 100, "text/plain")
+    assert _stored_keys() == {_key("b"), _key("d"), _key("e")}
+    assert store.stats()["bytes"] == 300
+
+
+def test_hits_refresh_recency(make_store):
+    store = make_store(max_bytes=200)
+    store.put(_key("a"), "download", b"x" * 100, "text/plain")
+    store.put(_key("b"), "download", b"x" * 100, "text/plain")
+    _age(_key("a"), accessed_at=timedelta(hours=2))
+    _age(_key("b"), accessed_at=timedelta(hours=1))
+
+    store.get(_key("a")).file.close()
+    store.put(_key("c"), "download", b"x" * 100, "text/plain")
+    assert _stored_keys() == {_key("a"), _key("c")}
+
+
+def test_recent_hits_do_not_rewrite_access_time(make_store):
+    store = make_store()
+    store.put(_key("a"), "download", b"x", "text/plain")
+    accessed = datetime.now() - timedelta(seconds=ACCESS_UPDATE_SECONDS / 2)
+    db.session.get(StoredArtifact, _key("a")).accessed_at = accessed
+    db.session.commit()
+
+    store.get(_key("a")).file.close()
+    assert db.session.get(StoredArtifact, _key("a")).accessed_at == accessed
+
+
+def test_oversized_and_aborted_bodies_are_not_stored(make_store, tmp_path):
+    store = make_store(max_bytes=10)
+    chunks = list(store.capture(_key("a"), "download", [b"x" * 8, "yyyy"], "t/p"))
+    assert chunks == [b"x" * 8, "yyyy"]
+
+    stream = store.capture(_key("b"), "download", [b"1", b"2"], "t/p")
+    next(stream)
+    stream.close()
+
+    assert _stored_keys() == set()
+    assert [name for _, _, names in os.walk(tmp_path) for name in names] == []
+
+
+def test_hit_stays_readable_after_eviction(make_store):
+    store = make_store()
+    store.put(_key("a"), "download", b"payload", "text/plain")
+
+    hit = store.get(_key("a"))
+    os.remove(store.path(_key("a")))  # another worker evicts it
+    with hit.file:
+        assert hit.file.read() == b"payload"
+    assert store.get(_key("a")) is None
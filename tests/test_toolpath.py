@@ -0,0 +1,40 @@
+import numpy as np
+
+from aruco_generator.aruco import ArUCOGenerator
+from aruco_generator.drawing import DrawingContext
+from aruco_generator.lightburn import LightBurnExporter
+from aruco_generator.toolpath import order_layers, travel_distance
+
+
+def test_scan_layers_keep_order_and_add_no_travel():
+    rng = np.random.default_rng(0)
+    x, y = rng.random(40) * 100, rng.random(40) * 100
+    layer = np.repeat([0, 1], 20)
+
+    toolpath = order_layers(x, y, layer, {0: "scan", 1: "nearest"})
+
+    assert np.array_equal(toolpath.orders[0], np.arange(20))
+    assert list(toolpath.travel_before) == [1]
+    assert list(toolpath.report()["layers"]) == ["1"]
+    order = toolpath.orders[1]
+    assert sorted(order.tolist()) == list(range(20, 40))
+    assert toolpath.travel_after[1] == travel_distance(x[order], y[order])
+    assert toolpath.travel_after[1] <= toolpath.travel_before[1]
+
+
+def test_plan_toolpath_reorders_only_cut_and_mark_layers():
+    markers = ArUCOGenerator().generate_grid(0, "4X4_50", 3, 3, 20.0, 5.0)
+    context = DrawingContext()
+    context.add_marker_grid(markers, include_outer_border=True)
+    context.add_text_labels(markers)
+    exporter = LightBurnExporter()
+
+    toolpath = exporter.plan_toolpath(context)
+    engrave_layer = exporter._engrave_layer()
+
+    assert engrave_layer not in toolpath.travel_after
+    fills = toolpath.orders[engrave_layer]
+    assert np.array_equal(fills, np.sort(fills))
+    unordered = exporter.export(context).getvalue()
+    ordered = exporter.export(context, toolpath=toolpath).getvalue()
+    assert ordered.count(b"<Shape ") == unordered.count(b"<Shape ")
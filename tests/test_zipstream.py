@@ -0,0 +1,135 @@
+import io
+import os
+import struct
+import zipfile
+
+import pytest
+
+from aruco_generator.batch import BatchGenerator
+from aruco_generator.zipstream import (
+    _CENTRAL_HEADER,
+    _END_RECORD,
+    _ZIP64_END_RECORD,
+    _ZIP64_LOCATOR,
+    ZipStream,
+)
+
+MEMBERS = [
+    ("empty.txt", b""),
+    ("text.txt", b"ArUCO " * 2000),
+    ("random.bin", os.urandom(50_000)),
+    ("dir/ünïcode.lbrn2", "<LightBurnProject/>".encode("utf-8")),
+]
+
+BATCH_CONFIG = {
+    "dictionary": "4X4_50",
+    "start_id": 0,
+    "size_mm": 20.0,
+    "spacing_mm": 5.0,
+    "include_borders": True,
+    "include_labels": True,
+    "include_outer_border": False,
+    "border_width": 2.0,
+}
+
+
+def _open(chunks):
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+@pytest.mark.parametrize("level", [0, 1, 6, 9])
+def test_stream_passes_testzip_and_round_trips(level):
+    archive = _open(ZipStream(level, max_workers=2).iter_zip(MEMBERS))
+
+    assert archive.testzip() is None
+    assert archive.namelist() == [name for name, _ in MEMBERS]
+    for name, payload in MEMBERS:
+        assert archive.read(name) == payload
+        expected = zipfile.ZIP_STORED if level == 0 else zipfile.ZIP_DEFLATED
+        assert archive.getinfo(name).compress_type == expected
+
+
+def test_fixed_date_time_is_written_to_every_member():
+    date_time = (1980, 1, 1, 0, 0, 0)
+    first = b"".join(ZipStream().iter_zip(MEMBERS, date_time))
+    second = b"".join(ZipStream().iter_zip(MEMBERS, date_time))
+
+    assert first == second
+    for info in zipfile.ZipFile(io.BytesIO(first)).infolist():
+        assert info.date_time == date_time
+
+
+def test_written_lists_members_only_after_their_bytes_are_consumed():
+    written = []
+    chunks = []
+    for chunk in ZipStream(max_workers=4).iter_zip(MEMBERS, written=written):
+        # At most the member whose bytes were just yielded is still unlisted
+        assert len(written) in (len(chunks) // 2, (len(chunks) - 1) // 2)
+        chunks.append(chunk)
+
+    assert written == [name for name, _ in MEMBERS]
+    assert _open(chunks).testzip() is None
+
+
+def test_invalid_compression_level():
+    with pytest.raises(ValueError):
+        ZipStream(10)
+
+
+def test_batch_zip_passes_testzip():
+    archive = _open(
+        BatchGenerator().iter_batch_zip(BATCH_CONFIG, 3, 4, deterministic=True)
+    )
+
+    assert archive.testzip() is None
+    assert len(archive.namelist()) == 4
+    assert archive.namelist()[-1] == "BATCH_SUMMARY.txt"
+
+
+def test_zip64_end_records_from_65535_members():
+    members = ((f"{i}.txt", b"") for i in range(0xFFFF))
+    data = b"".join(ZipStream(0).iter_zip(members))
+
+    assert b"PK\x06\x06" in data
+    archive = zipfile.ZipFile(io.BytesIO(data))
+    assert len(archive.infolist()) == 0xFFFF
+    assert archive.testzip() is None
+
+
+def test_zip64_below_member_threshold_stays_zip32():
+    members = ((f"{i}.txt", b"") for i in range(0xFFFE))
+    data = b"".join(ZipStream(0).iter_zip(members))
+
+    assert b"PK\x06\x06" not in data
+    assert len(zipfile.ZipFile(io.BytesIO(data)).infolist()) == 0xFFFE
+
+
+def test_zip64_extra_fields_for_sizes_and_offsets_past_4gib():
+    size, compressed, offset = 0x1_0000_0010, 0xFFFF_FFFE, 0x1_2345_6789
+    start = offset + 100
+    directory = ZipStream()._central_directory(
+        [(b"big.bin", 0, compressed, size, 8, offset)], start, 0, 33
+    )
+
+    header = _CENTRAL_HEADER.unpack_from(directory)
+    name_length, extra_length = header[12], header[13]
+    # The compressed size still fits in 32 bits; size and offset overflow
+    assert (header[10], header[11], header[-1]) == (
+        compressed,
+        0xFFFFFFFF,
+        0xFFFFFFFF,
+    )
+    extra = directory[_CENTRAL_HEADER.size + name_length :][:extra_length]
+    # Only the overflowing fields, in size / compressed / offset order
+    assert struct.unpack("<2H2Q", extra) == (1, 16, size, offset)
+
+    record_start = _CENTRAL_HEADER.size + name_length + extra_length
+    record = _ZIP64_END_RECORD.unpack_from(directory, record_start)
+    assert record[0] == b"PK\x06\x06"
+    assert record[-1] == start
+    locator = _ZIP64_LOCATOR.unpack_from(
+        directory, record_start + _ZIP64_END_RECORD.size
+    )
+    assert locator[2] == start + record_start
+    end = _END_RECORD.unpack_from(directory, len(directory) - _END_RECORD.size)
+    assert end[-2] == 0xFFFFFFFF